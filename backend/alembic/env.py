@@ -1,3 +1,4 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -14,6 +15,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the database the app uses when DATABASE_URL is set, like src.config
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -25,6 +30,8 @@ from src.models.preset_habit import PresetHabit
 from src.models.custom_habit import CustomHabit
 from src.models.habit_list import HabitList
 from src.models.habit_list import HabitListItem
+from src.models.xp_bucket import XpBucket
+from src.models.sweep_checkpoint import SweepCheckpoint
 target_metadata = db.metadata
 
 # other values from the config, defined by the needs of env.py,
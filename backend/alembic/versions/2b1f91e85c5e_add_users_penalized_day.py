@@ -0,0 +1,31 @@
+"""Add users.penalized_day
+
+The local day the penalty sweep last penalized a user for. Empty for
+the existing users, who are penalized on their next deadline.
+
+Revision ID: 2b1f91e85c5e
+Revises: fbd46105a033
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b1f91e85c5e'
+down_revision: Union[str, None] = 'fbd46105a033'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'penalized_day' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}:
+        op.add_column('users', sa.Column('penalized_day', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('penalized_day')
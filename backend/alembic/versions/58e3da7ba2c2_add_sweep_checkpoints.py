@@ -0,0 +1,41 @@
+"""Add sweep_checkpoints
+
+The progress of the penalty sweeps, one row per deadline.
+
+Revision ID: 58e3da7ba2c2
+Revises: 6dd3281be207
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '58e3da7ba2c2'
+down_revision: Union[str, None] = '6dd3281be207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'sweep_checkpoints' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'sweep_checkpoints',
+        sa.Column('sweep_key', sa.String(64), nullable=False),
+        sa.Column('last_user_id', sa.String(36), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sweep_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sweep_checkpoints')
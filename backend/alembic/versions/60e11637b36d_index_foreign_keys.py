@@ -0,0 +1,40 @@
+"""Index the foreign keys the models look up by
+
+Revision ID: 60e11637b36d
+Revises: b3bd441968d7
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60e11637b36d'
+down_revision: Union[str, None] = 'b3bd441968d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'custom_habits': 'habit_owner_id',
+    'habit_lists': 'list_owner_id',
+    'habit_list_items': 'habit_list_id',
+    'preset_habits': 'category_name',
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for table, column in INDEXES.items():
+        name = f'ix_{table}_{column}'
+
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, [column])
+
+
+def downgrade() -> None:
+    for table, column in INDEXES.items():
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
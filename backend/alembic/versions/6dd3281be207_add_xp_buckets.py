@@ -0,0 +1,46 @@
+"""Add xp_buckets
+
+The XP every user gained per day, week and month, for the period
+leaderboards. They start empty: the XP gained before has no date.
+
+Revision ID: 6dd3281be207
+Revises: 7a2c2bc88fca
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6dd3281be207'
+down_revision: Union[str, None] = '7a2c2bc88fca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'xp_buckets' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'xp_buckets',
+        sa.Column('user_id', sa.String(36), nullable=False),
+        sa.Column('period', sa.String(5), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('xp', sa.Integer(), nullable=False),
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'period', 'period_start'),
+    )
+    op.create_index('ix_xp_buckets_ranking', 'xp_buckets', ['period', 'period_start', 'xp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_xp_buckets_ranking', table_name='xp_buckets')
+    op.drop_table('xp_buckets')
@@ -0,0 +1,54 @@
+"""Add users.total_xp
+
+Backfills the total XP of the existing users from their level and the
+XP they have in it, so the closed-form level of User.check_level_up and
+the leaderboard keep them where they are. A negative current_xp, which
+the app never wrote, counts as 0.
+
+Revision ID: 7a2c2bc88fca
+Revises: 60e11637b36d
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2c2bc88fca'
+down_revision: Union[str, None] = '60e11637b36d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The XP curve of src.models.user when this revision was written: level 1
+# needs 100 XP, every next level 50 more
+BASE_XP_TO_NEXT_LEVEL = 100
+XP_TO_NEXT_LEVEL_GROWTH = 50
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if 'total_xp' not in {column['name'] for column in inspector.get_columns('users')}:
+        op.add_column('users', sa.Column('total_xp', sa.Integer(), nullable=False, server_default='0'))
+
+        users = sa.table('users', sa.column('level'), sa.column('current_xp'), sa.column('total_xp'))
+        # xp_for_level(level) + current_xp
+        levels = sa.func.coalesce(users.c.level, 1) - 1
+        current_xp = sa.case((users.c.current_xp > 0, users.c.current_xp), else_=0)
+        op.execute(users.update().values(
+            total_xp=levels * BASE_XP_TO_NEXT_LEVEL + levels * (levels - 1) * (XP_TO_NEXT_LEVEL_GROWTH // 2) + current_xp,
+            current_xp=current_xp,
+        ))
+
+    if 'ix_users_total_xp' not in {index['name'] for index in inspector.get_indexes('users')}:
+        op.create_index('ix_users_total_xp', 'users', ['total_xp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_total_xp', table_name='users')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('total_xp')
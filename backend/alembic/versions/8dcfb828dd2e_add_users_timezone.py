@@ -0,0 +1,41 @@
+"""Add users.timezone
+
+The existing users get the default timezone, the one the app ended
+every user's day in before.
+
+Revision ID: 8dcfb828dd2e
+Revises: 58e3da7ba2c2
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8dcfb828dd2e'
+down_revision: Union[str, None] = '58e3da7ba2c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# src.services.deadlines.DEFAULT_TIMEZONE when this revision was written
+DEFAULT_TIMEZONE = 'US/Eastern'
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if 'timezone' not in {column['name'] for column in inspector.get_columns('users')}:
+        op.add_column('users', sa.Column('timezone', sa.String(64), nullable=False, server_default=DEFAULT_TIMEZONE))
+
+    if 'ix_users_timezone' not in {index['name'] for index in inspector.get_indexes('users')}:
+        op.create_index('ix_users_timezone', 'users', ['timezone'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_timezone', table_name='users')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('timezone')
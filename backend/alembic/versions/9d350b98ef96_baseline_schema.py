@@ -0,0 +1,129 @@
+"""Baseline schema
+
+The tables as they were when the existing databases were stamped with
+this revision. Tables that already exist, e.g. created by
+db.create_all(), are left as they are.
+
+Revision ID: 9d350b98ef96
+Revises:
+Create Date: 2026-10-18 11:16:56.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d350b98ef96'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('email', sa.String(128), nullable=False),
+            sa.Column('password_hash', sa.String(128), nullable=False),
+            sa.Column('username', sa.String(128), nullable=False),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('level', sa.Integer(), nullable=True),
+            sa.Column('current_xp', sa.Integer(), nullable=True),
+            sa.Column('xp_to_next_level', sa.Integer(), nullable=True),
+            sa.Column('habits_completed', sa.Integer(), nullable=True),
+            sa.Column('max_hp', sa.Integer(), nullable=True),
+            sa.Column('hp', sa.Integer(), nullable=True),
+            sa.Column('strenght', sa.Integer(), nullable=True),
+            sa.Column('vitality', sa.Integer(), nullable=True),
+            sa.Column('dexterity', sa.Integer(), nullable=True),
+            sa.Column('intelligence', sa.Integer(), nullable=True),
+            sa.Column('luck', sa.Integer(), nullable=True),
+            sa.Column('streak', sa.Integer(), nullable=True),
+            sa.Column('last_login', sa.DateTime(), nullable=True),
+            sa.Column('total_login_count', sa.Integer(), nullable=True),
+            *_timestamps(),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username'),
+        )
+
+    if 'categories' not in tables:
+        op.create_table(
+            'categories',
+            sa.Column('name', sa.String(128), nullable=False),
+            *_timestamps(),
+            sa.PrimaryKeyConstraint('name', 'id'),
+            sa.UniqueConstraint('name'),
+        )
+
+    if 'preset_habits' not in tables:
+        op.create_table(
+            'preset_habits',
+            sa.Column('description', sa.String(300), nullable=False),
+            sa.Column('category_name', sa.String(128), nullable=True),
+            sa.Column('xp_reward', sa.Integer(), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['category_name'], ['categories.name']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'custom_habits' not in tables:
+        op.create_table(
+            'custom_habits',
+            sa.Column('description', sa.String(200), nullable=False),
+            sa.Column('habit_owner_id', sa.String(36), nullable=False),
+            sa.Column('xp_reward', sa.Integer(), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['habit_owner_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'habit_lists' not in tables:
+        op.create_table(
+            'habit_lists',
+            sa.Column('name', sa.String(200), nullable=True),
+            sa.Column('list_owner_id', sa.String(36), nullable=False),
+            sa.Column('completed_habits', sa.Integer(), nullable=True),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['list_owner_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'habit_list_items' not in tables:
+        op.create_table(
+            'habit_list_items',
+            sa.Column('id', sa.String(36), nullable=False),
+            sa.Column('habit_list_id', sa.String(36), nullable=False),
+            sa.Column('preset_habit_id', sa.String(36), nullable=True),
+            sa.Column('custom_habit_id', sa.String(36), nullable=True),
+            sa.Column('habit_is_completed', sa.Boolean(), nullable=True),
+            sa.Column('is_late', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['habit_list_id'], ['habit_lists.id']),
+            sa.ForeignKeyConstraint(['preset_habit_id'], ['preset_habits.id']),
+            sa.ForeignKeyConstraint(['custom_habit_id'], ['custom_habits.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('habit_list_items')
+    op.drop_table('habit_lists')
+    op.drop_table('custom_habits')
+    op.drop_table('preset_habits')
+    op.drop_table('categories')
+    op.drop_table('users')
@@ -0,0 +1,32 @@
+"""Add users.version
+
+The version counter of optimistic locking, User.version_id_col.
+
+Revision ID: b3bd441968d7
+Revises: 9d350b98ef96
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3bd441968d7'
+down_revision: Union[str, None] = '9d350b98ef96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+
+    if 'version' not in columns:
+        op.add_column('users', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('version')
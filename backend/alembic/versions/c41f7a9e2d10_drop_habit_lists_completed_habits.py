@@ -0,0 +1,32 @@
+"""Drop habit_lists.completed_habits
+
+Completing a habit deletes its item, so the per-list count was a
+denormalized counter kept by an extra UPDATE on every completion. The
+completions of a user are still counted in users.habits_completed.
+
+Revision ID: c41f7a9e2d10
+Revises: 2b1f91e85c5e
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a9e2d10'
+down_revision: Union[str, None] = '2b1f91e85c5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'completed_habits' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('habit_lists')}:
+        with op.batch_alter_table('habit_lists') as batch_op:
+            batch_op.drop_column('completed_habits')
+
+
+def downgrade() -> None:
+    op.add_column('habit_lists', sa.Column('completed_habits', sa.Integer(), nullable=True))
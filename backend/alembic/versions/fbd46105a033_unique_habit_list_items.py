@@ -0,0 +1,64 @@
+"""Make the habits of a habit list unique
+
+HabitListItem.add_habits inserts with ON CONFLICT DO NOTHING, which
+needs these constraints to skip the habits a list already has. The
+duplicates added before are deleted first, keeping a completed copy
+over an incomplete one, then the oldest.
+
+Revision ID: fbd46105a033
+Revises: 8dcfb828dd2e
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fbd46105a033'
+down_revision: Union[str, None] = '8dcfb828dd2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINTS = {
+    'uq_habit_list_items_preset': 'preset_habit_id',
+    'uq_habit_list_items_custom': 'custom_habit_id',
+}
+
+
+def upgrade() -> None:
+    existing = {
+        constraint['name'] for constraint in sa.inspect(op.get_bind()).get_unique_constraints('habit_list_items')
+    }
+    missing = {name: column for name, column in CONSTRAINTS.items() if name not in existing}
+
+    if not missing:
+        return
+
+    for column in missing.values():
+        op.execute(sa.text(f"""
+            DELETE FROM habit_list_items WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY habit_list_id, {column}
+                        ORDER BY CASE WHEN habit_is_completed THEN 0 ELSE 1 END, created_at, id
+                    ) AS copy
+                    FROM habit_list_items
+                    WHERE {column} IS NOT NULL
+                ) AS copies
+                WHERE copy > 1
+            )
+        """))
+
+    # SQLite can't add a constraint to a table, batch mode copies it into a new one
+    with op.batch_alter_table('habit_list_items') as batch_op:
+        for name, column in missing.items():
+            batch_op.create_unique_constraint(name, ['habit_list_id', column])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('habit_list_items') as batch_op:
+        for name in CONSTRAINTS:
+            batch_op.drop_constraint(name, type_='unique')
@@ -0,0 +1,104 @@
+"""
+Benchmark the catalog endpoints served from the repository and from the snapshot.
+
+Loads data/categories_habits.json into an SQLite database, then requests
+GET /categories/, /categories/<name>/preset_habits and /preset_habits/
+through the test client, with the handlers as they were, querying the
+repository, and as they are, reading the catalog snapshot.
+
+Usage (from the backend directory):
+    python -m benchmarks.catalog [requests]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy import event
+from src import create_app
+from src.models import db
+from src.models.category import Category
+from src.models.preset_habit import PresetHabit
+from src.persistence.db import DBRepository
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "categories_habits.json")
+
+
+def old_categories():
+    return [category.to_dict() for category in Category.get_all()]
+
+
+def old_category_habits(name: str):
+    category = Category.get(name)
+    return [preset_habit.to_dict() for preset_habit in PresetHabit.find_by(category_name=category.name)]
+
+
+def old_preset_habits():
+    return [preset_habit.to_dict() for preset_habit in PresetHabit.get_all()]
+
+
+def timed(client, url: str, requests: int) -> tuple[float, float]:
+    """Returns the mean latency (µs) and SQL statements of a GET request"""
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert client.get(url).status_code == 200
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    return elapsed / requests * 1_000_000, statements / requests
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    os.environ["REPOSITORY"] = "db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    import src.persistence
+    app = create_app()
+    app.add_url_rule("/old/categories", view_func=old_categories)
+    app.add_url_rule("/old/categories/<name>/preset_habits", view_func=old_category_habits)
+    app.add_url_rule("/old/preset_habits", view_func=old_preset_habits)
+
+    with open(DATA_FILE) as file:
+        data = json.load(file)
+
+    with app.app_context():
+        src.persistence.repo = DBRepository()
+        for category in data["categories"]:
+            db.session.add(Category(category["name"]))
+            db.session.add_all(
+                PresetHabit(description=description, category_name=category["name"])
+                for description in category["habits"]
+            )
+        db.session.commit()
+
+        from src.services.catalog import catalog
+        catalog.reload()
+        name = data["categories"][0]["name"]
+        client = app.test_client()
+
+        print(f"{len(data['categories'])} categories, "
+              f"{sum(len(category['habits']) for category in data['categories'])} preset habits")
+        print(f"{'endpoint':>36} {'repository µs':>14} {'snapshot µs':>12} {'queries':>10}")
+
+        for old, new in (
+            ("/old/categories", "/categories/"),
+            (f"/old/categories/{name}/preset_habits", f"/categories/{name}/preset_habits"),
+            ("/old/preset_habits", "/preset_habits/"),
+        ):
+            old_latency, old_queries = timed(client, old, requests)
+            new_latency, new_queries = timed(client, new, requests)
+            print(f"{new:>36} {old_latency:14.1f} {new_latency:12.1f} {old_queries:4.0f} -> {new_queries:.0f}")
+
+
+if __name__ == "__main__":
+    main()
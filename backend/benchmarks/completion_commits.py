@@ -0,0 +1,77 @@
+"""
+Benchmark the commits and latency of the habit completion endpoints.
+
+Runs against a SQLite file so every commit pays for a real fsync.
+
+Usage (from the backend directory):
+    python -m benchmarks.completion_commits [completions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+tmp = tempfile.mkdtemp()
+os.environ["REPOSITORY"] = "db"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+from sqlalchemy import event
+from src import create_app
+from src.models import db
+from src.models.category import Category
+from src.models.custom_habit import CustomHabit
+from src.models.preset_habit import PresetHabit
+
+
+def main():
+    completions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    app = create_app()
+    client = app.test_client()
+
+    client.post("/users/", json={"email": "bench@example.com", "password": "bench", "username": "bench"})
+    login = client.post("/login", json={"email": "bench@example.com", "password": "bench"}).get_json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    habit_list_id = client.post("/habit_lists/", json={"name": "Bench"}, headers=headers).get_json()["id"]
+
+    with app.app_context():
+        db.session.add(Category("Bench"))
+        preset_habits = [PresetHabit(description=f"Preset {i}", category_name="Bench") for i in range(completions)]
+        custom_habits = [CustomHabit(description=f"Custom {i}", habit_owner_id=login["user_id"]) for i in range(completions)]
+        db.session.add_all(preset_habits + custom_habits)
+        db.session.commit()
+        preset_ids = [habit.id for habit in preset_habits]
+        custom_ids = [habit.id for habit in custom_habits]
+
+    client.post(f"/habit_lists/{habit_list_id}/habits", json={"preset_habit_ids": preset_ids}, headers=headers)
+    client.post(f"/habit_lists/{habit_list_id}/custom_habits", json={"custom_habit_ids": custom_ids}, headers=headers)
+
+    commits = 0
+
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    with app.app_context():
+        event.listen(db.engine, "commit", count_commit)
+
+    for kind, ids in (("habits", preset_ids), ("custom_habits", custom_ids)):
+        commits = 0
+        latencies = []
+
+        for habit_id in ids:
+            start = time.perf_counter()
+            response = client.post(f"/habit_lists/{habit_list_id}/{kind}/{habit_id}/complete", headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.get_json()
+
+        latencies.sort()
+        print(
+            f"{kind:>14}: {commits / len(ids):.2f} commits/request, "
+            f"p50 {latencies[len(latencies) // 2]:.2f}ms, p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
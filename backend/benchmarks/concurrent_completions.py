@@ -0,0 +1,106 @@
+"""
+Benchmark concurrent stat changes for a single user.
+
+Compares the atomic UPDATE ... RETURNING of User.apply_stat_changes
+with a read-modify-write serialized by a lock, and with an unprotected
+read-modify-write that shows the lost updates.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrent_completions [threads] [completions_per_thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+tmp = tempfile.mkdtemp()
+os.environ["REPOSITORY"] = "db"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+from sqlalchemy.orm.exc import StaleDataError
+from src import create_app
+from src.models import db
+from src.models.user import User
+
+XP_PER_COMPLETION = 10
+
+
+def atomic(user_id: str, lock: threading.Lock) -> None:
+    """One completion with the atomic stat-mutation API"""
+    User.apply_stat_changes(user_id, xp=XP_PER_COMPLETION, hp=15, habits_completed=1)
+    db.session.commit()
+
+
+def complete(user: User) -> None:
+    """Apply one completion to a User in memory, the way it was done before apply_stat_changes"""
+    user.total_xp += XP_PER_COMPLETION
+    user.habits_completed += 1
+    user.check_level_up()
+    user.recover_hp(15)
+
+
+def locked(user_id: str, lock: threading.Lock) -> None:
+    """One completion as a read-modify-write serialized by a lock"""
+    with lock:
+        user = db.session.get(User, user_id)
+        complete(user)
+        db.session.commit()
+
+
+def unprotected(user_id: str, lock: threading.Lock) -> None:
+    """One completion as a read-modify-write with nothing but the version check"""
+    user = db.session.get(User, user_id)
+    complete(user)
+
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+
+
+def run(app, strategy, threads: int, completions: int) -> None:
+    with app.app_context():
+        user = User(email=f"{strategy.__name__}@example.com", password="bench", username=strategy.__name__)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    lock = threading.Lock()
+
+    def worker():
+        with app.app_context():
+            for _ in range(completions):
+                strategy(user_id, lock)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for future in [executor.submit(worker) for _ in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        applied = user.habits_completed
+
+    total = threads * completions
+    print(
+        f"{strategy.__name__:>12}: {total / elapsed:8.0f} completions/s, "
+        f"{applied}/{total} applied, {total - applied} lost"
+    )
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    completions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    app = create_app()
+
+    for strategy in (atomic, locked, unprotected):
+        run(app, strategy, threads, completions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark conditional GETs on a replayed client session.
+
+Replays the requests of a client going through the app's screens: the
+catalog, the leaderboard, the user's profile and habit lists. Every
+few screens the user completes a habit. The session is replayed by a
+client that ignores ETags and by one that keeps its responses and sends
+If-None-Match, each on a fresh database seeded the same way. Reports
+the response bytes and the CPU time of the GET requests, the lowest of
+REPEATS replays of each client, run alternately.
+
+Usage (from the backend directory):
+    python -m benchmarks.conditional_get [screens] [users]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from benchmarks.catalog import DATA_FILE
+
+# A habit is completed every this many screens
+SCREENS_PER_COMPLETION = 5
+# Replays of each client, the CPU time is noisy
+REPEATS = 3
+
+
+def seed(app, users: int, habits: int) -> dict:
+    """Load the catalog, users for the leaderboard, and a user with a habit list of preset habits"""
+    from src.models import db
+    from src.models.category import Category
+    from src.models.habit_list import HabitList, HabitListItem
+    from src.models.preset_habit import PresetHabit
+    from src.models.user import User
+    from src.services.catalog import catalog
+    from src.services.leaderboard import rebuild_leaderboard
+
+    with open(DATA_FILE) as file:
+        data = json.load(file)
+
+    for category in data["categories"]:
+        db.session.add(Category(category["name"]))
+        db.session.add_all(PresetHabit(description=description, category_name=category["name"])
+                           for description in category["habits"])
+
+    db.session.execute(insert(User), [{
+        "id": str(uuid.uuid4()), "email": f"user{i}@example.com", "username": f"user{i}",
+        "password_hash": "-", "total_xp": i * 37, "version": 1,
+    } for i in range(users)])
+
+    user = User(email="bench@example.com", password="bench", username="bench")
+    db.session.add(user)
+    db.session.flush()
+    habit_list = HabitList(name="Morning", list_owner_id=user.id)
+    db.session.add(habit_list)
+    db.session.commit()
+
+    habit_ids = [habit.id for habit in PresetHabit.get_all()[:habits]]
+    HabitListItem.add_habits(habit_list.id, "preset", habit_ids)
+    catalog.reload()
+    rebuild_leaderboard()
+
+    return {"user": user.id, "habit_list": habit_list.id, "habits": habit_ids,
+            "category": data["categories"][0]["name"],
+            "headers": {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}}
+
+
+def replay(app, screens: int, users: int, conditional: bool) -> tuple[int, int, float, int]:
+    """Returns the GET requests, the 304s, their CPU seconds and response bytes"""
+    from src.models import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ids = seed(app, users, screens // SCREENS_PER_COMPLETION)
+        client = app.test_client()
+        headers = ids["headers"]
+        urls = [
+            "/categories/", "/preset_habits/", f"/categories/{ids['category']}/preset_habits",
+            "/users/leaderboard", "/users/leaderboard/me", f"/users/{ids['user']}",
+            "/habit_lists/user", f"/habit_lists/{ids['habit_list']}",
+        ]
+        etags: dict[str, str] = {}
+        requests = not_modified = size = 0
+        cpu = 0.0
+
+        for screen in range(screens):
+            if screen and screen % SCREENS_PER_COMPLETION == 0:
+                habit_id = ids["habits"][screen // SCREENS_PER_COMPLETION - 1]
+                response = client.post(f"/habit_lists/{ids['habit_list']}/habits/{habit_id}/complete", headers=headers)
+                assert response.status_code == 200, response.get_json()
+
+            for url in urls:
+                request_headers = dict(headers)
+                if conditional and url in etags:
+                    request_headers["If-None-Match"] = f'"{etags[url]}"'
+
+                start = time.process_time()
+                response = client.get(url, headers=request_headers)
+                cpu += time.process_time() - start
+                assert response.status_code in (200, 304)
+                requests += 1
+                not_modified += response.status_code == 304
+                size += len(response.data)
+
+                if response.get_etag()[0]:
+                    etags[url] = response.get_etag()[0]
+
+    return requests, not_modified, cpu, size
+
+
+def main():
+    screens = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    os.environ["REPOSITORY"] = "db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    import src.persistence
+    from src import create_app
+    from src.persistence.db import DBRepository
+
+    app = create_app()
+    src.persistence.repo = DBRepository()
+
+    print(f"{screens} screens, a completion every {SCREENS_PER_COMPLETION}, {users} users")
+    print(f"{'client':>12} {'requests':>9} {'304s':>6} {'CPU s':>7} {'bytes':>10}")
+
+    results = {}
+    for _ in range(REPEATS):
+        for name, conditional in (("no ETags", False), ("ETags", True)):
+            result = replay(app, screens, users, conditional)
+            results[name] = min(results.get(name, result), result, key=lambda r: r[2])
+
+    for name, (requests, not_modified, cpu, size) in results.items():
+        print(f"{name:>12} {requests:9} {not_modified:6} {cpu:7.2f} {size:10}")
+
+    (_, _, cpu_before, size_before), (_, _, cpu_after, size_after) = results.values()
+    print(f"saved {size_before - size_after} bytes ({1 - size_after / size_before:.0%}), "
+          f"{cpu_before - cpu_after:.2f} CPU s ({1 - cpu_after / cpu_before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
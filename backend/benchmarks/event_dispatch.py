@@ -0,0 +1,75 @@
+"""
+Benchmark the request path cost and the traffic of user_update bursts.
+
+Connects a Socket.IO test client per user and has every user complete a
+number of habits in a row, each completion emitting a user_update. The
+events are first emitted by the requests themselves, as before, then
+queued to the coalescing dispatcher and flushed once, like a window of
+the background task. Reports the time spent on the request path, and the
+frames and bytes the clients received.
+
+Usage (from the backend directory):
+    python -m benchmarks.event_dispatch [users] [updates_per_user]
+"""
+
+from datetime import datetime
+import json
+import sys
+import time
+from flask_jwt_extended import create_access_token
+from src import create_app, socketio
+from src.services.notifications import dispatcher, emit_to_user
+
+
+def user_data(user_id: str, xp: int) -> dict:
+    return {"id": user_id, "username": f"user-{user_id}", "level": 7, "current_xp": xp, "xp_to_next_level": 900,
+            "hp": 80, "max_hp": 100, "streak": 12, "timezone": "US/Eastern", "is_admin": False,
+            "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 10, 18, 12)}
+
+
+def burst(user_ids, updates: int) -> float:
+    start = time.perf_counter()
+    for xp in range(updates):
+        for user_id in user_ids:
+            emit_to_user("user_update", {"user_id": user_id, "user_data": user_data(user_id, xp)}, user_id,
+                         key=user_id)
+    return time.perf_counter() - start
+
+
+def report(label: str, clients, elapsed: float, events: int, flushed: float = 0) -> None:
+    frames = size = 0
+    for client in clients:
+        for event in client.get_received():
+            frames += 1
+            size += len(json.dumps(event["args"][0]))
+    print(f"{label:10} request path {elapsed / events * 1e6:6.1f}us/event, flush {flushed * 1e3:6.1f}ms, "
+          f"{frames:6} frames, {size / 1024:7.0f}KB received")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    app = create_app("src.config.TestingConfig")
+    user_ids = [str(i) for i in range(users)]
+
+    with app.app_context():
+        clients = [socketio.test_client(app, auth={"token": create_access_token(identity=user_id)})
+                   for user_id in user_ids]
+
+        report("emit", clients, burst(user_ids, updates), users * updates)
+
+        dispatcher.running = True
+        try:
+            elapsed = burst(user_ids, updates)
+            start = time.perf_counter()
+            dispatcher.flush()
+            flushed = time.perf_counter() - start
+        finally:
+            dispatcher.running = False
+
+        report("dispatcher", clients, elapsed, users * updates, flushed)
+        print(dispatcher.metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark the write latency of FileRepository as the dataset grows.
+
+Usage (from the backend directory):
+    python -m benchmarks.file_repository_writes [max_objects]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from src.models.preset_habit import PresetHabit
+from src.persistence.file import FileRepository
+
+WRITES = 200
+
+
+def measure(size: int, journaled: bool) -> tuple[float, float]:
+    """Returns the median and max latency (ms) of a save with `size` objects stored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = FileRepository(
+            filename=os.path.join(tmp, "data.json"),
+            journal_filename=os.path.join(tmp, "data.json.log"),
+            journaled=journaled,
+        )
+
+        for i in range(size):
+            repo.save(PresetHabit(description=f"Habit {i}", category_name="Fitness"), save_to_file=False)
+
+        # Start from a snapshot holding the whole dataset, as a restarted server would
+        repo.compact()
+
+        writes = WRITES if journaled else 5
+        latencies = []
+
+        for i in range(writes):
+            habit = PresetHabit(description=f"New habit {i}", category_name="Fitness")
+            start = time.perf_counter()
+            repo.save(habit)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        latencies.sort()
+        return latencies[len(latencies) // 2], latencies[-1]
+
+
+def main():
+    max_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [size for size in (1_000, 10_000, 100_000, 1_000_000) if size <= max_objects]
+
+    print(f"{'objects':>10} {'journal p50':>12} {'journal max':>12} {'rewrite p50':>12}")
+
+    for size in sizes:
+        p50, worst = measure(size, journaled=True)
+        # Rewriting the whole file at 1M objects takes minutes per write
+        rewrite = f"{measure(size, journaled=False)[0]:10.2f}ms" if size <= 100_000 else f"{'-':>12}"
+        print(f"{size:>10} {p50:10.3f}ms {worst:10.3f}ms {rewrite}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the in-memory leaderboard against the SQL queries it replaces.
+
+Usage (from the backend directory):
+    python -m benchmarks.leaderboard [users]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+tmp = tempfile.mkdtemp()
+os.environ["REPOSITORY"] = "db"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+from sqlalchemy import func, insert, select
+from src import create_app
+from src.models import db
+from src.models.user import User, level_for_xp, xp_for_level
+from src.services.leaderboard import leaderboard, rebuild_leaderboard
+
+
+def timed(label: str, fn, repeat: int = 100) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"{label:>40}: {(time.perf_counter() - start) / repeat * 1000:9.3f}ms")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    app = create_app()
+
+    with app.app_context():
+        rows = []
+        for i in range(users):
+            total_xp = random.randrange(1_000_000)
+            level = level_for_xp(total_xp)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "password_hash": "-",
+                "total_xp": total_xp,
+                "level": level,
+                "current_xp": total_xp - xp_for_level(level),
+                "version": 1,
+            })
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+
+        user_id = rows[users // 2]["id"]
+        total_xp = rows[users // 2]["total_xp"]
+        del rows
+
+        start = time.perf_counter()
+        rebuild_leaderboard()
+        print(f"rebuild of {len(leaderboard)} users: {time.perf_counter() - start:.2f}s")
+
+        timed("SQL top 10 by level, current_xp", lambda: db.session.execute(
+            select(User.id, User.username, User.level, User.current_xp)
+            .order_by(User.level.desc(), User.current_xp.desc()).limit(10)
+        ).all(), repeat=5)
+        timed("SQL top 10 by indexed total_xp", lambda: db.session.execute(
+            select(User.id, User.username, User.level, User.current_xp)
+            .order_by(User.total_xp.desc()).limit(10)
+        ).all())
+        timed("SQL page 50,000", lambda: db.session.execute(
+            select(User.id, User.username, User.level, User.current_xp)
+            .order_by(User.total_xp.desc()).offset(500_000).limit(10)
+        ).all(), repeat=5)
+        timed("SQL rank", lambda: db.session.execute(
+            select(func.count()).where(User.total_xp > total_xp)
+        ).scalar(), repeat=5)
+
+        timed("memory top 10", lambda: leaderboard.top(10), repeat=10_000)
+        timed("memory page 50,000", lambda: leaderboard.page(50_000, 10), repeat=10_000)
+        timed("memory rank", lambda: leaderboard.rank(user_id), repeat=10_000)
+        timed("memory around me", lambda: leaderboard.around(user_id, 5), repeat=10_000)
+        timed("memory update", lambda: leaderboard.update(
+            user_id, random.randrange(1_000_000), username="user", level=1, XP=0
+        ), repeat=10_000)
+
+
+if __name__ == "__main__":
+    main()
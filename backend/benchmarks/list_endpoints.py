@@ -0,0 +1,81 @@
+"""
+Benchmark GET /preset_habits/ as one JSON array, a page and an NDJSON stream.
+
+Fills an SQLite database with preset habits, then measures for each mode
+the time to the first byte, the time to the last byte and the peak Python
+memory (tracemalloc) of the request.
+
+Usage (from the backend directory):
+    python -m benchmarks.list_endpoints [objects]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from src import create_app
+from src.models import db
+from src.models.category import Category
+from src.models.preset_habit import PresetHabit
+from src.persistence.db import DBRepository
+
+MODES = {
+    "full list": "/preset_habits/",
+    "page of 100": "/preset_habits/?limit=100",
+    "ndjson stream": "/preset_habits/?stream=ndjson",
+}
+
+
+def measure(client, url: str) -> tuple[float, float, float, int]:
+    """Returns the time to the first and last byte (ms), the peak memory (MB) and the size (bytes) of a response"""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    response = client.get(url, buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks, b""))
+    first = time.perf_counter() - start
+    size += sum(len(chunk) for chunk in chunks)
+    response.close()
+
+    last = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return first * 1000, last * 1000, peak / 1_000_000, size
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    tmp = tempfile.mkdtemp()
+    os.environ["REPOSITORY"] = "db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+    import src.persistence
+    app = create_app()
+
+    with app.app_context():
+        src.persistence.repo = DBRepository()
+        db.create_all()
+        db.session.add(Category("Fitness"))
+        db.session.add_all(
+            PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(objects)
+        )
+        db.session.commit()
+        db.session.remove()
+
+        client = app.test_client()
+
+        print(f"{objects} preset habits")
+        print(f"{'mode':>14} {'first byte ms':>14} {'last byte ms':>13} {'peak MB':>8} {'bytes':>10}")
+
+        for mode, url in MODES.items():
+            first, last, peak, size = measure(client, url)
+            db.session.remove()
+            print(f"{mode:>14} {first:14.1f} {last:13.1f} {peak:8.1f} {size:10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark the latency of non-auth requests during a login storm.
+
+Starts the app on an eventlet WSGI server in a subprocess, like
+`gunicorn -k eventlet -w 1` does, then runs concurrent logins against
+it while a probe measures GET /categories. With --inline the passwords
+are hashed on the event loop, like before they were moved to native
+threads. Needs eventlet installed.
+
+Usage (from the backend directory):
+    python -m benchmarks.login_storm [--inline] [login_threads] [seconds]
+"""
+
+import sys
+
+if __name__ == "__main__" and "serve" in sys.argv:
+    import eventlet
+
+    eventlet.monkey_patch()
+
+import http.client
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+PORT = 5055
+
+
+def serve(inline: bool) -> None:
+    """Run the app on an eventlet server until killed"""
+    import eventlet.wsgi
+    from src import create_app
+    from src.models.user import User
+    from src.services import passwords
+
+    if inline:
+        passwords._run = lambda fn, *args: fn(*args)
+
+    app = create_app()
+
+    with app.app_context():
+        # One user per login thread, concurrent logins of one user conflict on its version
+        for i in range(int(os.environ["LOGIN_THREADS"])):
+            User.create({"email": f"storm{i}@example.com", "password": "storm", "username": f"storm{i}"})
+
+    eventlet.wsgi.server(eventlet.listen(("127.0.0.1", PORT)), app, log_output=False)
+
+
+def request(method: str, path: str, body: dict | None = None) -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+    headers = {"Content-Type": "application/json"} if body else {}
+    connection.request(method, path, body=json.dumps(body) if body else None, headers=headers)
+    status = connection.getresponse().status
+    connection.close()
+    return status
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    inline = "--inline" in sys.argv
+    login_threads = int(args[0]) if args else 16
+    seconds = float(args[1]) if len(args) > 1 else 10
+
+    tmp = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "REPOSITORY": "db",
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        "BCRYPT_LOG_ROUNDS": "12",
+        "LOGIN_THREADS": str(login_threads),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.login_storm", "serve"] + (["--inline"] if inline else []),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        for _ in range(100):
+            try:
+                request("GET", "/categories/")
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        stop = time.monotonic() + seconds
+        logins = 0
+
+        def storm(i: int):
+            nonlocal logins
+            while time.monotonic() < stop:
+                assert request("POST", "/login", {"email": f"storm{i}@example.com", "password": "storm"}) == 200
+                logins += 1
+
+        threads = [threading.Thread(target=storm, args=(i,)) for i in range(login_threads)]
+        for thread in threads:
+            thread.start()
+
+        latencies = []
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            request("GET", "/categories/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        print(
+            f"{'inline' if inline else 'thread pool'}: {logins / seconds:.1f} logins/s, "
+            f"{len(latencies)} probes, GET /categories p50 {latencies[len(latencies) // 2]:.1f}ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:.1f}ms, max {latencies[-1]:.1f}ms"
+        )
+
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    if "serve" in sys.argv:
+        serve("--inline" in sys.argv)
+    else:
+        main()
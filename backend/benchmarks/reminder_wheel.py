@@ -0,0 +1,67 @@
+"""
+Benchmark the reminder timing wheel at a million pending timers.
+
+Schedules one timer per habit spread over the next day, like reminders
+of habits in every timezone, cancels half of them as if the habits were
+completed, then advances the wheel one tick per second through the day.
+
+Usage (from the backend directory):
+    python -m benchmarks.reminder_wheel [timers]
+"""
+
+import random
+import resource
+import sys
+import time
+import uuid
+from src.services.timing_wheel import TimingWheel
+
+DAY = 24 * 3600
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    timers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    keys = [str(uuid.uuid4()) for _ in range(timers)]
+    # Reminders fall on the quarter hours timezones start their day at
+    ticks = [rng.randrange(0, DAY // 900) * 900 + rng.randrange(0, 60) for _ in range(timers)]
+    wheel = TimingWheel(now=0)
+    rss = rss_mb()
+
+    start = time.perf_counter()
+    for key, tick in zip(keys, ticks):
+        wheel.schedule(key, tick)
+    elapsed = time.perf_counter() - start
+    print(f"schedule: {elapsed / timers * 1e9:7.0f}ns/timer, {elapsed:.2f}s total, "
+          f"+{rss_mb() - rss:.0f}MB max RSS for {len(wheel)} timers")
+
+    cancelled = keys[::2]
+    start = time.perf_counter()
+    for key in cancelled:
+        wheel.cancel(key)
+    elapsed = time.perf_counter() - start
+    print(f"cancel:   {elapsed / len(cancelled) * 1e9:7.0f}ns/timer, {len(wheel)} left")
+
+    tick_times = []
+    fired = 0
+    start = time.perf_counter()
+    for now in range(1, DAY + 1):
+        tick_start = time.perf_counter()
+        fired += len(wheel.advance(now))
+        tick_times.append(time.perf_counter() - tick_start)
+    elapsed = time.perf_counter() - start
+
+    tick_times.sort()
+    busy = [t for t in tick_times if t > 0]
+    print(f"advance:  {DAY} ticks in {elapsed:.2f}s, {fired} fired, "
+          f"p50 {tick_times[len(tick_times) // 2] * 1e6:.1f}us, "
+          f"p99 {tick_times[int(len(tick_times) * 0.99)] * 1e6:.1f}us, "
+          f"max {busy[-1] * 1e3:.1f}ms per tick")
+
+
+if __name__ == "__main__":
+    main()
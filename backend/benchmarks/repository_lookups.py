@@ -0,0 +1,76 @@
+"""
+Benchmark primary-key lookups of MemoryRepository against the previous
+list-based implementation.
+
+Usage (from the backend directory):
+    python -m benchmarks.repository_lookups [max_objects]
+"""
+
+import random
+import sys
+import time
+from src.models.preset_habit import PresetHabit
+from src.persistence.memory import MemoryRepository
+
+OPERATIONS = 100
+
+
+class ListRepository:
+    """The list-based storage MemoryRepository used before"""
+
+    def __init__(self) -> None:
+        self.data: dict[str, list] = {}
+
+    def get(self, model_name: str, obj_id: str):
+        for obj in self.data.get(model_name, []):
+            if obj.id == obj_id:
+                return obj
+        return None
+
+    def save(self, obj):
+        self.data.setdefault(obj.__class__.__name__.lower(), []).append(obj)
+
+    def delete(self, obj) -> bool:
+        objs = self.data[obj.__class__.__name__.lower()]
+        if obj in objs:
+            objs.remove(obj)
+            return True
+        return False
+
+
+def timed(operation, objs) -> float:
+    """Returns the mean latency (µs) of running operation over objs"""
+    start = time.perf_counter()
+    for obj in objs:
+        operation(obj)
+    return (time.perf_counter() - start) / len(objs) * 1_000_000
+
+
+def main():
+    max_objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000) if size <= max_objects]
+    habits = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(max(sizes))]
+
+    print(f"{'objects':>10} {'':>6} {'list get':>12} {'dict get':>12} {'list delete':>12} {'dict delete':>12}")
+
+    for size in sizes:
+        list_repo, dict_repo = ListRepository(), MemoryRepository()
+        for habit in habits[:size]:
+            list_repo.save(habit)
+            dict_repo.save(habit)
+
+        sample = random.sample(habits[:size], OPERATIONS)
+
+        list_get = timed(lambda obj: list_repo.get("presethabit", obj.id), sample)
+        dict_get = timed(lambda obj: dict_repo.get("presethabit", obj.id), sample)
+        list_delete = timed(list_repo.delete, sample)
+        dict_delete = timed(dict_repo.delete, sample)
+
+        print(
+            f"{size:>10} {'µs/op':>6} {list_get:12.2f} {dict_get:12.2f} "
+            f"{list_delete:12.2f} {dict_delete:12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark the serialization of users to JSON.
+
+Serializes 10k users the way the user routes did, a hand written
+to_dict, a json.dumps/json.loads round trip for the datetimes and the
+json.dumps of the response, and with the model serializer, as
+to_dict and dumps_bytes, and as to_json straight from the attributes,
+with orjson and with the standard json module.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization [users]
+"""
+
+from datetime import datetime, timezone
+import json
+import sys
+import time
+import uuid
+from sqlalchemy import insert, select
+from src import create_app
+from src.models import db, serialization
+from src.models.serialization import dumps_bytes, serializer_for
+from src.models.user import User
+
+REPEAT = 3
+
+
+def old_to_dict(user: User) -> dict:
+    """The hand written User.to_dict the models had"""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "max_hp": user.max_hp,
+        "hp": user.hp,
+        "level": user.level,
+        "current_xp": user.current_xp,
+        "total_xp": user.total_xp,
+        "xp_to_next_level": user.xp_to_next_level,
+        "habits_completed": user.habits_completed,
+        "streak": user.streak,
+        "strenght": user.strenght,
+        "vitality": user.vitality,
+        "dexterity": user.dexterity,
+        "intelligence": user.intelligence,
+        "luck": user.luck,
+        "last_login": user.last_login,
+        "timezone": user.timezone,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat()
+    }
+
+
+def old_default_serializer(obj):
+    """The default_serializer the routes had"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def old_route(user: User) -> bytes:
+    """The serialization of a user by GET /users/<id> before"""
+    data = json.loads(json.dumps(old_to_dict(user), default=old_default_serializer))
+    return json.dumps(data, sort_keys=True).encode()
+
+
+def timed(serialize, users) -> float:
+    """Returns the best throughput (users/s) of serializing every user one by one"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for user in users:
+            serialize(user)
+        best = min(best, time.perf_counter() - start)
+    return len(users) / best
+
+
+def timed_list(serialize, users) -> float:
+    """Returns the best throughput (users/s) of serializing the users as one array"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        serialize(users)
+        best = min(best, time.perf_counter() - start)
+    return len(users) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    app = create_app("src.config.TestingConfig")
+
+    with app.app_context():
+        db.create_all()
+        now = datetime.now(timezone.utc)
+        db.session.execute(insert(User), [{
+            "id": str(uuid.uuid4()),
+            "email": f"user{i}@example.com",
+            "username": f"user{i}",
+            "password_hash": "-",
+            "last_login": now,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+        } for i in range(count)])
+        db.session.commit()
+        users = db.session.scalars(select(User)).all()
+
+        run(users)
+
+
+def run(users: list[User]):
+    """Print the throughput of every way of serializing the users"""
+    serializer = serializer_for(User)
+    orjson = serialization.orjson
+
+    print(f"{len(users)} users, {'orjson ' + orjson.__version__ if orjson else 'no orjson'}")
+    print(f"{'':>38} {'users/s':>10}")
+
+    results = {
+        "before: to_dict, round trip, dumps": timed(old_route, users),
+        "before, list": timed_list(lambda objs: json.dumps(
+            [json.loads(json.dumps(old_to_dict(user), default=old_default_serializer)) for user in objs],
+            sort_keys=True).encode(), users),
+    }
+
+    for name, module in (("orjson", orjson), ("json", None)):
+        if name == "orjson" and orjson is None:
+            continue
+        serialization.orjson = module
+        results[f"{name}: to_dict, dumps_bytes"] = timed(lambda user: dumps_bytes(user.to_dict()), users)
+        results[f"{name}: to_json"] = timed(serializer.to_json, users)
+        results[f"{name}: to_json_list"] = timed_list(serializer.to_json_list, users)
+
+    serialization.orjson = orjson
+    baseline = results["before: to_dict, round trip, dumps"]
+
+    for name, rate in results.items():
+        print(f"{name:>38} {rate:10.0f} {rate / baseline:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
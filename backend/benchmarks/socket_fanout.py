@@ -0,0 +1,64 @@
+"""
+Benchmark the fan-out of a user_update event to connected clients.
+
+Connects Socket.IO test clients for a number of users, one of them an
+admin, and emits one user_update per user, first broadcast to every
+socket as before, then to the rooms of the user and the admins. Counts
+the messages and payload bytes the clients received and the time spent
+emitting.
+
+Usage (from the backend directory):
+    python -m benchmarks.socket_fanout [users]
+"""
+
+import json
+import sys
+import time
+from flask_jwt_extended import create_access_token
+from src import create_app, socketio
+from src.services.notifications import emit_to_user
+
+
+def payload(user_id: str) -> dict:
+    return {"user_id": user_id, "user_data": {
+        "id": user_id, "username": f"user-{user_id}", "level": 7, "current_xp": 420,
+        "xp_to_next_level": 900, "hp": 80, "max_hp": 100, "streak": 12, "timezone": "US/Eastern"}}
+
+
+def drain(clients) -> tuple:
+    messages = size = 0
+    for client in clients:
+        for event in client.get_received():
+            messages += 1
+            size += len(json.dumps(event["args"][0]))
+    return messages, size
+
+
+def run(label: str, clients, user_ids, emit) -> None:
+    start = time.perf_counter()
+    for user_id in user_ids:
+        emit(user_id)
+    elapsed = time.perf_counter() - start
+    messages, size = drain(clients)
+    print(f"{label:9} {len(user_ids)} events: {messages:7} messages, {size / 1024:8.0f}KB received, "
+          f"{messages / len(user_ids):6.1f} messages/event, {elapsed / len(user_ids) * 1e6:7.0f}us/event")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = create_app("src.config.TestingConfig")
+    user_ids = [str(i) for i in range(users)]
+
+    with app.app_context():
+        clients = [
+            socketio.test_client(app, auth={"token": create_access_token(
+                identity=user_id, additional_claims={"is_admin": user_id == "0"})})
+            for user_id in user_ids
+        ]
+
+        run("broadcast", clients, user_ids, lambda user_id: socketio.emit("user_update", payload(user_id)))
+        run("rooms", clients, user_ids, lambda user_id: emit_to_user("user_update", payload(user_id), user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the size of the user_update of a habit completion.
+
+Completes the habits of a habit list one by one, as a user would during
+their day, and encodes the user_update of each completion as before, the
+whole user, and as the changes since the previous update. Reports the
+bytes of the Socket.IO frames.
+
+Usage (from the backend directory):
+    python -m benchmarks.user_update_size [habits]
+"""
+
+import sys
+from socketio import packet
+from src import create_app
+from src.models import db
+from src.models.category import Category
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+from src.services.habit_completion import complete_habit
+from src.services.user_states import UserStates
+
+
+def frame_size(data) -> int:
+    """Get the bytes of the Socket.IO frame of a user_update"""
+    return len(packet.Packet(packet.EVENT, data=["user_update", data]).encode())
+
+
+def main():
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    app = create_app("src.config.TestingConfig")
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="test@example.com", password="password", username="testuser")
+        presets = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(habits)]
+        db.session.add_all([user, Category("Fitness"), *presets])
+        db.session.flush()
+        habit_list = HabitList(name="Morning", list_owner_id=user.id)
+        db.session.add(habit_list)
+        db.session.commit()
+        habit_list_id, habit_ids, user_id = habit_list.id, [habit.id for habit in presets], user.id
+        HabitListItem.add_habits(habit_list_id, "preset", habit_ids)
+
+        states = UserStates()
+        states.snapshot(user_id, User.get(user_id).to_dict())
+        full = delta = 0
+        changed = []
+
+        for habit_id in habit_ids:
+            user_data = complete_habit(habit_list_id, habit_id, "preset")
+            full += frame_size({"user_id": user_id, "user_data": user_data})
+            encoded = states.encode(user_id, user_data)
+            delta += frame_size(encoded)
+            changed.append(len(encoded["changes"]))
+
+        print(f"{habits} completions: full {full / habits:5.0f}B/update, delta {delta / habits:5.0f}B/update "
+              f"({delta / full:.0%}), {sum(changed) / habits:.1f} of {len(user_data)} fields changed on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark the request throughput of the app by number of gunicorn workers.
+
+Starts the app under gunicorn with 1, 2 and 4 workers sharing a file
+message queue, and has concurrent clients call GET /me/today for a few
+seconds. Then renames the user on one worker and checks that the
+leaderboard of every worker shows the new name, which only reaches the
+other workers through the message queue.
+
+The gthread worker is used, the eventlet one is not shipped with recent
+gunicorn releases. Throughput only scales up to the number of cores.
+
+Usage (from the backend directory):
+    python -m benchmarks.worker_scaling [clients] [seconds]
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PORT = 5056
+WORKER_COUNTS = (1, 2, 4)
+
+
+def seed() -> None:
+    """Create a user with 3 habit lists of 5 habits, and print their ID and an access token"""
+    from flask_jwt_extended import create_access_token
+    from src import create_app
+    from src.models import db
+    from src.models.category import Category
+    from src.models.habit_list import HabitList, HabitListItem
+    from src.models.preset_habit import PresetHabit
+    from src.models.user import User
+
+    app = create_app()
+
+    with app.app_context():
+        user = User(email="bench@example.com", password="bench", username="bench")
+        habits = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(5)]
+        db.session.add_all([user, Category("Fitness"), *habits])
+        db.session.flush()
+        habit_lists = [HabitList(name=f"List {i}", list_owner_id=user.id) for i in range(3)]
+        db.session.add_all(habit_lists)
+        db.session.commit()
+        user_id, habit_ids = user.id, [habit.id for habit in habits]
+
+        for habit_list in habit_lists:
+            HabitListItem.add_habits(habit_list.id, "preset", habit_ids)
+
+        print(json.dumps({"user_id": user_id, "token": create_access_token(identity=user_id)}))
+
+
+def request(method: str, path: str, token: str, body: dict | None = None) -> tuple[int, bytes]:
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    connection.request(method, path, body=json.dumps(body) if body else None, headers=headers)
+    response = connection.getresponse()
+    result = response.status, response.read()
+    connection.close()
+    return result
+
+
+def run(workers: int, env: dict, user: dict, clients: int, seconds: float) -> None:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-k", "gthread", "--threads", "4",
+         "-w", str(workers), "-b", f"127.0.0.1:{PORT}", "app:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        for _ in range(300):
+            try:
+                request("GET", "/me/today", user["token"])
+                break
+            except OSError:
+                time.sleep(0.2)
+        # Let every worker boot
+        time.sleep(2 * workers)
+
+        stop = time.monotonic() + seconds
+        done = [0] * clients
+
+        def load(i: int):
+            while time.monotonic() < stop:
+                assert request("GET", "/me/today", user["token"])[0] == 200
+                done[i] += 1
+
+        threads = [threading.Thread(target=load, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        username = f"renamed-{workers}"
+        request("PUT", f"/users/{user['user_id']}", user["token"], {"username": username})
+        time.sleep(0.5)
+        boards = [request("GET", "/users/leaderboard", user["token"])[1] for _ in range(8 * workers)]
+        up_to_date = sum(username.encode() in board for board in boards)
+
+        print(f"{workers} workers: {sum(done) / seconds:7.1f} requests/s, "
+              f"leaderboard up to date on {up_to_date}/{len(boards)} requests")
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    tmp = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "REPOSITORY": "db",
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        "SOCKETIO_MESSAGE_QUEUE": f"file://{os.path.join(tmp, 'socketio.queue')}",
+        "WORKER_LOCK_FILE": os.path.join(tmp, "worker.lock"),
+    }
+    seeded = subprocess.run([sys.executable, "-m", "benchmarks.worker_scaling", "seed"], env=env,
+                            capture_output=True, text=True, check=True)
+    user = json.loads(seeded.stdout.strip().splitlines()[-1])
+
+    print(f"{os.cpu_count()} cores, {clients} clients")
+    for workers in WORKER_COUNTS:
+        run(workers, env, user, clients, seconds)
+
+
+if __name__ == "__main__":
+    if "seed" in sys.argv:
+        seed()
+    else:
+        main()
@@ -0,0 +1,16 @@
+"""
+gunicorn settings of the production server.
+
+More than one worker needs SOCKETIO_MESSAGE_QUEUE, for the Socket.IO
+events and the worker messages to reach every worker. Without it, the
+app runs in a single worker.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+worker_class = "eventlet"
+workers = int(os.getenv(
+    "WEB_CONCURRENCY", multiprocessing.cpu_count() if os.getenv("SOCKETIO_MESSAGE_QUEUE") else 1
+))
@@ -17,6 +17,8 @@ from src.models.category import Category
 from src.models.preset_habit import PresetHabit
 from src.models.custom_habit import CustomHabit
 from src.models.habit_list import HabitList
+from src.models.xp_bucket import XpBucket
+from src.models.sweep_checkpoint import SweepCheckpoint
 
 def create_app(config_class="src.config.DevelopmentConfig") -> Flask:
     """
@@ -30,17 +32,27 @@ def create_app(config_class="src.config.DevelopmentConfig") -> Flask:
     app.url_map.strict_slashes = False
     app.config.from_object(config_class)
 
+    from src.models import serialization
+    app.json = serialization.AppJSONProvider(app)
+
     from src.models import db
     db.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
-    socketio.init_app(app, cors_allowed_origins=["https://level-up-xp.onrender.com"])
+    from src.services.message_queue import create_client_manager
+    socketio.init_app(app, cors_allowed_origins=["https://level-up-xp.onrender.com"], json=serialization,
+                      client_manager=create_client_manager(app.config.get("SOCKETIO_MESSAGE_QUEUE")))
 
     register_extensions(app)
     register_routes(app)
     register_handlers(app)
 
     create_db_tables(app)
+    listen_to_message_queue(app)
+    load_leaderboard(app)
+    load_catalog(app)
+    register_commands(app)
+    start_background_tasks(app)
 
     return app
 
@@ -49,6 +61,61 @@ def create_db_tables(app: Flask) -> None:
     with app.app_context():
         db.create_all()
 
+def listen_to_message_queue(app: Flask) -> None:
+    """Start receiving from the message queue, before the first client connects, for the worker messages"""
+    if app.config.get("SOCKETIO_MESSAGE_QUEUE"):
+        socketio.server.manager_initialized = True
+        socketio.server.manager.initialize()
+
+def load_leaderboard(app: Flask) -> None:
+    """Rebuild the in-memory leaderboard from the repository"""
+    from src.services.leaderboard import rebuild_leaderboard
+    with app.app_context():
+        rebuild_leaderboard()
+
+def load_catalog(app: Flask) -> None:
+    """Load the snapshot of the categories and preset habits from the repository"""
+    from src.services.catalog import catalog
+    with app.app_context():
+        catalog.reload()
+
+def register_commands(app: Flask) -> None:
+    """Register the CLI commands for the Flask app"""
+    import click
+    from src.services.penalty_sweep import PENALTY_SWEEP_CHUNK_SIZE, run_due_penalty_sweeps
+
+    @app.cli.command("penalty-sweep")
+    @click.option("--at", type=click.DateTime(formats=["%Y-%m-%dT%H:%M", "%Y-%m-%d"]), default=None,
+                  help="UTC time to sweep the last deadlines of, now by default.")
+    @click.option("--chunk-size", type=int, default=PENALTY_SWEEP_CHUNK_SIZE,
+                  help="Users processed per transaction.")
+    def penalty_sweep(at, chunk_size):
+        """Penalize every user for the habits left incomplete at their last deadline."""
+        penalized = run_due_penalty_sweeps(at, chunk_size)
+        click.echo(f"Penalized {penalized} users")
+
+def start_background_tasks(app: Flask) -> None:
+    """Start the tasks that run alongside the Flask app"""
+    from src.services.workers import run_in_one_worker
+
+    # Tasks that run in one worker only
+    tasks = []
+
+    if app.config.get("PENALTY_SWEEP_SCHEDULED"):
+        from src.services.penalty_sweep import schedule_penalty_sweeps
+        tasks.append(schedule_penalty_sweeps)
+
+    if app.config.get("REMINDERS_ENABLED"):
+        from src.services.reminders import run_reminders
+        tasks.append(run_reminders)
+
+    if tasks:
+        socketio.start_background_task(run_in_one_worker, app, tasks)
+
+    if app.config.get("EVENT_DISPATCHER_ENABLED"):
+        from src.services.notifications import run_dispatcher
+        socketio.start_background_task(run_dispatcher, app)
+
 def register_extensions(app: Flask) -> None:
     """Register the extensions for the Flask app"""
     cors.init_app(app, resources={r"/*": {"origins": ["https://level-up-xp.onrender.com"]}})
@@ -63,6 +130,8 @@ def register_routes(app: Flask) -> None:
     from src.routes.habit_lists import habit_lists_bp
     from src.routes.admin import admin_bp
     from src.routes.auth import auth_bp
+    from src.routes.me import me_bp
+    from src.routes.sockets import handle_connect, handle_user_resync
 
     # Register the blueprints in the app
     app.register_blueprint(users_bp)
@@ -72,6 +141,11 @@ def register_routes(app: Flask) -> None:
     app.register_blueprint(habit_lists_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(me_bp)
+
+    # Registered on every app, a decorator would only reach the server of the first one
+    socketio.on_event("connect", handle_connect)
+    socketio.on_event("user_resync", handle_user_resync)
 
 def register_handlers(app: Flask) -> None:
     """Register the error handlers for the Flask app."""
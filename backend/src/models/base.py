@@ -6,14 +6,18 @@ from abc import abstractmethod
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.orm import relationship
+from src.models.serialization import serializer_for
 from utils.constants import REPOSITORY_ENV_VAR
 import os
 
 class Base(DeclarativeBase):
 
+    # The attributes to_dict returns, in order
+    SERIALIZED_FIELDS: tuple[str, ...] = ()
+
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     def __init__(
         self,
@@ -68,6 +72,51 @@ class Base(DeclarativeBase):
 
         return repo.get_all(cls.__name__.lower())
 
+    @classmethod
+    def get_page(cls, limit: int, after: str | None = None) -> list["Any"]:
+        """
+        Get a page of the objects of a class, in ID order
+
+        :param limit: The number of objects at most.
+        :param after: The ID of the last object of the previous page.
+        """
+        from src.persistence import repo
+
+        return repo.get_page(cls, limit, after)
+
+    @classmethod
+    def iter_all(cls, after: str | None = None):
+        """
+        Iterate over the objects of a class in ID order, a batch at a time
+
+        :param after: The ID to start after.
+        """
+        from src.persistence import repo
+
+        return repo.iter_all(cls, after)
+
+    @classmethod
+    def find_by(cls, **equals) -> list["Any"]:
+        """
+        This is a common method to get all objects of a class
+        whose fields equal the given values
+
+        The repository uses its indexes for the lookup
+        """
+        from src.persistence import repo
+
+        return repo.find_by(cls, **equals)
+
+    @classmethod
+    def exists_by(cls, **equals) -> bool:
+        """
+        This is a common method to check if an object of a class
+        with the given field values exists
+        """
+        from src.persistence import repo
+
+        return repo.exists_by(cls, **equals)
+
     @classmethod
     def delete(cls, id) -> bool:
         """
@@ -86,9 +135,14 @@ class Base(DeclarativeBase):
 
         return repo.delete(obj)
 
-    @abstractmethod
     def to_dict(self) -> dict:
-        """Returns the dictionary representation of the object"""
+        """
+        Returns the dictionary representation of the object
+
+        It has the SERIALIZED_FIELDS of the class, with datetimes
+        in ISO format, so it is JSON serializable as is
+        """
+        return serializer_for(type(self)).to_dict(self)
 
     @staticmethod
     @abstractmethod
@@ -7,6 +7,8 @@ class Category(db.Model):
 
     __tablename__ = "categories"
 
+    SERIALIZED_FIELDS = ("name",)
+
     name = db.Column(db.String(128), primary_key=True, unique=True, nullable=False)
     habits = db.relationship("PresetHabit", back_populates="category")
 
@@ -22,14 +24,6 @@ class Category(db.Model):
         Return a string representation of this Category.
         """
         return f"<Category {self.name}"
-
-    def to_dict(self) -> dict:
-        """
-        Convert this Category to a dictionary.
-        """
-        return {
-            "name": self.name
-        }
     
     @staticmethod
     def get_all() -> list["Category"]:
@@ -49,9 +43,9 @@ class Category(db.Model):
         """
         from src.persistence import repo
 
-        category: "Category" = repo.get_for_category(name)
+        categories: list["Category"] = repo.find_by(Category, name=name)
 
-        return category
+        return categories[0] if categories else None
     
     @staticmethod
     def create(name: str) -> "Category":
@@ -59,9 +53,11 @@ class Category(db.Model):
         Create a new Category instance and save it to the database.
         """
         from src.persistence import repo
+        from src.services.catalog import refresh_catalog
 
         category = Category(name)
         repo.save(category)
+        refresh_catalog()
         
         return category
     
@@ -71,10 +67,12 @@ class Category(db.Model):
         Delete a Category instance by its name.
         """
         from src.persistence import repo
+        from src.services.catalog import refresh_catalog
 
         category = Category.get(name)
         if category is None:
             return False
         
         repo.delete(category)
+        refresh_catalog()
         return True
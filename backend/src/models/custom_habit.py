@@ -9,8 +9,12 @@ class CustomHabit(db.Model):
 
     __tablename__ = "custom_habits"
 
+    SERIALIZED_FIELDS = (
+        "id", "description", "habit_owner_id", "xp_reward", "created_at", "updated_at"
+    )
+
     description = db.Column(db.String(200), nullable=False)
-    habit_owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    habit_owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False, index=True)
     xp_reward = db.Column(db.Integer, nullable=False, default=50)
 
     habit_owner = db.relationship("User", back_populates="custom_habits", lazy=True)
@@ -31,19 +35,6 @@ class CustomHabit(db.Model):
         """
         return f"CustomHabit {self.description}"
 
-    def to_dict(self) -> dict:
-        """
-        Convert this CustomHabit to a dictionary.
-        """
-        return {
-            "id": self.id,
-            "description": self.description,
-            "habit_owner_id": self.habit_owner_id,
-            "xp_reward": self.xp_reward,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
-
     @staticmethod
     def create(data: dict) -> "CustomHabit":
         """
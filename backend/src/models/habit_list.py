@@ -1,9 +1,10 @@
-import pytz
 from . import db
 from src.models.user import User
 import uuid
-from datetime import datetime, time, timedelta
+from datetime import datetime, timedelta
 from flask import jsonify
+from sqlalchemy import func, select
+from src.services.deadlines import DEFAULT_TIMEZONE, deadlines, utc_now
 
 class HabitList(db.Model):
     """
@@ -12,9 +13,12 @@ class HabitList(db.Model):
 
     __tablename__ = "habit_lists"
 
+    SERIALIZED_FIELDS = (
+        "id", "name", "list_owner_id", "created_at", "updated_at"
+    )
+
     name = db.Column(db.String(200), nullable=True)
-    list_owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
-    completed_habits = db.Column(db.Integer, default=0)
+    list_owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False, index=True)
 
     list_owner = db.relationship("User", back_populates="habit_lists", lazy=True)
     habits = db.relationship("HabitListItem", back_populates="habit_list", lazy="dynamic")
@@ -26,7 +30,6 @@ class HabitList(db.Model):
         super().__init__(**kw)
         self.name = name
         self.list_owner_id = list_owner_id
-        self.completed_habits = 0
 
     def __repr__(self) -> str:
         """
@@ -34,161 +37,60 @@ class HabitList(db.Model):
         """
         return f"HabitList {self.name}"
 
-    def to_dict(self) -> dict:
-        """
-        Convert this HabitList to a dictionary.
-        """
-        return {
-            "id": self.id,
-            "name": self.name,
-            "list_owner_id": self.list_owner_id,
-            "completed_habits": self.completed_habits,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
-
-    def check_deadline_and_complete_habit(self, habit_list_item, xp_reward):
+    @staticmethod
+    def get_completion_reward(habit_list_item, xp_reward: int,
+                              zone_name: str = DEFAULT_TIMEZONE) -> tuple[int, int, bool]:
         """
-        Check if the habit is completed before the daily deadline and update the habit status.
+        Get the reward for completing a habit list item now.
 
-        This method checks if the habit is completed before the end of the day. If the habit is completed
-        on time, the user gains full XP and recovers HP. If the habit is completed late, the user loses HP
-        and gains reduced XP.
+        A habit added before the daily deadline and completed after it is late:
+        it rewards half the XP and no HP. Any other habit rewards the full XP
+        and recovers 15 HP.
 
         Args:
-            habit_list_item (HabitListItem): The habit list item to be checked and updated.
-            xp_reward (int): The amount of XP to be rewarded for completing the habit.
-        """
-        from src.persistence import repo
-        est = pytz.timezone('US/Eastern')
-        now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-        now_est = now_utc.astimezone(est) # Change timezone to EST
-
-        # Set the daily deadline to 12am
-        deadline_est = datetime.combine(now_est.date(), time(0, 0)).replace(tzinfo=est)
-
-        # Check if habit was added before the deadline
-        if habit_list_item.created_at.astimezone(est) < deadline_est:
-
-            # Check if current time is past the deadline and habits is not completed
-            if now_est > deadline_est and not habit_list_item.habit_is_completed:
-               habit_list_item.is_late = True # Set is_late to True
-
-            if habit_list_item.is_late:
-
-                # If habit is completed late
-                habit_list_item.habit_is_completed = True
-                self.completed_habits +=1
-
-                reduced_xp = int(xp_reward * 0.5) # Reduce XP reward by half
-                self.list_owner.gain_xp(reduced_xp) # User gains reduced XP
-
-            else:
-                # User completed the habits in time
-                habit_list_item.habit_is_completed = True
-                self.completed_habits += 1
-
-                self.list_owner.gain_xp(xp_reward) # Gain full XP reward
-                self.list_owner.recover_hp(hp_points=15) # Recover HP if User lost HP
-
-        else:
-            # Habit was added after deadline
-            habit_list_item.habit_is_completed = True
-            self.completed_habits += 1
-
-            self.list_owner.gain_xp(xp_reward)
-            self.list_owner.recover_hp(hp_points=15)
-
-        repo.save(self)
-        repo.save(habit_list_item)
-
-    def check_incomplete_habits(self):
-        """
-        Check for incomplete habits and apply penalties.
-
-        This method checks if there are any incomplete habits for the current day.
-        If the current time is past the daily deadline (midnight EST), it iterates
-        through the habits and applies an HP penalty to the user for each incomplete habit.
-        """
-        from src.persistence import repo
-
-        now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-        est = pytz.timezone('US/Eastern')
-        now_est = now_utc.astimezone(est)  # Change timezone to EST
-
-        # Set the daily deadline to midnight EST
-        deadline_est = datetime.combine(now_est.date(), time(0, 0)).replace(tzinfo=est)
+            habit_list_item (HabitListItem): The habit list item to be completed.
+            xp_reward (int): The XP reward of the habit.
+            zone_name (str): The timezone of the list owner, their deadline is midnight there.
 
-        # Check if the current time is past the deadline
-        if now_est > deadline_est:
-            # Check if penalties have already been applied today
-            if self.list_owner.last_login and self.list_owner.last_login.date() >= now_est.date():
-                return
-
-            # Flag to check if HP dropped to 0
-            hp_is_zero = False
-
-            # Iterate through habits to check for incompletion
-            for habit_list_item in self.habits:
-                if not habit_list_item.habit_is_completed:
-                    # Habit was left incomplete
-                    self.list_owner.lose_hp(hp_points=25)  # HP penalty for user
-
-                    # Check if HP dropped to 0
-                    if self.list_owner.hp == 0:
-                        hp_is_zero = True
-
-            # Apply XP penalty
-            if hp_is_zero:
-                self.list_owner.lose_xp(xp_points=50)
-
-            # Update the last login date to indicate penalties have been applied
-            self.list_owner.last_login = now_est
-
-        repo.save(self.list_owner)
-        repo.save(self)
-
-    def complete_preset_habit(self, habit_id):
-        """
-        Complete a preset habit in the habit list.
-
-        :param habit_id: The ID of the preset habit to complete.
-        :raises ValueError: If the habit is not found or is already completed.
+        Returns:
+            tuple: The XP to gain, the HP to recover and whether the habit is late.
         """
-        from src.persistence import repo
+        now = utc_now()
 
-        habit_list_item = HabitListItem.query.filter_by(habit_list_id=self.id, preset_habit_id=habit_id).first()
+        # The deadline that started the owner's current day
+        deadline = deadlines.last_deadline(zone_name, now)
 
-        if not habit_list_item:
-            raise ValueError(f"Habit with ID {habit_id} not found in Habit List")
+        # Check if habit was added before the deadline
+        if habit_list_item.created_at < deadline:
 
-        if habit_list_item.habit_is_completed:
-            raise ValueError(f"Habit with ID {habit_id} is already completed")
+            # The habit is late if it was flagged so or the deadline has passed
+            if habit_list_item.is_late or now > deadline:
+                return int(xp_reward * 0.5), 0, True # Reduce XP reward by half
 
-        # Handle deadline and completion
-        self.check_deadline_and_complete_habit(habit_list_item,
-                                                habit_list_item.preset_habit.xp_reward)
+        return xp_reward, 15, False
 
-    def complete_custom_habit(self, habit_id):
+    @staticmethod
+    def count_incomplete_habits(owner_ids: list[str], deadline: datetime | None = None) -> list:
         """
-        Complete a custom habit in the habit list.
+        Count the incomplete habits of every habit list of some Users, in one grouped query.
 
-        :param habit_id: The ID of the custom habit to complete.
-        :raises ValueError: If the habit is not found or is already completed.
+        :param owner_ids: The IDs of the Users.
+        :param deadline: Only count habits added before it, a naive UTC datetime. All habits by default.
+        :return: (list_owner_id, count) rows of the lists with incomplete habits,
+            grouped by User and in list creation order.
         """
-        from src.persistence import repo
+        query = (
+            select(HabitList.list_owner_id, func.count(HabitListItem.id))
+            .join(HabitListItem, HabitListItem.habit_list_id == HabitList.id)
+            .where(HabitList.list_owner_id.in_(owner_ids), HabitListItem.habit_is_completed.isnot(True))
+            .group_by(HabitList.list_owner_id, HabitList.created_at, HabitList.id)
+            .order_by(HabitList.list_owner_id, HabitList.created_at, HabitList.id)
+        )
 
-        habit_list_item = HabitListItem.query.filter_by(habit_list_id=self.id, custom_habit_id=habit_id).first()
-
-        if not habit_list_item:
-            raise ValueError(f"Habit with ID {habit_id} not found in Habit List")
+        if deadline is not None:
+            query = query.where(HabitListItem.created_at < deadline)
 
-        if habit_list_item.habit_is_completed:
-            raise ValueError(f"Habit with ID {habit_id} is already completed")
-
-        # Handle deadline and completion
-        self.check_deadline_and_complete_habit(habit_list_item,
-                                                habit_list_item.custom_habit.xp_reward)
+        return db.session.execute(query).all()
 
     @staticmethod
     def create(data: dict) -> "HabitList":
@@ -274,7 +176,117 @@ class HabitList(db.Model):
 
     @classmethod
     def get_by_user_id(cls, user_id: str):
-        return cls.query.filter_by(list_owner_id=user_id).all()
+        return cls.find_by(list_owner_id=user_id)
+
+    @staticmethod
+    def get_owner_with_details_version(owner_id: str) -> tuple[User, tuple] | None:
+        """
+        Get a User with a version of the details of all their habit lists, loaded with one query.
+
+        The version is made of the number and last change of the lists, of
+        their items and of the preset and custom habits in them, so it
+        changes whenever get_details_by would return something else for them.
+
+        Args:
+            owner_id (str): The ID of the User.
+
+        Returns:
+            tuple: The User and the version, or None if the User is not found.
+        """
+        from src.models.custom_habit import CustomHabit
+        from src.models.preset_habit import PresetHabit
+
+        row = db.session.execute(
+            select(
+                User,
+                func.count(func.distinct(HabitList.id)),
+                func.max(HabitList.updated_at),
+                func.count(HabitListItem.id),
+                func.max(func.coalesce(HabitListItem.updated_at, HabitListItem.created_at)),
+                func.max(PresetHabit.updated_at),
+                func.max(CustomHabit.updated_at),
+            )
+            .outerjoin(HabitList, HabitList.list_owner_id == User.id)
+            .outerjoin(HabitListItem, HabitListItem.habit_list_id == HabitList.id)
+            .outerjoin(PresetHabit, PresetHabit.id == HabitListItem.preset_habit_id)
+            .outerjoin(CustomHabit, CustomHabit.id == HabitListItem.custom_habit_id)
+            .where(User.id == owner_id)
+            .group_by(User.id)
+        ).first()
+
+        if row is None:
+            return None
+
+        user, *version = row
+
+        return user, tuple(version)
+
+    @staticmethod
+    def get_details_by(*criteria) -> list[dict]:
+        """
+        Get habit lists with their habits, loaded with one query.
+
+        The lists are outer joined with their items and the preset or
+        custom habit of each item, so every list and habit is read in a
+        single round trip whatever the number of habits.
+
+        Args:
+            criteria: The WHERE criteria selecting the habit lists.
+
+        Returns:
+            list: The dictionary representations of the habit lists in creation order,
+                each with its habits under "habits".
+        """
+        from src.models.custom_habit import CustomHabit
+        from src.models.preset_habit import PresetHabit
+
+        rows = db.session.execute(
+            select(
+                HabitList,
+                HabitListItem,
+                func.coalesce(PresetHabit.description, CustomHabit.description),
+                func.coalesce(PresetHabit.xp_reward, CustomHabit.xp_reward),
+            )
+            .outerjoin(HabitListItem, HabitListItem.habit_list_id == HabitList.id)
+            .outerjoin(PresetHabit, PresetHabit.id == HabitListItem.preset_habit_id)
+            .outerjoin(CustomHabit, CustomHabit.id == HabitListItem.custom_habit_id)
+            .where(*criteria)
+            .order_by(HabitList.created_at, HabitList.id, HabitListItem.created_at, HabitListItem.id)
+        )
+
+        details = {}
+
+        for habit_list, item, description, xp_reward in rows:
+            if habit_list.id not in details:
+                details[habit_list.id] = {**habit_list.to_dict(), "habits": []}
+
+            if item is not None:
+                details[habit_list.id]["habits"].append({
+                    "id": item.id,
+                    "habit_id": item.preset_habit_id or item.custom_habit_id,
+                    "description": description,
+                    "type": "preset" if item.preset_habit_id else "custom",
+                    "xp_reward": xp_reward,
+                    "habit_is_completed": item.habit_is_completed,
+                    "is_late": item.is_late,
+                })
+
+        return list(details.values())
+
+    @staticmethod
+    def get_details(habit_list_id: str) -> dict | None:
+        """
+        Get a habit list with its habits, loaded with one query.
+
+        Args:
+            habit_list_id (str): The ID of the habit list.
+
+        Returns:
+            dict: The dictionary representation of the habit list with its habits, None if not found.
+        """
+        details = HabitList.get_details_by(HabitList.id == habit_list_id)
+
+        return details[0] if details else None
 
 class HabitListItem(db.Model):
     """
@@ -283,8 +295,13 @@ class HabitListItem(db.Model):
     """
     __tablename__ = "habit_list_items"
 
+    SERIALIZED_FIELDS = (
+        "id", "habit_list_id", "preset_habit_id", "custom_habit_id", "habit_is_completed",
+        "is_late", "created_at", "updated_at"
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    habit_list_id = db.Column(db.String(36), db.ForeignKey("habit_lists.id"), nullable=False)
+    habit_list_id = db.Column(db.String(36), db.ForeignKey("habit_lists.id"), nullable=False, index=True)
     preset_habit_id = db.Column(db.String(36), db.ForeignKey("preset_habits.id"), nullable=True)
     custom_habit_id = db.Column(db.String(36), db.ForeignKey("custom_habits.id"), nullable=True)
     habit_is_completed = db.Column(db.Boolean, default=False)
@@ -296,6 +313,12 @@ class HabitListItem(db.Model):
     preset_habit = db.relationship("PresetHabit", back_populates="habit_lists")
     custom_habit = db.relationship("CustomHabit", back_populates="habit_lists")
 
+    # A habit is in a list at most once, items of the other type have NULL there and never conflict
+    __table_args__ = (
+        db.UniqueConstraint("habit_list_id", "preset_habit_id", name="uq_habit_list_items_preset"),
+        db.UniqueConstraint("habit_list_id", "custom_habit_id", name="uq_habit_list_items_custom"),
+    )
+
     def __init__(self, habit_list_id: str, habit_is_completed: bool = False, preset_habit_id: str = None,
                  custom_habit_id: str = None, is_late: bool = False, **kw) -> None:
         """
@@ -313,23 +336,6 @@ class HabitListItem(db.Model):
         self.habit_is_completed = habit_is_completed
         self.is_late = is_late
 
-    def to_dict(self) -> dict:
-        """
-        Convert this HabitListItem to a dictionary.
-
-        :return: A dictionary representation of this HabitListItem.
-        """
-        return {
-            "id": self.id,
-            "habit_list_id": self.habit_list_id,
-            "preset_habit_id": self.preset_habit_id,
-            "custom_habit_id": self.custom_habit_id,
-            "habit_is_completed": self.habit_is_completed,
-            "is_late": self.is_late,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
-
     @staticmethod
     def get(habit_list_id: str, preset_habit_id: str = None, custom_habit_id: str = None) -> "HabitListItem | None":
         """
@@ -340,19 +346,16 @@ class HabitListItem(db.Model):
         :param custom_habit_id: The ID of the custom habit. This is optional.
         :return: The HabitListItem if found, else None.
         """
-        from src.persistence import repo
+        equals = {"habit_list_id": habit_list_id}
 
-        habit_list_items: list[HabitListItem] = repo.get_all("habit_list_item")
+        if preset_habit_id is not None:
+            equals["preset_habit_id"] = preset_habit_id
+        if custom_habit_id is not None:
+            equals["custom_habit_id"] = custom_habit_id
 
-        for habit_list_item in habit_list_items:
-            if (
-                habit_list_item.habit_list_id == habit_list_id
-                and (preset_habit_id is None or habit_list_item.preset_habit_id == preset_habit_id)
-                and (custom_habit_id is None or habit_list_item.custom_habit_id == custom_habit_id)
-            ):
-                return habit_list_item
+        habit_list_items: list[HabitListItem] = HabitListItem.find_by(**equals)
 
-        return None
+        return habit_list_items[0] if habit_list_items else None
 
     @staticmethod
     def create(data: dict) -> "HabitListItem":
@@ -363,13 +366,112 @@ class HabitListItem(db.Model):
         :return: The new HabitListItem.
         """
         from src.persistence import repo
+        from src.services.reminders import reminders_running, schedule_reminder
 
         new_habit_list_item = HabitListItem(**data)
 
         repo.save(new_habit_list_item)
 
+        if reminders_running():
+            schedule_reminder(new_habit_list_item.id, new_habit_list_item.habit_list.list_owner.timezone)
+
         return new_habit_list_item
 
+    @staticmethod
+    def get_habits_of_list(habit_list_id: str, habit_type: str) -> list:
+        """
+        Get the preset or custom habits of a habit list with one joined query.
+
+        :param habit_list_id: The ID of the habit list.
+        :param habit_type: Either "preset" or "custom".
+        :return: The PresetHabits or CustomHabits, in the order they were added to the list.
+        """
+        from src.models.custom_habit import CustomHabit
+        from src.models.preset_habit import PresetHabit
+
+        habit_cls, column = {"preset": (PresetHabit, HabitListItem.preset_habit_id),
+                             "custom": (CustomHabit, HabitListItem.custom_habit_id)}[habit_type]
+
+        return db.session.scalars(
+            select(habit_cls)
+            .join(HabitListItem, column == habit_cls.id)
+            .where(HabitListItem.habit_list_id == habit_list_id)
+            .order_by(HabitListItem.created_at, HabitListItem.id)
+        ).all()
+
+    @staticmethod
+    def _insert():
+        """
+        Get an INSERT for the database in use that supports ON CONFLICT.
+        """
+        if db.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        return insert(HabitListItem)
+
+    @staticmethod
+    def add_habits(habit_list_id: str, habit_type: str, habit_ids: list[str]) -> list[dict]:
+        """
+        Add habits to a habit list, skipping the ones already in it.
+
+        The habits are checked with one IN query and added with one
+        INSERT ... ON CONFLICT DO NOTHING, so the number of round trips
+        does not depend on the number of habits.
+
+        :param habit_list_id: The ID of the habit list.
+        :param habit_type: Either "preset" or "custom".
+        :param habit_ids: The IDs of the preset or custom habits to add.
+        :raises LookupError: If one of the habits is not found.
+        :return: The dictionary representations of the HabitListItems added, in the order of habit_ids.
+        """
+        from src.models.custom_habit import CustomHabit
+        from src.models.preset_habit import PresetHabit
+        from src.services.reminders import reminders_running, schedule_reminders
+
+        habit_cls, column = {"preset": (PresetHabit, "preset_habit_id"),
+                             "custom": (CustomHabit, "custom_habit_id")}[habit_type]
+        habit_ids = list(dict.fromkeys(habit_ids))
+
+        if not habit_ids:
+            return []
+
+        found = set(db.session.execute(select(habit_cls.id).where(habit_cls.id.in_(habit_ids))).scalars())
+        missing = [habit_id for habit_id in habit_ids if habit_id not in found]
+
+        if missing:
+            raise LookupError(f"Habit with ID {missing[0]} not found")
+
+        now = utc_now()
+        stmt = (
+            HabitListItem._insert()
+            .on_conflict_do_nothing(index_elements=["habit_list_id", column])
+            .returning(HabitListItem)
+        )
+        # One microsecond apart, so the items keep the order they were added in
+        added = db.session.scalars(stmt, [
+            {"id": str(uuid.uuid4()), "habit_list_id": habit_list_id, column: habit_id,
+             "habit_is_completed": False, "is_late": False,
+             "created_at": now + timedelta(microseconds=index), "updated_at": now}
+            for index, habit_id in enumerate(habit_ids)
+        ]).all()
+
+        # Serialize before the commit expires the items and forces a reload
+        position = {habit_id: index for index, habit_id in enumerate(habit_ids)}
+        added = [item.to_dict() for item in sorted(added, key=lambda item: position[getattr(item, column)])]
+        db.session.commit()
+
+        if reminders_running() and added:
+            zone_name = db.session.execute(
+                select(User.timezone).join(HabitList, HabitList.list_owner_id == User.id)
+                .where(HabitList.id == habit_list_id)
+            ).scalar_one()
+
+            schedule_reminders([habit_list_item["id"] for habit_list_item in added], zone_name)
+
+        return added
+
     @staticmethod
     def delete(habit_list_id: str, preset_habit_id: str = None, custom_habit_id: str = None) -> bool:
         """
@@ -381,6 +483,7 @@ class HabitListItem(db.Model):
         :return: True if the HabitListItem was deleted, else False.
         """
         from src.persistence import repo
+        from src.services.reminders import cancel_reminder
 
         habit_list_item = HabitListItem.get(habit_list_id, preset_habit_id, custom_habit_id)
 
@@ -388,6 +491,7 @@ class HabitListItem(db.Model):
             return False
 
         repo.delete(habit_list_item)
+        cancel_reminder(habit_list_item.id)
 
         return True
 
@@ -9,8 +9,12 @@ class PresetHabit(db.Model):
 
     __tablename__ = "preset_habits"
 
+    SERIALIZED_FIELDS = (
+        "id", "description", "category_name", "xp_reward", "created_at", "updated_at"
+    )
+
     description = db.Column(db.String(300), nullable=False)
-    category_name = db.Column(db.String(128), db.ForeignKey("categories.name"), nullable=True)
+    category_name = db.Column(db.String(128), db.ForeignKey("categories.name"), nullable=True, index=True)
     xp_reward = db.Column(db.Integer, nullable=False, default=50)
 
     category = db.relationship("Category", back_populates="habits")
@@ -31,25 +35,13 @@ class PresetHabit(db.Model):
         """
         return f"PresetHabit {self.description}"
 
-    def to_dict(self) -> dict:
-        """
-        Convert this PresetHabit to a dictionary.
-        """
-        return {
-            "id": self.id,
-            "description": self.description,
-            "category_name": self.category_name,
-            "xp_reward": self.xp_reward,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
-
     @staticmethod
     def create(data: dict) -> "PresetHabit":
         """
         Create a new PresetHabit instance and save it to the database.
         """
         from src.persistence import repo
+        from src.services.catalog import refresh_catalog
 
         category = Category.get(data["category_name"])
 
@@ -58,6 +50,7 @@ class PresetHabit(db.Model):
 
         preset_habit = PresetHabit(**data)
         repo.save(preset_habit)
+        refresh_catalog()
 
         return preset_habit
 
@@ -67,6 +60,7 @@ class PresetHabit(db.Model):
         Update a PresetHabit instance with new data.
         """
         from src.persistence import repo
+        from src.services.catalog import refresh_catalog
 
         preset_habit = PresetHabit.get(habit_id)
 
@@ -77,6 +71,7 @@ class PresetHabit(db.Model):
             setattr(preset_habit, key, value)
 
         repo.update(preset_habit)
+        refresh_catalog()
 
         return preset_habit
 
@@ -92,6 +87,7 @@ class PresetHabit(db.Model):
             bool: True if the preset habit was deleted, False if not found.
         """
         from src.persistence import repo
+        from src.services.catalog import refresh_catalog
 
         preset_habit: PresetHabit | None = PresetHabit.get(preset_habit_id)
 
@@ -99,5 +95,6 @@ class PresetHabit(db.Model):
             return False
         
         repo.delete(preset_habit)
+        refresh_catalog()
 
         return True
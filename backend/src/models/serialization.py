@@ -0,0 +1,154 @@
+"""
+This module exports the serialization of the models to JSON.
+
+Every model lists the attributes it is serialized with in
+SERIALIZED_FIELDS. Its ModelSerializer reads them all with one
+attrgetter built once, and knows which of them are DateTime columns, so
+to_dict gives JSON safe dictionaries without a json.dumps/json.loads
+round trip, and to_json gives the JSON bytes straight from the instance.
+
+dumps and loads make this module a JSON module for the Flask app and
+Socket.IO. They use orjson when it is installed, and the standard json
+module with default_serializer otherwise.
+"""
+
+from datetime import date
+from functools import cache
+from operator import attrgetter
+import json
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, DateTime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default_serializer(obj):
+    """Serialize datetime and date objects to ISO format"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def dumps_bytes(obj, sort_keys: bool = False, default=default_serializer) -> bytes:
+    """
+    Serialize an object to compact UTF-8 JSON.
+
+    :param obj: The object, JSON serializable but for datetimes.
+    :param sort_keys: Whether the keys of the objects are sorted.
+    :param default: Called with the values JSON can't represent, returns one it can.
+    :return: The JSON bytes.
+    """
+    if orjson is None:
+        return json.dumps(obj, sort_keys=sort_keys, default=default, ensure_ascii=False,
+                          separators=(",", ":")).encode()
+
+    # orjson writes datetimes in ISO format itself, like default_serializer
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    return orjson.dumps(obj, default=default, option=option)
+
+
+def dumps(obj, **kwargs) -> str:
+    """Serialize an object to a JSON string, with the arguments of json.dumps"""
+    if orjson is None or kwargs.get("indent") or "cls" in kwargs:
+        kwargs.setdefault("default", default_serializer)
+        return json.dumps(obj, **kwargs)
+
+    return dumps_bytes(obj, kwargs.get("sort_keys", False), kwargs.get("default") or default_serializer).decode()
+
+
+def loads(s, **kwargs):
+    """Deserialize a JSON string or bytes, with the arguments of json.loads"""
+    if orjson is None or kwargs:
+        return json.loads(s, **kwargs)
+
+    return orjson.loads(s)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """
+    The JSON provider of the app.
+
+    Responses are serialized by dumps_bytes, once, to the bytes of the
+    body. Datetimes are in ISO format, like in to_dict.
+    """
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, date):
+            return obj.isoformat()
+        return DefaultJSONProvider.default(obj)
+
+    def dumps(self, obj, **kwargs) -> str:
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps_bytes(obj, self.sort_keys, self.default)
+
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class ModelSerializer:
+    """
+    Serializes the instances of a model.
+
+    :param model: The model class, a mapped class or any class with the attributes.
+    :param fields: The names of the attributes to serialize, in order.
+    """
+
+    def __init__(self, model, fields: tuple[str, ...]):
+        self.fields = tuple(fields)
+        getter = attrgetter(*self.fields)
+        # attrgetter of a single name returns the value, not a tuple
+        self._values = getter if len(self.fields) > 1 else lambda obj: (getter(obj),)
+
+        table = getattr(model, "__table__", None)
+        columns = table.columns if table is not None else {}
+        self._datetimes = tuple(
+            name for name in self.fields
+            if name in columns and isinstance(columns[name].type, (Date, DateTime))
+        )
+
+    def to_dict(self, obj) -> dict:
+        """Get the JSON safe dictionary of an instance, with the datetimes in ISO format"""
+        data = dict(zip(self.fields, self._values(obj)))
+
+        for name in self._datetimes:
+            value = data[name]
+            if value is not None:
+                data[name] = value.isoformat()
+
+        return data
+
+    def to_json(self, obj) -> bytes:
+        """Get the JSON bytes of an instance"""
+        if orjson is None:
+            return dumps_bytes(self.to_dict(obj))
+
+        # orjson writes the datetimes faster than isoformat
+        return dumps_bytes(dict(zip(self.fields, self._values(obj))))
+
+    def to_json_list(self, objs) -> bytes:
+        """Get the JSON bytes of an array of instances"""
+        if orjson is None:
+            return dumps_bytes([self.to_dict(obj) for obj in objs])
+
+        fields, values = self.fields, self._values
+
+        return dumps_bytes([dict(zip(fields, values(obj))) for obj in objs])
+
+
+@cache
+def serializer_for(model) -> ModelSerializer:
+    """
+    Get the serializer of a model, built on first use from its SERIALIZED_FIELDS.
+
+    :param model: The model class.
+    """
+    return ModelSerializer(model, model.SERIALIZED_FIELDS)
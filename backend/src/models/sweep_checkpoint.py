@@ -0,0 +1,61 @@
+from . import db
+from sqlalchemy import update
+
+
+class SweepCheckpoint(db.Model):
+    """
+    SweepCheckpoint model class for the progress of a batch job over all users.
+
+    A job processes the users in ID order and moves its checkpoint past
+    every chunk in the same transaction as the chunk's changes, so an
+    interrupted job resumes where it stopped and a finished one is not
+    run twice.
+    """
+
+    __tablename__ = "sweep_checkpoints"
+
+    SERIALIZED_FIELDS = ("id", "sweep_key", "last_user_id", "completed_at")
+
+    sweep_key = db.Column(db.String(64), unique=True, nullable=False)
+    # ID of the last user processed, None before the first chunk
+    last_user_id = db.Column(db.String(36), nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, sweep_key: str, **kw) -> None:
+        """
+        Initialize a new SweepCheckpoint instance.
+        """
+        super().__init__(**kw)
+        self.sweep_key = sweep_key
+        self.last_user_id = None
+        self.completed_at = None
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of this SweepCheckpoint.
+        """
+        return f"<SweepCheckpoint {self.sweep_key} at {self.last_user_id}>"
+
+    @staticmethod
+    def advance(sweep_key: str, expected_user_id: str | None, last_user_id: str) -> bool:
+        """
+        Move a checkpoint past a chunk, unless another run moved it first.
+
+        :param sweep_key: The key of the job run.
+        :param expected_user_id: The last user ID the caller read from the checkpoint.
+        :param last_user_id: The last user ID of the chunk just processed.
+        :return: False if the checkpoint was not at expected_user_id anymore.
+        """
+        if expected_user_id is None:
+            at_expected = SweepCheckpoint.last_user_id.is_(None)
+        else:
+            at_expected = SweepCheckpoint.last_user_id == expected_user_id
+
+        result = db.session.execute(
+            update(SweepCheckpoint)
+            .where(SweepCheckpoint.sweep_key == sweep_key, at_expected, SweepCheckpoint.completed_at.is_(None))
+            .values(last_user_id=last_user_id),
+            execution_options={"synchronize_session": False},
+        )
+
+        return result.rowcount == 1
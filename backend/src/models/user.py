@@ -1,7 +1,78 @@
 from . import db
-from src import bcrypt
-from flask_bcrypt import generate_password_hash, check_password_hash
+from src.services import passwords
+from src.services.deadlines import DEFAULT_TIMEZONE, is_valid_timezone
 from datetime import datetime, timedelta
+from functools import cache
+from math import isqrt
+from sqlalchemy import bindparam, case, update
+
+# How much each stat grows every time a User levels up
+LEVEL_UP_STAT_GROWTH = {
+    "max_hp": 10,
+    "strenght": 5,
+    "vitality": 4,
+    "dexterity": 3,
+    "intelligence": 2,
+    "luck": 1,
+}
+# HP lost for every habit left incomplete at the daily deadline
+INCOMPLETE_HABIT_HP_PENALTY = 25
+# XP lost for every habit list whose incomplete habits leave the HP at 0
+ZERO_HP_XP_PENALTY = 50
+# XP needed to go from level 1 to level 2
+BASE_XP_TO_NEXT_LEVEL = 100
+# How much more XP each level needs than the previous one
+XP_TO_NEXT_LEVEL_GROWTH = 50
+
+
+def xp_for_level(level: int) -> int:
+    """
+    Get the total XP needed to reach a level.
+
+    Each level needs XP_TO_NEXT_LEVEL_GROWTH more XP than the previous
+    one, so the total is the sum of an arithmetic series.
+    """
+    n = level - 1
+
+    return n * BASE_XP_TO_NEXT_LEVEL + XP_TO_NEXT_LEVEL_GROWTH * n * (n - 1) // 2
+
+
+def level_for_xp(total_xp: int) -> int:
+    """
+    Get the level reached with a total amount of XP.
+
+    Solves xp_for_level(n + 1) <= total_xp for the largest n with
+    integer arithmetic only, so the result is exact for any amount.
+    """
+    growth = XP_TO_NEXT_LEVEL_GROWTH
+    offset = 2 * BASE_XP_TO_NEXT_LEVEL - growth
+
+    return (isqrt(8 * growth * total_xp + offset * offset) - offset) // (2 * growth) + 1
+
+
+def incomplete_habit_penalties(hp: int, incomplete_per_list) -> tuple[int, int]:
+    """
+    Get the HP and XP a User loses for the habits left incomplete at the deadline.
+
+    Every incomplete habit costs INCOMPLETE_HABIT_HP_PENALTY HP, down to 0.
+    Every habit list whose incomplete habits leave the HP at 0 also costs
+    ZERO_HP_XP_PENALTY XP.
+
+    :param hp: The User's HP before the penalties.
+    :param incomplete_per_list: The number of incomplete habits of each habit list, in list order.
+    :return: The HP and the XP to lose. The XP loss is not yet capped at the current level's XP.
+    """
+    remaining_hp, xp_lost = hp, 0
+
+    for incomplete in incomplete_per_list:
+        if incomplete:
+            remaining_hp = max(remaining_hp - incomplete * INCOMPLETE_HABIT_HP_PENALTY, 0)
+
+            if remaining_hp == 0:
+                xp_lost += ZERO_HP_XP_PENALTY
+
+    return hp - remaining_hp, xp_lost
+
 
 class User(db.Model):
     """
@@ -9,12 +80,20 @@ class User(db.Model):
     """
     __tablename__ = "users"
 
+    SERIALIZED_FIELDS = (
+        "id", "email", "username", "max_hp", "hp", "level", "current_xp", "total_xp",
+        "xp_to_next_level", "habits_completed", "streak", "strenght", "vitality", "dexterity",
+        "intelligence", "luck", "last_login", "timezone", "created_at", "updated_at"
+    )
+
     email = db.Column(db.String(128), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     username = db.Column(db.String(128), unique=True, nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     level = db.Column(db.Integer, default=1)
     current_xp = db.Column(db.Integer, default=0)
+    # All the XP ever gained, level and current_xp are derived from it
+    total_xp = db.Column(db.Integer, nullable=False, default=0, index=True)
     xp_to_next_level = db.Column(db.Integer, default=100)
     habits_completed = db.Column(db.Integer, default=0)
     # User stats
@@ -29,21 +108,36 @@ class User(db.Model):
     streak = db.Column(db.Integer, default=0)
     last_login = db.Column(db.DateTime)
     total_login_count = db.Column(db.Integer, default=0)
+    # The User's day, and its habit deadline, ends at midnight in this timezone
+    timezone = db.Column(db.String(64), nullable=False, default=DEFAULT_TIMEZONE, index=True)
+    # Local day the User was last penalized for by the penalty sweep, so
+    # moving to another timezone never penalizes the same day twice
+    penalized_day = db.Column(db.Date, nullable=True)
+    # Bumped on every write, so a stale read-modify-write fails instead
+    # of overwriting a concurrent change
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     habit_lists = db.relationship("HabitList", back_populates="list_owner")
     custom_habits = db.relationship("CustomHabit", back_populates="habit_owner")
+
+    __mapper_args__ = {"version_id_col": version}
     
-    def __init__(self, email: str, password: str, username: str, is_admin: bool = False, **kw):
+    def __init__(self, email: str, password: str, username: str, is_admin: bool = False,
+                 timezone: str = DEFAULT_TIMEZONE, **kw):
         """
         Initialize a new User instance.
+
+        :raises ValueError: If the timezone is not a known timezone.
         """
         super().__init__(**kw)
+        self.set_timezone(timezone)
         self.email = email
         self.set_password(password)
         self.username = username
         self.is_admin = is_admin
         self.level = 1
         self.current_xp = 0
+        self.total_xp = 0
         self.xp_to_next_level = 100
         self.habits_completed = 0
         # User stats
@@ -65,70 +159,64 @@ class User(db.Model):
         """
         return f"<User {self.username}, Level ({self.level})>"
     
+    def set_timezone(self, timezone: str) -> None:
+        """
+        Set the timezone the User's days end in.
+
+        :raises ValueError: If the timezone is not a known timezone.
+        """
+        if not is_valid_timezone(timezone):
+            raise ValueError(f"Unknown timezone: {timezone}")
+
+        self.timezone = timezone
+
     def set_password(self, password):
         """
         Set the password for the User instance.
         """
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password):
         """
         Check if the provided password matches the User's password.
         """
-        return bcrypt.check_password_hash(self.password_hash, password)
-    
-    def gain_xp(self, amount: int) -> None:
+        return passwords.check_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
         """
-        Increase the User's experience points by a certain amount.
+        Check if the User's password was hashed with another work factor than the configured one.
         """
-        from src.persistence import repo
-
-        self.current_xp += amount
-        self.habits_completed += 1
-        self.check_level_up()
-        repo.save(self)
-
+        return passwords.needs_rehash(self.password_hash)
+    
     def check_level_up(self) -> None:
         """
-        Check if the User has enough experience points to level up.
+        Set the User's level, current XP and stats from their total XP.
+
+        The level comes from the closed form of the XP curve, so any XP
+        grant is applied in one step, however many levels it is worth.
+        The level never goes down.
         """
-        from src.persistence import repo
+        level = max(level_for_xp(self.total_xp), self.level)
+        self.current_xp = self.total_xp - xp_for_level(level)
 
-        while self.current_xp >= self.xp_to_next_level:
-            self.level_up()
+        if level != self.level:
+            # User stats will grow as they level up
+            for stat, growth in LEVEL_UP_STAT_GROWTH.items():
+                setattr(self, stat, getattr(self, stat) + growth * (level - self.level))
 
-        repo.save(self)
-    
-    def level_up(self) -> None:
-        """
-        Increase the User's level by 1.
-        """
-        from src.persistence import repo
+            self.level = level
+            self.xp_to_next_level = self.calculate_xp_to_next_level() # Calculate and increase xp needed for next level.
 
-        self.current_xp -= self.xp_to_next_level
-        self.level += 1
-        # User stats will grow as they level up
-        self.max_hp += 10
-        self.strenght += 5
-        self.vitality += 4
-        self.dexterity += 3
-        self.intelligence += 2
-        self.luck += 1
-        self.xp_to_next_level = self.calculate_xp_to_next_level() # Calculate and increase xp needed for next level.
-        repo.save(self)
-    
     def calculate_xp_to_next_level(self) -> int:
         """
         Calculate the experience points needed to reach the next level.
         """
-        return 100 + (self.level - 1) * 50
+        return BASE_XP_TO_NEXT_LEVEL + (self.level - 1) * XP_TO_NEXT_LEVEL_GROWTH
     
     def recover_hp(self, hp_points=15):
         """
         Recover HP after completing habits on time
         """
-        from src.persistence import repo
-
         if self.hp < self.max_hp:
             self.hp += hp_points
 
@@ -136,30 +224,91 @@ class User(db.Model):
         if self.hp > self.max_hp:
             self.hp = self.max_hp
 
-        repo.save(self)
-
     def lose_hp(self, hp_points=25):
         """
         Reduce HP by a specific amount if habits are left incomplete.
         """
-        from src.persistence import repo
-
         self.hp -= hp_points
         if self.hp < 0:
             self.hp = 0 # Ensure HP doesn't drop below 0
-            
-        repo.save(self)
 
     def lose_xp(self, xp_points=50):
         """
         Reduce the user's XP by the specified amount if HP is 0.
-        Ensure that XP does not go below zero.
+        Ensure that XP does not go below the start of the current level.
         """
-        from src.persistence import repo
+        self.total_xp = max(self.total_xp - xp_points, xp_for_level(self.level))
+        self.current_xp = self.total_xp - xp_for_level(self.level)
 
-        self.current_xp = max(self.current_xp - xp_points, 0)
+    @staticmethod
+    @cache
+    def _stat_changes_statement():
+        """
+        Build the UPDATE ... RETURNING statement of apply_stat_changes once.
+        """
+        xp, hp = bindparam("xp"), bindparam("hp")
+        levels_up = User.current_xp + xp >= User.xp_to_next_level
 
-        repo.save(self)
+        def grow(column, amount):
+            return column + case((levels_up, amount), else_=0)
+
+        max_hp = grow(User.max_hp, LEVEL_UP_STAT_GROWTH["max_hp"])
+        values = {
+            stat: grow(getattr(User, stat), growth)
+            for stat, growth in LEVEL_UP_STAT_GROWTH.items()
+        }
+        values.update(
+            current_xp=User.current_xp + xp - case((levels_up, User.xp_to_next_level), else_=0),
+            level=grow(User.level, 1),
+            xp_to_next_level=grow(User.xp_to_next_level, XP_TO_NEXT_LEVEL_GROWTH),
+            hp=case(
+                (User.hp >= max_hp, User.hp),
+                (User.hp + hp > max_hp, max_hp),
+                else_=User.hp + hp,
+            ),
+            total_xp=User.total_xp + xp,
+            habits_completed=User.habits_completed + bindparam("habits_completed"),
+            version=User.version + 1,
+        )
+
+        return update(User).where(User.id == bindparam("user_id")).values(**values).returning(User)
+
+    @staticmethod
+    def apply_stat_changes(user_id: str, xp: int = 0, hp: int = 0, habits_completed: int = 0) -> "User | None":
+        """
+        Add XP, recover HP and count completed habits with a single atomic UPDATE.
+
+        The new values are computed by the database from the current row,
+        so concurrent completions for the same User never overwrite each
+        other. The statement also applies the level up the XP may trigger;
+        a grant worth more than one level finishes leveling up with a
+        version-checked write. The XP is also added to the User's day,
+        week and month leaderboard buckets.
+
+        :param user_id: The ID of the User.
+        :param xp: The XP to add.
+        :param hp: The HP to recover, capped at the (possibly increased) max HP.
+        :param habits_completed: The number of completed habits to add.
+        :return: The updated User, or None if not found.
+        """
+        user = db.session.execute(
+            User._stat_changes_statement(),
+            {"user_id": user_id, "xp": xp, "hp": hp, "habits_completed": habits_completed},
+            execution_options={"populate_existing": True, "synchronize_session": False},
+        ).scalar_one_or_none()
+
+        if user is not None and xp > 0:
+            from src.models.xp_bucket import XpBucket
+
+            XpBucket.record_gain(user_id, xp)
+
+        if user is not None and user.current_xp >= user.xp_to_next_level:
+            # The flush only matches the version returned above, so a
+            # concurrent change makes it raise StaleDataError
+            user.check_level_up()
+            db.session.flush()
+
+        return user
 
     def check_daily_streak(self) -> None:
         """
@@ -169,16 +318,13 @@ class User(db.Model):
         If the user logged in exactly one day ago, the streak is incremented.
         If the user logged in more than one day ago, the streak is reset to 1.
         The method also updates the last login time to the current time and increments the total login count.
+        Penalties for incomplete habits are applied by the nightly penalty sweep, not at login.
         """
         from src.persistence import repo
 
         today = datetime.utcnow().date()
         last_reset = today - timedelta(days=1)
 
-        # Check for imcomplete habits
-        for habit_list in self.habit_lists:
-            habit_list.check_incomplete_habits()
-
         if self.last_login:
             last_login_date = self.last_login.date()
 
@@ -201,61 +347,7 @@ class User(db.Model):
         self.total_login_count += 1 # Increment login count
 
         repo.save(self)
-
-    def to_dict(self) -> dict:
-        """
-        Return a dictionary representation of the User instance.
-        """
-        return {
-            "id": self.id,
-            "email": self.email,
-            "username": self.username,
-            "max_hp": self.max_hp,
-            "hp": self.hp,
-            "level": self.level,
-            "current_xp": self.current_xp,
-            "xp_to_next_level": self.xp_to_next_level,
-            "habits_completed": self.habits_completed,
-            "streak": self.streak,
-            "strenght": self.strenght,
-            "vitality": self.vitality,
-            "dexterity": self.dexterity,
-            "intelligence": self.intelligence,
-            "luck": self.luck,
-            "last_login": self.last_login,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
     
-    @classmethod
-    def get_leaderboard(cls, limit=10):
-        """
-        Retrieve the top users for the leaderboard.
-
-        This method queries the database to retrieve the top users based on their level and XP.
-        It orders the users first by their level in descending order, and then by their current XP
-        in descending order. The number of users retrieved is limited by the 'limit' parameter.
-
-        Args:
-            limit (int): The maximum number of users to retrieve for the leaderboard. Default is 10.
-
-        Returns:
-            list: A list of dictionaries containing the username, level, and current XP of the top users.
-        """
-        top_users = (
-            db.session.query(cls)
-            .order_by(cls.level.desc(), cls.current_xp.desc())  # Order by level, then by XP
-            .limit(limit)
-            .all()
-        )
-
-        leaderboard = [
-            {"id": user.id, "username": user.username, "level": user.level, "XP": user.current_xp}
-            for user in top_users
-        ]
-
-        return leaderboard
-
     @staticmethod
     def create(user: dict) -> "User":
         """
@@ -263,17 +355,17 @@ class User(db.Model):
         """
         from src.persistence import repo
 
-        users: list["User"] = User.get_all()
+        if User.exists_by(email=user["email"]):
+            raise ValueError("User already exists")
+        if User.exists_by(username=user["username"]):
+            raise ValueError("Username already taken")
+
+        from src.services.leaderboard import update_leaderboard
 
-        for u in users:
-            if u.email == user["email"]:
-                raise ValueError("User already exists")
-            if u.username == user["username"]:
-                raise ValueError("Username already taken")
-            
         new_user = User(**user)
 
         repo.save(new_user)
+        update_leaderboard(new_user.to_dict())
 
         return new_user
     
@@ -293,6 +385,8 @@ class User(db.Model):
             user.email = data["email"]
         if "username" in data:
             user.username = data["username"]
+        if "timezone" in data:
+            user.set_timezone(data["timezone"])
         if "currentPassword" in data and "newPassword" in data:
             if not user.check_password(data["currentPassword"]):
                 raise ValueError("Current password is incorrect")
@@ -300,6 +394,16 @@ class User(db.Model):
 
         repo.update(user)
 
+        if "timezone" in data:
+            from src.services.reminders import reschedule_user_reminders
+
+            reschedule_user_reminders(user.id, user.timezone)
+
+        if "username" in data:
+            from src.services.leaderboard import update_leaderboard
+
+            update_leaderboard(user.to_dict())
+
         return user
 
     @staticmethod
@@ -320,6 +424,9 @@ class User(db.Model):
         if not user:
             return False
         
+        from src.services.leaderboard import remove_from_leaderboard
+
         repo.delete(user)
+        remove_from_leaderboard(user_id)
 
         return True
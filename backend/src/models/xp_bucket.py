@@ -0,0 +1,183 @@
+from . import db
+from datetime import date, datetime, timedelta, timezone
+import uuid
+from sqlalchemy import delete, func, or_, select
+
+# Periods with their own leaderboard
+XP_PERIODS = ("day", "week", "month")
+
+
+def period_starts(day: date) -> dict[str, date]:
+    """
+    Get the first day of the day, week and month a day belongs to.
+
+    Weeks start on Monday.
+    """
+    return {
+        "day": day,
+        "week": day - timedelta(days=day.weekday()),
+        "month": day.replace(day=1),
+    }
+
+
+def previous_period_starts(day: date) -> dict[str, date]:
+    """
+    Get the first day of the day, week and month before the ones a day belongs to.
+    """
+    starts = period_starts(day)
+
+    return {
+        "day": starts["day"] - timedelta(days=1),
+        "week": starts["week"] - timedelta(weeks=1),
+        "month": (starts["month"] - timedelta(days=1)).replace(day=1),
+    }
+
+
+class XpBucket(db.Model):
+    """
+    XpBucket model class for the XP a User gained in a day, week or month.
+
+    Every XP gain adds to the bucket of each period it falls in, so the
+    leaderboard of a period is read from one row per user instead of
+    being rebuilt from the history of gains.
+    """
+
+    __tablename__ = "xp_buckets"
+
+    SERIALIZED_FIELDS = ("id", "user_id", "period", "period_start", "xp")
+
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    period = db.Column(db.String(5), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    xp = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "period", "period_start"),
+        # Serves the leaderboard of a period in order
+        db.Index("ix_xp_buckets_ranking", "period", "period_start", "xp"),
+    )
+
+    def __init__(self, user_id: str, period: str, period_start: date, xp: int = 0, **kw) -> None:
+        """
+        Initialize a new XpBucket instance.
+        """
+        super().__init__(**kw)
+        self.user_id = user_id
+        self.period = period
+        self.period_start = period_start
+        self.xp = xp
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of this XpBucket.
+        """
+        return f"<XpBucket {self.user_id} {self.period} {self.period_start}: {self.xp}>"
+
+    @staticmethod
+    def _insert():
+        """
+        Get an INSERT for the database in use that supports ON CONFLICT.
+        """
+        if db.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        return insert(XpBucket)
+
+    @staticmethod
+    def record_gain(user_id: str, xp: int, day: date | None = None) -> None:
+        """
+        Add an XP gain to the User's day, week and month buckets with a single upsert.
+
+        Expired buckets are deleted by the scheduled sweep, see prune.
+
+        :param user_id: The ID of the User.
+        :param xp: The XP gained.
+        :param day: The UTC day of the gain, today by default.
+        """
+        day = day or datetime.now(timezone.utc).date()
+        # Set explicitly, the ORM's onupdate doesn't apply to ON CONFLICT
+        now = datetime.now(timezone.utc)
+
+        stmt = XpBucket._insert().values([
+            {"id": str(uuid.uuid4()), "user_id": user_id, "period": period, "period_start": start, "xp": xp,
+             "created_at": now, "updated_at": now}
+            for period, start in period_starts(day).items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "period", "period_start"],
+            set_={"xp": XpBucket.xp + stmt.excluded.xp, "updated_at": stmt.excluded.updated_at},
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def prune(day: date) -> None:
+        """
+        Delete the buckets older than the previous day, week and month.
+
+        The previous period is kept so it can still be shown once it ends.
+        Run by the scheduled penalty sweeps, so completions never pay for it.
+
+        :param day: The UTC day to keep the current and previous periods of.
+        """
+        db.session.execute(
+            delete(XpBucket).where(or_(*(
+                (XpBucket.period == period) & (XpBucket.period_start < start)
+                for period, start in previous_period_starts(day).items()
+            )))
+        )
+
+    @staticmethod
+    def get_leaderboard_version(period: str, day: date | None = None) -> tuple:
+        """
+        Get a version of the leaderboard of the current day, week or month, with one aggregate query.
+
+        It is the start of the period with the number of buckets and the
+        last change of the buckets and of their users, so it changes
+        whenever get_leaderboard would return something else.
+
+        :param period: One of XP_PERIODS.
+        :param day: The UTC day the period is the current one of, today by default.
+        """
+        from src.models.user import User
+
+        start = period_starts(day or datetime.now(timezone.utc).date())[period]
+
+        row = db.session.execute(
+            select(func.count(XpBucket.id), func.max(XpBucket.updated_at), func.max(User.updated_at))
+            .join(User, User.id == XpBucket.user_id)
+            .where(XpBucket.period == period, XpBucket.period_start == start)
+        ).one()
+
+        return (start, *row)
+
+    @staticmethod
+    def get_leaderboard(period: str, page: int = 1, per_page: int = 10, day: date | None = None) -> list[dict]:
+        """
+        Get a page of the users ranked by the XP they gained in the current day, week or month.
+
+        :param period: One of XP_PERIODS.
+        :param page: The page, starting at 1.
+        :param per_page: The number of users per page.
+        :param day: The UTC day the period is the current one of, today by default.
+        :return: The leaderboard entries, in rank order.
+        """
+        from src.models.user import User
+
+        start = period_starts(day or datetime.now(timezone.utc).date())[period]
+        offset = (page - 1) * per_page
+
+        rows = db.session.execute(
+            select(User.id, User.username, User.level, XpBucket.xp)
+            .join(User, User.id == XpBucket.user_id)
+            .where(XpBucket.period == period, XpBucket.period_start == start)
+            .order_by(XpBucket.xp.desc(), XpBucket.user_id)
+            .offset(offset)
+            .limit(per_page)
+        )
+
+        return [
+            {"id": user_id, "username": username, "level": level, "XP": xp, "rank": rank}
+            for rank, (user_id, username, level, xp) in enumerate(rows, offset + 1)
+        ]
@@ -1,8 +1,14 @@
+from contextlib import contextmanager
 from src.models.base import Base
 from src.models import db
 from src.models.category import Category
 from src.persistence.repository import Repository
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
+from typing import Iterator
+
+# Rows loaded at a time by iter_all
+ITER_BATCH_SIZE = 500
 
 class DBRepository(Repository):
     """
@@ -45,6 +51,85 @@ class DBRepository(Repository):
             self.__session.rollback()
             return None
         
+    def get_page(self, model_name, limit: int, after: str | None = None) -> list:
+        """
+        Get the first instances of a model in ID order, after a given ID.
+
+        The page is found with a seek on the primary key index,
+        WHERE id > after ORDER BY id LIMIT limit, so every page
+        is as fast as the first one.
+
+        :param model_name: The model class or its name.
+        :param limit: The number of instances at most.
+        :param after: The ID of the last instance of the previous page.
+        :return: A list of the instances of the page.
+        """
+        cls = self._get_model_class(model_name)
+        stmt = select(cls).order_by(cls.id).limit(limit)
+
+        if after is not None:
+            stmt = stmt.where(cls.id > after)
+
+        try:
+            return self.__session.scalars(stmt).all()
+
+        except SQLAlchemyError:
+            self.__session.rollback()
+            return []
+
+    def iter_all(self, model_name, after: str | None = None) -> Iterator:
+        """
+        Iterate over the instances of a model in ID order, after a given ID.
+
+        Rows are fetched ITER_BATCH_SIZE at a time with yield_per, and the
+        session only holds weak references to the instances, so memory
+        stays flat whatever the size of the table.
+
+        :param model_name: The model class or its name.
+        :param after: The ID to start after, to resume an interrupted iteration.
+        """
+        cls = self._get_model_class(model_name)
+        stmt = select(cls).order_by(cls.id).execution_options(yield_per=ITER_BATCH_SIZE)
+
+        if after is not None:
+            stmt = stmt.where(cls.id > after)
+
+        yield from self.__session.scalars(stmt)
+
+    def find_by(self, model_name, **equals) -> list:
+        """
+        Get all instances of a model whose fields equal the given values.
+
+        The values become a WHERE clause, so the lookup can use
+        the indexes declared on the columns.
+
+        :param model_name: The model class or its name.
+        :param equals: The field values to match.
+        :return: A list of the matching instances.
+        """
+        try:
+            return self.__session.query(self._get_model_class(model_name)).filter_by(**equals).all()
+
+        except SQLAlchemyError:
+            self.__session.rollback()
+            return []
+
+    def exists_by(self, model_name, **equals) -> bool:
+        """
+        Check if an instance of a model has the given field values.
+
+        :param model_name: The model class or its name.
+        :param equals: The field values to match.
+        :return: True if a matching instance exists, otherwise False.
+        """
+        try:
+            query = self.__session.query(self._get_model_class(model_name)).filter_by(**equals)
+            return self.__session.query(query.exists()).scalar()
+
+        except SQLAlchemyError:
+            self.__session.rollback()
+            return False
+
     def get_for_category(self, name: str) -> Base | None:
         """
         Get a Category instance by its name.
@@ -65,6 +150,61 @@ class DBRepository(Repository):
         """
         self.__session = db.session
 
+    def _in_transaction(self) -> bool:
+        """
+        Check if a transaction block is open on the current session.
+
+        The depth lives in the session info, so every request (and
+        every green thread) only sees its own transaction.
+        """
+        return self.__session.info.get("transaction_depth", 0) > 0
+
+    def _commit(self) -> None:
+        """
+        Commit the session, unless a transaction block will commit it later.
+        """
+        if not self._in_transaction():
+            self.__session.commit()
+
+    def release_connection(self) -> None:
+        """
+        End the session's read transaction so its connection goes back to the pool.
+
+        Objects loaded so far are refreshed from the database on their next access.
+        Nothing is released inside a transaction block, which must keep its changes.
+        """
+        if not self._in_transaction():
+            self.__session.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commit every save, update and delete made inside the block at once.
+
+        The session is committed when the outermost block exits and
+        rolled back if the block raises. Nested blocks join the outer one.
+        """
+        info = self.__session.info
+        info["transaction_depth"] = info.get("transaction_depth", 0) + 1
+
+        try:
+            yield self
+
+        except BaseException:
+            info["transaction_depth"] -= 1
+            self.__session.rollback()
+            raise
+
+        info["transaction_depth"] -= 1
+
+        if info["transaction_depth"] == 0:
+            try:
+                self.__session.commit()
+
+            except SQLAlchemyError:
+                self.__session.rollback()
+                raise
+
     def save(self, obj: Base) -> Base:
         """
         Save an instance to the database.
@@ -74,9 +214,13 @@ class DBRepository(Repository):
         """
         try:
             self.__session.add(obj)
-            self.__session.commit()
+            self._commit()
 
         except SQLAlchemyError:
+            # The transaction block rolls back every change made in it
+            if self._in_transaction():
+                raise
+
             self.__session.rollback()
             print(f"Error saving object: {SQLAlchemyError}")
 
@@ -87,9 +231,13 @@ class DBRepository(Repository):
         :param obj: The instance to update.
         """
         try:
-            self.__session.commit()
+            self._commit()
 
         except SQLAlchemyError:
+            # The transaction block rolls back every change made in it
+            if self._in_transaction():
+                raise
+
             self.__session.rollback()
 
     def delete(self, obj: Base) -> bool:
@@ -101,9 +249,13 @@ class DBRepository(Repository):
         """
         try:
             self.__session.delete(obj)
-            self.__session.commit()
+            self._commit()
 
         except SQLAlchemyError:
+            # The transaction block rolls back every change made in it
+            if self._in_transaction():
+                raise
+
             self.__session.rollback()
             return False
         
@@ -111,21 +263,28 @@ class DBRepository(Repository):
         """
         Get the class for a model by its name.
 
-        :param model_name: The name of the model.
+        :param model_name: The name of the model, or the class itself.
         :return: The class for the model.
         """
         from src.models.user import User
         from src.models.category import Category
         from src.models.preset_habit import PresetHabit
         from src.models.custom_habit import CustomHabit
-        from src.models.habit_list import HabitList
+        from src.models.habit_list import HabitList, HabitListItem
+
+        if not isinstance(model_name, str):
+            return model_name
 
         models = {
             "user": User,
             "category": Category,
             "preset_habit": PresetHabit,
             "custom_habit": CustomHabit,
-            "habit_list": HabitList
+            "habit_list": HabitList,
+            "habit_list_item": HabitListItem
         }
 
+        for cls in list(models.values()):
+            models[cls.__name__.lower()] = cls
+
         return models[model_name.lower()]
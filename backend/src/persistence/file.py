@@ -1,129 +1,317 @@
 """
 This module exports a Repository that persists data in a JSON file
+
+Writes are journaled: every save, update and delete appends a single
+record to an append-only log instead of rewriting the whole data file.
+Once the log grows past a threshold it is compacted (folded) into the
+data file, and `reload` rebuilds the state by replaying the snapshot
+followed by the log.
 """
 
+from contextlib import contextmanager
 from datetime import datetime
 import json
+import os
 from src.models.base import Base
+from src.persistence.indexes import SecondaryIndexes, find_in, get_indexed_fields, get_model_name
 from src.persistence.repository import Repository
-from utils.constants import FILE_STORAGE_FILENAME
+from utils.constants import (
+    FILE_STORAGE_COMPACTION_THRESHOLD,
+    FILE_STORAGE_FILENAME,
+    FILE_STORAGE_JOURNAL_FILENAME,
+)
 
 
 class FileRepository(Repository):
     """File Repository"""
 
-    __filename = FILE_STORAGE_FILENAME
-    __data: dict[str, list] = {
-        "user": [],
-        "category": [],
-        "preset_habit": [],
-        "custom_habit": [],
-        "habit_list": []
+    __data: dict[str, dict[str, Base]] = {
+        "user": {},
+        "category": {},
+        "preset_habit": {},
+        "custom_habit": {},
+        "habit_list": {}
     }
 
-    def __init__(self) -> None:
-        """Calls reload method"""
+    def __init__(
+        self,
+        filename: str = FILE_STORAGE_FILENAME,
+        journal_filename: str = FILE_STORAGE_JOURNAL_FILENAME,
+        journaled: bool = True,
+        compaction_threshold: int = FILE_STORAGE_COMPACTION_THRESHOLD,
+    ) -> None:
+        """
+        Calls reload method
+
+        :param filename: The snapshot file.
+        :param journal_filename: The append-only log of pending mutations.
+        :param journaled: If False, every write rewrites the whole snapshot.
+        :param compaction_threshold: Minimum number of journal records
+            before the journal is folded into the snapshot.
+        """
+        self.__filename = filename
+        self.__journal_filename = journal_filename
+        self.__journaled = journaled
+        self.__compaction_threshold = compaction_threshold
+        self.__journal_records = 0
+        self.__snapshot_objects = 0
+        # Journal lines held back until the open transaction ends
+        self.__pending: list[str] | None = None
         self.reload()
 
     def _save_to_file(self):
         """Helper method to save the current object data to the file"""
         serialized = {
-            k: [v.to_dict() for v in l if type(v) is not dict]
-            for k, l in self.__data.items()
+            k: [{"id": v.id, **v.to_dict()} for v in objs.values() if type(v) is not dict]
+            for k, objs in self.__data.items()
         }
 
-        with open(self.__filename, "w") as file:
-            json.dump(serialized, file, indent=4)
+        self.__snapshot_objects = sum(len(l) for l in serialized.values())
 
-    def get_all(self, model_name: str):
-        """Get all objects of a given model"""
-        return self.__data.get(model_name, [])
+        # Write to a temporary file first so a crash never leaves
+        # a half-written snapshot behind
+        tmp_filename = f"{self.__filename}.tmp"
 
-    def get(self, model_name: str, obj_id: str):
-        """Get an object by its ID"""
-        for obj in self.get_all(model_name):
-            if obj.id == obj_id:
-                return obj
-        return None
+        with open(tmp_filename, "w") as file:
+            json.dump(serialized, file, indent=4, default=str)
+
+        os.replace(tmp_filename, self.__filename)
+
+    def _append_to_journal(self, op: str, obj: Base):
+        """Helper method to append a single mutation to the journal"""
+        if not self.__journaled:
+            if self.__pending is not None:
+                # The snapshot is rewritten once, when the transaction ends
+                self.__pending.append(op)
+            else:
+                self._save_to_file()
+            return
+
+        record = {
+            "op": op,
+            "model": obj.__class__.__name__.lower(),
+            "id": obj.id,
+        }
+
+        if op != "delete":
+            record["data"] = obj.to_dict()
+
+        line = json.dumps(record, default=str) + "\n"
+
+        if self.__pending is not None:
+            self.__pending.append(line)
+            return
+
+        self._write_to_journal([line])
+
+    def _write_to_journal(self, lines: list[str]):
+        """Helper method to write journal lines, compacting if needed"""
+        with open(self.__journal_filename, "a") as file:
+            file.writelines(lines)
+
+        self.__journal_records += len(lines)
+
+        if self.__journal_records >= max(self.__compaction_threshold, self.__snapshot_objects):
+            self.compact()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Append every mutation made inside the block to the journal at once.
+
+        Without a journal, the snapshot is rewritten once when the block
+        ends instead. If the block raises, nothing is written and the data
+        is reloaded from disk to undo the in-memory changes.
+        """
+        if self.__pending is not None:
+            # Nested blocks join the outer one
+            yield self
+            return
+
+        self.__pending = []
 
-    def reload(self):
-        """Reloads the data from the file"""
-        file_data = {}
         try:
-            with open(self.__filename, "r") as file:
-                file_data = json.load(file)
-        except FileNotFoundError:
-            from src.models.category import Category
+            yield self
+
+        except BaseException:
+            self.__pending = None
+            self.reload()
+            raise
 
-            self.__data["category"] = [Category("Fruits")]
+        lines, self.__pending = self.__pending, None
 
+        if lines and self.__journaled:
+            self._write_to_journal(lines)
+        elif lines:
             self._save_to_file()
 
+    def compact(self):
+        """Folds the journal into the snapshot and truncates the journal"""
+        self._save_to_file()
+
+        if os.path.exists(self.__journal_filename):
+            os.remove(self.__journal_filename)
+
+        self.__journal_records = 0
+
+    @staticmethod
+    def _model_classes() -> dict:
+        """Maps every model name used in files to its class"""
         from src.models.user import User
         from src.models.category import Category
         from src.models.preset_habit import PresetHabit
         from src.models.custom_habit import CustomHabit
-        from src.models.habit_list import HabitList
-        
+        from src.models.habit_list import HabitList, HabitListItem
 
         models = {
             "user": User,
             "category": Category,
             "preset_habit": PresetHabit,
             "custom_habit": CustomHabit,
-            "habit_list": HabitList
-            
+            "habit_list": HabitList,
+            "habit_list_item": HabitListItem,
         }
 
+        for cls in list(models.values()):
+            models[cls.__name__.lower()] = cls
+
+        return models
+
+    @staticmethod
+    def _instantiate(cls, item: dict) -> Base:
+        """Builds a model instance from its serialized form"""
+        instance: Base = cls(**item)
+
+        if "created_at" in item:
+            instance.created_at = datetime.fromisoformat(item["created_at"])
+        if "updated_at" in item:
+            instance.updated_at = datetime.fromisoformat(item["updated_at"])
+
+        return instance
+
+    def _put(self, model: str, obj: Base) -> None:
+        """Helper method to store an object and index it"""
+        self.__data.setdefault(model, {})[obj.id] = obj
+
+        if model not in self.__indexes:
+            self.__indexes[model] = SecondaryIndexes(get_indexed_fields(obj.__class__))
+
+        self.__indexes[model].add(obj)
+
+    def _pop(self, model: str, obj_id: str) -> Base | None:
+        """Helper method to remove an object and its index entries"""
+        if model in self.__indexes:
+            self.__indexes[model].remove(obj_id)
+
+        return self.__data.get(model, {}).pop(obj_id, None)
+
+    def get_all(self, model_name):
+        """Get all objects of a given model"""
+        return list(self.__data.get(get_model_name(model_name), {}).values())
+
+    def get(self, model_name, obj_id: str):
+        """Get an object by its ID"""
+        return self.__data.get(get_model_name(model_name), {}).get(obj_id)
+
+    def find_by(self, model_name, **equals) -> list:
+        """Get all objects of a given model whose fields equal the given values"""
+        model = get_model_name(model_name)
+
+        return find_in(self.__data.get(model, {}), self.__indexes.get(model), equals)
+
+    def exists_by(self, model_name, **equals) -> bool:
+        """Check if an object of a given model has the given field values"""
+        return bool(self.find_by(model_name, **equals))
+
+    def reload(self):
+        """Reloads the data from the snapshot and replays the journal"""
+        # Objects are kept per model in an id -> object dict, which gives
+        # O(1) lookups by id while preserving insertion order for get_all
+        self.__data = {model: {} for model in self.__data}
+        self.__indexes: dict[str, SecondaryIndexes] = {}
+
+        file_data = {}
+        try:
+            with open(self.__filename, "r") as file:
+                file_data = json.load(file)
+        except FileNotFoundError:
+            from src.models.category import Category
+
+            self._put("category", Category("Fruits"))
+
+            self._save_to_file()
+
+        models = self._model_classes()
+
         for model, data in file_data.items():
             for item in data:
-                instance: Base = models[model](**item)
-
-                if "created_at" in item:
-                    instance.created_at = datetime.fromisoformat(
-                        item["created_at"]
-                    )
-                if "updated_at" in item:
-                    instance.updated_at = datetime.fromisoformat(
-                        item["updated_at"]
-                    )
+                instance = self._instantiate(models[model], item)
 
                 self.save(data=instance, save_to_file=False)
 
+        self.__snapshot_objects = sum(len(data) for data in file_data.values())
+        self.__journal_records = 0
+
+        try:
+            with open(self.__journal_filename, "r") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn write at the tail of the journal is the only
+                # way to get here, everything before it is intact.
+                # Compact right away so new records are not appended
+                # after the broken line
+                self.compact()
+                return
+
+            self._replay(record, models)
+            self.__journal_records += 1
+
+    def _replay(self, record: dict, models: dict):
+        """Applies a single journal record to the in-memory data"""
+        model = record["model"]
+
+        if record["op"] == "delete":
+            self._pop(model, record["id"])
+            return
+
+        self._put(model, self._instantiate(models[model], {**record["data"], "id": record["id"]}))
+
     def save(self, data: Base, save_to_file=True):
         """Save an object to the repository"""
         model: str = data.__class__.__name__.lower()
 
-        if model not in self.__data:
-            self.__data[model] = []
-
-        self.__data[model].append(data)
+        self._put(model, data)
 
         if save_to_file:
-            self._save_to_file()
+            self._append_to_journal("save", data)
 
     def update(self, obj: Base):
         """Update an object in the repository"""
         cls = obj.__class__.__name__.lower()
+        objs = self.__data.get(cls, {})
 
-        for i, o in enumerate(self.__data[cls]):
-            if o.id == obj.id:
-                obj.updated_at = datetime.now()
-                self.__data[cls][i] = obj
-                self._save_to_file()
-                return obj
+        if obj.id not in objs:
+            return None
+
+        obj.updated_at = datetime.now()
+        self._put(cls, obj)
+        self._append_to_journal("update", obj)
 
-        return None
+        return obj
 
     def delete(self, obj: Base):
         """Delete an object from the repository"""
         class_name = obj.__class__.__name__.lower()
 
-        if obj not in self.__data[class_name]:
+        if self._pop(class_name, obj.id) is None:
             return False
 
-        self.__data[class_name].remove(obj)
-
-        self._save_to_file()
+        self._append_to_journal("delete", obj)
 
         return True
@@ -0,0 +1,112 @@
+"""
+This module exports the secondary indexes used by the repositories
+that keep their objects in memory
+"""
+
+from typing import Any
+from src.models.base import Base
+
+
+def get_model_name(model) -> str:
+    """
+    Get the name a model is stored under.
+
+    :param model: The model class or its name.
+    :return: The lowercased class name.
+    """
+    return model if isinstance(model, str) else model.__name__.lower()
+
+
+def get_indexed_fields(cls) -> tuple[str, ...]:
+    """
+    Get the fields of a model that should be indexed.
+
+    These are the same columns the database indexes: the ones
+    declared with `index=True` or `unique=True`.
+
+    :param cls: The model class.
+    :return: The names of the indexed fields.
+    """
+    table = getattr(cls, "__table__", None)
+
+    if table is None:
+        return ()
+
+    return tuple(
+        column.key
+        for column in table.columns
+        if (column.index or column.unique) and not column.primary_key
+    )
+
+
+class SecondaryIndexes:
+    """
+    Equality indexes over some fields of the objects of one model.
+
+    Each field maps a value to the objects holding it, keyed by id.
+    The indexed values of every object are remembered so they can be
+    removed even after the object has been mutated in place.
+    """
+
+    def __init__(self, fields: tuple[str, ...]) -> None:
+        """
+        Initialize empty indexes for the given fields.
+        """
+        self.fields = fields
+        self.__entries: dict[str, dict[Any, dict[str, Base]]] = {field: {} for field in fields}
+        self.__values: dict[str, dict[str, Any]] = {}
+
+    def add(self, obj: Base) -> None:
+        """Index an object, replacing its previous entries if any"""
+        self.remove(obj.id)
+
+        values = {field: getattr(obj, field, None) for field in self.fields}
+
+        for field, value in values.items():
+            self.__entries[field].setdefault(value, {})[obj.id] = obj
+
+        self.__values[obj.id] = values
+
+    def remove(self, obj_id: str) -> None:
+        """Remove the entries of an object"""
+        values = self.__values.pop(obj_id, None)
+
+        if values is None:
+            return
+
+        for field, value in values.items():
+            objs = self.__entries[field][value]
+            objs.pop(obj_id, None)
+
+            if not objs:
+                del self.__entries[field][value]
+
+    def lookup(self, field: str, value: Any) -> list[Base]:
+        """Get the objects whose field had the given value when indexed"""
+        return list(self.__entries[field].get(value, {}).values())
+
+
+def find_in(objs: dict[str, Base], indexes: SecondaryIndexes | None, equals: dict) -> list[Base]:
+    """
+    Get the objects whose fields equal the given values.
+
+    The first indexed field in `equals` narrows down the candidates,
+    the remaining fields are checked on each candidate.
+
+    :param objs: The objects of the model, keyed by id.
+    :param indexes: The secondary indexes of the model, if any.
+    :param equals: The field values to match.
+    :return: The matching objects, in insertion order when no index is used.
+    """
+    candidates = objs.values()
+
+    if indexes is not None:
+        for field, value in equals.items():
+            if field in indexes.fields:
+                candidates = indexes.lookup(field, value)
+                break
+
+    return [
+        obj for obj in candidates
+        if all(getattr(obj, field, None) == value for field, value in equals.items())
+    ]
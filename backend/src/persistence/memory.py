@@ -5,6 +5,7 @@ it only stores it in memory
 
 from datetime import datetime
 from src.models.base import Base
+from src.persistence.indexes import SecondaryIndexes, find_in, get_indexed_fields, get_model_name
 from src.persistence.repository import Repository
 #from populate import populate_db
 
@@ -18,26 +19,53 @@ class MemoryRepository(Repository):
     Every time the server is restarted, the data is lost
     """
 
-    __data: dict[str, list] = {
-        "user": [],
-        "category": [],
-        "item": [],
+    __data: dict[str, dict[str, Base]] = {
+        "user": {},
+        "category": {},
+        "item": {},
     }
 
     def __init__(self) -> None:
         """Calls reload method"""
+        # Objects are kept per model in an id -> object dict, which gives
+        # O(1) lookups by id while preserving insertion order for get_all
+        self.__data = {model: {} for model in self.__data}
+        self.__indexes: dict[str, SecondaryIndexes] = {}
         self.reload()
 
-    def get_all(self, model_name: str) -> list:
+    def _put(self, model: str, obj: Base) -> None:
+        """Helper method to store an object and index it"""
+        self.__data.setdefault(model, {})[obj.id] = obj
+
+        if model not in self.__indexes:
+            self.__indexes[model] = SecondaryIndexes(get_indexed_fields(obj.__class__))
+
+        self.__indexes[model].add(obj)
+
+    def _pop(self, model: str, obj_id: str) -> Base | None:
+        """Helper method to remove an object and its index entries"""
+        if model in self.__indexes:
+            self.__indexes[model].remove(obj_id)
+
+        return self.__data.get(model, {}).pop(obj_id, None)
+
+    def get_all(self, model_name) -> list:
         """Get all objects of a given model"""
-        return self.__data.get(model_name, [])
+        return list(self.__data.get(get_model_name(model_name), {}).values())
 
-    def get(self, model_name: str, obj_id: str):
+    def get(self, model_name, obj_id: str):
         """Get an object by its ID"""
-        for obj in self.get_all(model_name):
-            if obj.id == obj_id:
-                return obj
-        return None
+        return self.__data.get(get_model_name(model_name), {}).get(obj_id)
+
+    def find_by(self, model_name, **equals) -> list:
+        """Get all objects of a given model whose fields equal the given values"""
+        model = get_model_name(model_name)
+
+        return find_in(self.__data.get(model, {}), self.__indexes.get(model), equals)
+
+    def exists_by(self, model_name, **equals) -> bool:
+        """Check if an object of a given model has the given field values"""
+        return bool(self.find_by(model_name, **equals))
 
     def reload(self):
         """Populates the database with some dummy data"""
@@ -47,9 +75,9 @@ class MemoryRepository(Repository):
         """Save an object"""
         cls = obj.__class__.__name__.lower()
 
-        if obj not in self.__data[cls]:
+        if obj.id not in self.__data.get(cls, {}):
             # print(f"Saving {obj}, {cls}")
-            self.__data[cls].append(obj)
+            self._put(cls, obj)
 
         return obj
 
@@ -57,20 +85,16 @@ class MemoryRepository(Repository):
         """Update an object"""
         cls = obj.__class__.__name__.lower()
 
-        for i, o in enumerate(self.__data[cls]):
-            if o.id == obj.id:
-                obj.updated_at = datetime.now()
-                self.__data[cls][i] = obj
-                return obj
+        if obj.id not in self.__data.get(cls, {}):
+            return None
 
-        return None
+        obj.updated_at = datetime.now()
+        self._put(cls, obj)
+
+        return obj
 
     def delete(self, obj: Base) -> bool:
         """Delete an object"""
         cls = obj.__class__.__name__.lower()
 
-        if obj in self.__data[cls]:
-            self.__data[cls].remove(obj)
-            return True
-
-        return False
+        return self._pop(cls, obj.id) is not None
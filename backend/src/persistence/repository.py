@@ -1,6 +1,8 @@
 """ Repository pattern for data access layer """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
 
 
 class Repository(ABC):
@@ -18,6 +20,42 @@ class Repository(ABC):
     def get(self, model_name: str, id: str) -> None:
         """Get an object by id"""
 
+    def get_page(self, model_name: str, limit: int, after: str | None = None) -> list:
+        """
+        Get the first objects of a model in ID order, after a given ID
+
+        Repositories with an index on the IDs override this to seek
+        to the page instead of sorting every object
+
+        :param model_name: The model class or its name.
+        :param limit: The number of objects at most.
+        :param after: The ID of the last object of the previous page.
+        :return: The objects of the page.
+        """
+        objs = sorted(self.get_all(model_name), key=lambda obj: obj.id)
+
+        return [obj for obj in objs if after is None or obj.id > after][:limit]
+
+    def iter_all(self, model_name: str, after: str | None = None) -> Iterator:
+        """
+        Iterate over the objects of a model in ID order, after a given ID
+
+        Repositories that read from a database override this to load
+        a batch of rows at a time instead of every object at once
+
+        :param model_name: The model class or its name.
+        :param after: The ID to start after, to resume an interrupted iteration.
+        """
+        return iter(self.get_page(model_name, len(self.get_all(model_name)), after))
+
+    @abstractmethod
+    def find_by(self, model_name: str, **equals) -> list:
+        """Get all objects of a model whose fields equal the given values"""
+
+    @abstractmethod
+    def exists_by(self, model_name: str, **equals) -> bool:
+        """Check if an object of a model has the given field values"""
+
     @abstractmethod
     def save(self, obj) -> None:
         """Save an object"""
@@ -29,3 +67,22 @@ class Repository(ABC):
     @abstractmethod
     def delete(self, obj) -> bool:
         """Delete an object"""
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group every save, update and delete made inside the block
+        into a single unit of work
+
+        Repositories that persist data override this to write once
+        at the end of the block and to roll back if it raises
+        """
+        yield self
+
+    def release_connection(self) -> None:
+        """
+        Give back any connection held by the current unit of work,
+        before waiting on slow work outside of the repository
+
+        Repositories without connections have nothing to release
+        """
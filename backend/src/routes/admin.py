@@ -1,5 +1,6 @@
 from flask import jsonify, Blueprint
 from flask_jwt_extended import jwt_required, get_jwt
+from src.services.notifications import dispatcher
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -22,3 +23,21 @@ def admin_data():
         return jsonify({"msg": "Administration rights required"}), 403
 
     return jsonify({"msg": "Admin access granted"}), 200
+
+@admin_bp.route("/admin/metrics/events", methods=["GET"])
+@jwt_required()
+def event_metrics():
+    """
+    Get the metrics of the Socket.IO event dispatcher.
+
+    This endpoint returns whether the dispatcher runs, its queue depth and
+    its counters of queued, coalesced, dropped and sent events. It requires
+    a JWT token with an "is_admin" claim, else it returns a 403 error.
+
+    :return: A JSON object with the metrics and a 200 status code.
+    """
+    claims = get_jwt()
+    if not claims.get("is_admin"):
+        return jsonify({"msg": "Administration rights required"}), 403
+
+    return jsonify(dispatcher.metrics()), 200
@@ -1,11 +1,10 @@
 from flask import request, jsonify, Blueprint
 from flask_jwt_extended import create_access_token
 from src.models.user import User
-from flask_bcrypt import Bcrypt
+from src.persistence import repo
+from src.services.passwords import check_password
 from datetime import timedelta
 
-bcrypt = Bcrypt()
-
 auth_bp = Blueprint("auth", __name__)
 @auth_bp.route("/login", methods=["POST"])
 def login():
@@ -21,14 +20,23 @@ def login():
     """
     email = request.json.get("email", None)
     password = request.json.get("password", None)
-    user = User.query.filter_by(email=email).first()
+    users = User.find_by(email=email)
+    user = users[0] if users else None
+    password_hash = user.password_hash if user else None
+
+    # Don't hold a database connection while the password is checked,
+    # hashing takes long enough to exhaust the pool during a login burst
+    repo.release_connection()
 
-    if user and bcrypt.check_password_hash(user.password_hash, password):
+    if user and check_password(password_hash, password):
         additional_claims = {"is_admin": user.is_admin}
         expires = timedelta(hours=1)
         access_token = create_access_token(identity=user.id, additional_claims=additional_claims, 
                                            expires_delta=expires)
-        user.check_daily_streak()  # Update user streak and login count
+        with repo.transaction():
+            if user.password_needs_rehash():
+                user.set_password(password)  # The work factor changed, saved with the streak
+            user.check_daily_streak()  # Update user streak and login count
         return jsonify(access_token=access_token, user_id=user.id ), 200
     
     return jsonify({"msg": "Bad email or password"}), 401
@@ -0,0 +1,52 @@
+from hashlib import sha1
+from typing import Any, Callable
+from flask import Blueprint, make_response, request
+
+
+def make_etag(*parts) -> str:
+    """
+    Get a strong ETag from the values that version a response.
+
+    :param parts: e.g. the ID and version of a user. They are only hashed, so any value with a str works.
+    """
+    return sha1("\x1f".join(map(str, parts)).encode()).hexdigest()
+
+
+def conditional(etag: str, build: Callable[[], Any]):
+    """
+    Respond with a 304 Not Modified if the client already has the ETag, else build the response.
+
+    The ETag is checked first, so a response the client has is never
+    serialized. Handlers compute it from versions they already have,
+    like User.version or the catalog snapshot, not from the body.
+
+    :param etag: The ETag of the response the handler would build.
+    :param build: Returns the response, anything a view function can return.
+    :return: The response, with the ETag.
+    """
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(build())
+
+    response.set_etag(etag)
+
+    return response
+
+
+def cache_control(blueprint: Blueprint, value: str) -> None:
+    """
+    Set the Cache-Control of the successful GET responses of a blueprint.
+
+    Responses that set their own Cache-Control keep it.
+
+    :param blueprint: The blueprint of the endpoints.
+    :param value: The Cache-Control header, e.g. "private, no-cache".
+    """
+    @blueprint.after_request
+    def set_cache_control(response):
+        if (request.method in ("GET", "HEAD") and response.status_code in (200, 304)
+                and "Cache-Control" not in response.headers):
+            response.headers["Cache-Control"] = value
+
+        return response
@@ -1,62 +1,62 @@
-from flask import abort, request, jsonify, Blueprint
-from src.models.preset_habit import PresetHabit
+from flask import Response, abort, request, jsonify, Blueprint
 from src.models.category import Category
+from src.routes.caching import cache_control, conditional
+from src.services.catalog import catalog
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 categories_bp = Blueprint("categories", __name__, url_prefix="/categories")
+# The catalog is the same for everyone. Revalidated on every use, so a
+# change shows at once, the snapshot's ETag makes that a 304 otherwise
+cache_control(categories_bp, "public, no-cache")
 
 @categories_bp.route("/", methods=["GET"])
 def get_categories():
     """
     Get all categories.
 
-    This endpoint returns a list of all categories.
+    This endpoint returns a list of all categories, from the catalog snapshot. The ETag is the
+    one of the snapshot.
 
     :return: A list of all categories.
     """
-    categories: list[Category] = Category.get_all()
+    snapshot = catalog.get()
 
-    return [category.to_dict() for category in categories]
+    return conditional(snapshot.etag, lambda: Response(snapshot.categories_json, mimetype="application/json"))
 
 @categories_bp.route("/<name>", methods=["GET"])
 def get_categories_by_name(name: str):
     """
     Get a category by name.
 
-    This endpoint returns a category with the given name. If the category is not found, it aborts with a 404 status code.
+    This endpoint returns a category with the given name, from the catalog snapshot. If the category is not found, it aborts with a 404 status code.
 
     :param name: The name of the category to get.
     :return: The category.
     """
-    category: Category | None = Category.get(name)
+    snapshot = catalog.get()
+    category = snapshot.categories.get(name)
 
     if not category:
         abort(404, f"Category with name '{name}' not found")
 
-    return category.to_dict()
+    return conditional(snapshot.etag, lambda: dict(category))
 
 @categories_bp.route("/<name>/preset_habits", methods=["GET"])
 def get_categories_habits(name: str):
     """
     Get the preset habits of a category.
 
-    This endpoint returns the preset habits of a category with the given name. If the category is not found, it aborts with a 404 status code.
+    This endpoint returns the preset habits of a category with the given name, from the catalog snapshot. If the category is not found, it aborts with a 404 status code.
 
     :param name: The name of the category to get the preset habits of.
     :return: The preset habits of the category.
     """
-    category: Category | None = Category.get(name)
+    snapshot = catalog.get()
 
-    if not category:
+    if name not in snapshot.categories:
         abort(404, f"Category with name '{name}' not found")
 
-    preset_habits: list[PresetHabit] = PresetHabit.get_all()
-
-    category_items = [
-        preset_habit.to_dict() for preset_habit in preset_habits if preset_habit.category_name == category.name
-    ]
-
-    return category_items
+    return conditional(snapshot.etag, lambda: Response(snapshot.by_category_json[name], mimetype="application/json"))
 
 @categories_bp.route("/", methods=["POST"])
 @jwt_required()
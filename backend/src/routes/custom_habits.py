@@ -2,6 +2,7 @@ from flask import abort, request, jsonify, Blueprint
 from src.models import db
 from src.models.custom_habit import CustomHabit
 from src.models.user import User
+from src.routes.pagination import list_response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 
@@ -13,8 +14,9 @@ def get_custom_habits():
     """
     Get all custom habits.
 
-    This endpoint retrieves all custom habits. It requires a valid JWT token for authentication
-    and administration rights.
+    This endpoint retrieves all custom habits, a page of them with the `limit` and `after` query
+    parameters, or streams them as NDJSON with `stream=ndjson`. It requires a valid JWT token for
+    authentication and administration rights.
     
     Returns:
         Response: A JSON response with a list of custom habits and status code 200
@@ -22,10 +24,8 @@ def get_custom_habits():
     claims = get_jwt()
     if not claims.get('is_admin'):
         return jsonify({"msg": "Administration rights required"}), 403
-    
-    custom_habits: list[CustomHabit] = CustomHabit.get_all()
 
-    return [custom_habit.to_dict() for custom_habit in custom_habits], 200
+    return list_response(CustomHabit)
 
 @custom_habits_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -121,7 +121,7 @@ def get_user_custom_habits():
         Response: A JSON response with a list of custom habits and status code 200
     """
     current_user_id = get_jwt_identity()
-    custom_habits: list[CustomHabit] = CustomHabit.query.filter_by(habit_owner_id=current_user_id).all()
+    custom_habits: list[CustomHabit] = CustomHabit.find_by(habit_owner_id=current_user_id)
 
     return jsonify([custom_habit.to_dict() for custom_habit in custom_habits]), 200
 
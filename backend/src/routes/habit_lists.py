@@ -3,38 +3,16 @@ from src.models import db
 from src.models.habit_list import HabitList
 from src.models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from src import socketio
-import json
-from datetime import datetime
+from src.persistence import repo
+from src.services.habit_completion import complete_habit
+from src.routes.caching import cache_control, conditional, make_etag
+from src.routes.pagination import list_response
+from src.services.notifications import emit_to_user
+from src.services.reminders import cancel_reminders
 
 habit_lists_bp = Blueprint("habit_lists", __name__, url_prefix="/habit_lists")
-
-def default_serializer(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
-
-def get_habit_details(habit_list):
-    from src.models.preset_habit import PresetHabit
-    from src.models.custom_habit import CustomHabit
-
-    habits = []
-    for item in habit_list.habits:
-        if item.preset_habit_id:
-            habit = PresetHabit.get(item.preset_habit_id)
-            habits.append({
-                "id": item.id,
-                "description": habit.description,
-                "type": "preset"
-            })
-        elif item.custom_habit_id:
-            habit = CustomHabit.get(item.custom_habit_id)
-            habits.append({
-                "id": item.id,
-                "description": habit.description,
-                "type": "custom"
-            })
-    return habits
+# Revalidated on every use, the ETags make that a 304 when nothing changed
+cache_control(habit_lists_bp, "private, no-cache")
 
 @habit_lists_bp.route("/", methods=["GET"])
 @jwt_required()
@@ -42,8 +20,9 @@ def get_habit_lists():
     """
     Get all habit lists.
 
-    This endpoint retrieves all habit lists. It requires a valid JWT token for authentication
-    and administration rights.
+    This endpoint retrieves all habit lists, a page of them with the `limit` and `after` query
+    parameters, or streams them as NDJSON with `stream=ndjson`. It requires a valid JWT token for
+    authentication and administration rights.
 
     Returns:
         Response: A JSON response with a list of habit lists and status code 200 if successful.
@@ -51,10 +30,8 @@ def get_habit_lists():
     claims = get_jwt()
     if not claims.get("is_admin"):
         return jsonify({"msg": "Administration rights required"}), 403
-    
-    habit_lists: list[HabitList] = HabitList.get_all()
 
-    return [habit_list.to_dict() for habit_list in habit_lists], 200
+    return list_response(HabitList)
 
 @habit_lists_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -82,9 +59,8 @@ def create_habit_list():
         abort(404, str(e))
 
     habit_list_data = habit_list.to_dict()
-    habit_list_data_serialized = json.loads(json.dumps(habit_list_data, default=default_serializer))
 
-    socketio.emit("habit_list_created", habit_list_data_serialized)
+    emit_to_user("habit_list_created", habit_list_data, habit_list.list_owner_id)
 
     return habit_list_data, 201
 
@@ -94,7 +70,9 @@ def get_habit_list_by_id(habit_list_id: str):
     """
     Get a habit list by ID.
 
-    This endpoint retrieves a habit list by its ID.
+    This endpoint retrieves a habit list by its ID. With ?expand=habits, the habits
+    of the list are included, loaded with the list in one query. Without it, the
+    response has an ETag and is a 304 if the If-None-Match header has it.
 
     Args:
         habit_list_id (str): The ID of the habit list to retrieve.
@@ -102,12 +80,25 @@ def get_habit_list_by_id(habit_list_id: str):
     Returns:
         Response: A JSON response with the habit list and status code 200 if successful.
     """
+    expand = request.args.get("expand")
+
+    if expand is not None:
+        if expand != "habits":
+            abort(400, f"Cannot expand {expand}")
+
+        habit_list_data = HabitList.get_details(habit_list_id)
+
+        if not habit_list_data:
+            abort(404, f"Habit list with ID {habit_list_id} not found")
+
+        return habit_list_data, 200
+
     habit_list: HabitList | None = HabitList.get(habit_list_id)
 
     if not habit_list:
         abort(404, f"Habit list with ID {habit_list_id} not found")
 
-    return habit_list.to_dict(), 200
+    return conditional(make_etag(habit_list.id, habit_list.updated_at), habit_list.to_dict)
 
 @habit_lists_bp.route("/user", methods=["GET"])
 @jwt_required()
@@ -116,14 +107,18 @@ def get_user_habit_lists():
     Get habit lists of the current user.
 
     This endpoint retrieves the habit lists of the current user. It requires a valid JWT token for authentication.
+    The response has an ETag and is a 304 if the If-None-Match header has it.
 
     Returns:
         Response: A JSON response with a list of habit lists and status code 200 if successful.
     """
     current_user_id = get_jwt_identity()
     habit_lists = HabitList.get_by_user_id(current_user_id)
+    etag = make_etag(current_user_id, *(
+        (habit_list.id, habit_list.updated_at) for habit_list in habit_lists
+    ))
 
-    return jsonify([habit_list.to_dict() for habit_list in habit_lists]), 200
+    return conditional(etag, lambda: jsonify([habit_list.to_dict() for habit_list in habit_lists]))
 
 @habit_lists_bp.route("/<habit_list_id>", methods=["PUT"])
 @jwt_required()
@@ -182,12 +177,19 @@ def delete_habit_list(habit_list_id: str):
     if not current_user.is_admin and habit_list.list_owner_id != current_user_id:
         abort(403, "You are not authorized to delete this habit list.")
 
-    # Delete all HabitListItem instances that reference the HabitList
-    for habit in habit_list.habits:
-        db.session.delete(habit)
+    habit_list_item_ids = []
 
-    if not HabitList.delete(habit_list_id):
-        abort(404, f"Habit list with ID {habit_list_id} not found")
+    with repo.transaction():
+        # Delete all HabitListItem instances that reference the HabitList
+        for habit in habit_list.habits:
+            habit_list_item_ids.append(habit.id)
+            repo.delete(habit)
+
+        if not HabitList.delete(habit_list_id):
+            abort(404, f"Habit list with ID {habit_list_id} not found")
+
+    # Only once the items are gone, a rollback keeps their reminders
+    cancel_reminders(habit_list_item_ids)
 
     return "", 204
 
@@ -204,7 +206,6 @@ def add_habit_to_habit_list(habit_list_id: str):
     :param habit_list_id: The ID of the habit list to add habits to.
     :return: A JSON object with the added preset habits and a 200 status code.
     """
-    from src.models.preset_habit import PresetHabit
     from src.models.habit_list import HabitListItem
 
     data = request.get_json()
@@ -218,27 +219,15 @@ def add_habit_to_habit_list(habit_list_id: str):
     if not habit_list:
         abort(404, f"Habit list with ID {habit_list_id} not found")
 
-    added_preset_habits = []
-    for preset_habit_id in preset_habit_ids:
-        preset_habit = PresetHabit.get(preset_habit_id)
-        if not preset_habit:
-            abort(404, f"Habit with ID {preset_habit_id} not found")
-
-        habit_list_item = HabitListItem.get(habit_list_id, preset_habit_id)
-
-        if habit_list_item:
-            continue
-
-        new_habit_list_item = HabitListItem.create({"habit_list_id": habit_list_id, "preset_habit_id": preset_habit_id})
-        added_preset_habits.append(new_habit_list_item.to_dict())
+    try:
+        added_preset_habits = HabitListItem.add_habits(habit_list_id, "preset", preset_habit_ids)
 
-    # Serialize habit list data
-    habit_list_data = habit_list.to_dict()
-    habit_list_data['habits'] = get_habit_details(habit_list)  # Ensure habits are included
-    habit_list_data_serialized = json.loads(json.dumps(habit_list_data, default=default_serializer))
+    except LookupError as e:
+        abort(404, str(e))
 
-    # Emit the habit list data to WebSocket clients
-    socketio.emit("habit_list_update", {"habit_list_id": habit_list_id, "habit_list_data": habit_list_data_serialized})
+    # Queue the habit list data, with its habits loaded in one query, for the owner's and the admins' WebSocket clients
+    emit_to_user("habit_list_update", {"habit_list_id": habit_list_id, "habit_list_data": HabitList.get_details(habit_list_id)},
+                 habit_list.list_owner_id, key=habit_list_id)
 
     return {"added_preset_habits": added_preset_habits}, 200
 
@@ -255,7 +244,6 @@ def add_custom_habit_to_habit_list(habit_list_id: str):
     :param habit_list_id: The ID of the habit list to add habits to.
     :return: A JSON object with the added custom habits and a 200 status code.
     """
-    from src.models.custom_habit import CustomHabit
     from src.models.habit_list import HabitListItem
 
     data = request.get_json()
@@ -269,27 +257,15 @@ def add_custom_habit_to_habit_list(habit_list_id: str):
     if not habit_list:
         abort(404, f"Habit list with ID {habit_list_id} not found")
 
-    added_custom_habits = []
-    for custom_habit_id in custom_habit_ids:
-        custom_habit = CustomHabit.get(custom_habit_id)
-        if not custom_habit:
-            abort(404, f"Habit with ID {custom_habit_id} not found")
-
-        habit_list_item = HabitListItem.get(habit_list_id, custom_habit_id)
-
-        if habit_list_item:
-            continue
-
-        new_habit_list_item = HabitListItem.create({"habit_list_id": habit_list_id, "custom_habit_id": custom_habit_id})
-        added_custom_habits.append(new_habit_list_item.to_dict())
+    try:
+        added_custom_habits = HabitListItem.add_habits(habit_list_id, "custom", custom_habit_ids)
 
-    # Serialize habit list data
-    habit_list_data = habit_list.to_dict()
-    habit_list_data['habits'] = get_habit_details(habit_list)  # Ensure habits are included
-    habit_list_data_serialized = json.loads(json.dumps(habit_list_data, default=default_serializer))
+    except LookupError as e:
+        abort(404, str(e))
 
-    # Emit the habit list data to WebSocket clients
-    socketio.emit("habit_list_update", {"habit_list_id": habit_list_id, "habit_list_data": habit_list_data_serialized})
+    # Queue the habit list data, with its habits loaded in one query, for the owner's and the admins' WebSocket clients
+    emit_to_user("habit_list_update", {"habit_list_id": habit_list_id, "habit_list_data": HabitList.get_details(habit_list_id)},
+                 habit_list.list_owner_id, key=habit_list_id)
 
     return {"added_custom_habits": added_custom_habits}, 200
 
@@ -304,24 +280,18 @@ def get_habits(habit_list_id: str, habit_type: str):
     :param habit_type: The type of habits to fetch ('preset' or 'custom').
     :return: A JSON object with the habits and a 200 status code.
     """
-    from src.models.custom_habit import CustomHabit
-    from src.models.preset_habit import PresetHabit
     from src.models.habit_list import HabitListItem
 
+    if habit_type not in ("preset", "custom"):
+        abort(400, "Invalid habit type")
+
     habit_list = HabitList.get(habit_list_id)
     if not habit_list:
         abort(404, f"Habit list with ID {habit_list_id} not found")
 
-    habit_list_items = HabitListItem.query.filter_by(habit_list_id=habit_list_id).all()
+    habits = HabitListItem.get_habits_of_list(habit_list_id, habit_type)
 
-    if habit_type == "preset":
-        habits = [PresetHabit.get(habit_item.preset_habit_id) for habit_item in habit_list_items if habit_item.preset_habit_id]
-    elif habit_type == "custom":
-        habits = [CustomHabit.get(habit_item.custom_habit_id) for habit_item in habit_list_items if habit_item.custom_habit_id]
-    else:
-        abort(400, "Invalid habit type")
-
-    return jsonify([habit.to_dict() for habit in habits if habit]), 200
+    return jsonify([habit.to_dict() for habit in habits]), 200
 
 @habit_lists_bp.route("/<habit_list_id>/habits", methods=["GET"])
 @jwt_required()
@@ -361,36 +331,18 @@ def complete_preset_habit(habit_list_id: str, habit_id: str):
         habit_list_id (str): The ID of the habit list.
         habit_id (str): The ID of the preset habit to complete.
     """
-    from src.models.habit_list import HabitListItem
-
     try:
-        habit_list = HabitList.query.get(habit_list_id)
-        if not habit_list:
-            return jsonify({"msg": f"Habit list with ID {habit_list_id} not found"}), 404
-
-        habit_list.complete_preset_habit(habit_id)
-
-        # Delete the habit from the habit list
-        habit_list_item = HabitListItem.query.filter_by(habit_list_id=habit_list_id, preset_habit_id=habit_id).first()
-        if not habit_list_item:
-            return jsonify({"msg": f"Habit with ID {habit_id} not found in habit list"}), 404
-
-        db.session.delete(habit_list_item)
-        db.session.commit()
-
-        # Get the current user
-        current_user_id = get_jwt_identity()
-        user = User.get(current_user_id)
+        user_data = complete_habit(habit_list_id, habit_id, "preset")
 
-        # Serialize user data
-        user_data = user.to_dict()
-        user_data_serialized = json.loads(json.dumps(user_data, default=default_serializer))
-
-        # Emit the user data to WebSocket clients
-        socketio.emit("user_update", {"user_id": current_user_id, "user_data": user_data_serialized})
+        # Queue the user data for the user's and the admins' WebSocket clients
+        emit_to_user("user_update", {"user_id": user_data["id"], "user_data": user_data}, user_data["id"],
+                     key=user_data["id"])
 
         return jsonify({"msg": f"Habit with ID {habit_id} completed successfully"}), 200
 
+    except LookupError as e:
+        return jsonify({"msg": str(e)}), 404
+
     except ValueError as e:
         return jsonify({"msg": str(e)}), 400
 
@@ -409,36 +361,18 @@ def complete_custom_habit(habit_list_id: str, habit_id: str):
         habit_list_id (str): The ID of the habit list.
         habit_id (str): The ID of the custom habit to complete.
     """
-    from src.models.habit_list import HabitListItem
-
     try:
-        habit_list = HabitList.query.get(habit_list_id)
-        if not habit_list:
-            return jsonify({"msg": f"Habit list with ID {habit_list_id} not found"}), 404
-
-        habit_list.complete_custom_habit(habit_id)
+        user_data = complete_habit(habit_list_id, habit_id, "custom")
 
-        # Delete the habit from the habit list
-        habit_list_item = HabitListItem.query.filter_by(habit_list_id=habit_list_id, custom_habit_id=habit_id).first()
-        if not habit_list_item:
-            return jsonify({"msg": f"Custom habit with ID {habit_id} not found in habit list"}), 404
-
-        db.session.delete(habit_list_item)
-        db.session.commit()
-
-        # Get the current user
-        current_user_id = get_jwt_identity()
-        user = User.get(current_user_id)
-
-        # Serialize user data
-        user_data = user.to_dict()
-        user_data_serialized = json.loads(json.dumps(user_data, default=default_serializer))
-
-        # Emit the user data to WebSocket clients
-        socketio.emit("user_update", {"user_id": current_user_id, "user_data": user_data_serialized})
+        # Queue the user data for the user's and the admins' WebSocket clients
+        emit_to_user("user_update", {"user_id": user_data["id"], "user_data": user_data}, user_data["id"],
+                     key=user_data["id"])
 
         return jsonify({"msg": f"Custom habit with ID {habit_id} completed successfully"}), 200
 
+    except LookupError as e:
+        return jsonify({"msg": str(e)}), 404
+
     except ValueError as e:
         return jsonify({"msg": str(e)}), 400
 
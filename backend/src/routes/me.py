@@ -0,0 +1,54 @@
+from flask import Blueprint, Response, abort
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.habit_list import HabitList
+from src.models.serialization import dumps_bytes
+from src.routes.caching import conditional, make_etag
+from src.services.deadlines import deadlines, utc_now
+
+me_bp = Blueprint("me", __name__, url_prefix="/me")
+
+@me_bp.route("/today", methods=["GET"])
+@jwt_required()
+def get_today():
+    """
+    Get everything the current user's day is made of.
+
+    This endpoint returns the user's stats, all their habit lists with the habits in them,
+    and the deadline of their current day, in place of one request per habit list. It is
+    built from two queries whatever the number of lists and habits: the user with the
+    version of their lists, and their lists outer joined with their habits.
+
+    The ETag is a version token made of the user's version and the version of their lists,
+    both read by the first query. If the If-None-Match header has it, it returns a 304
+    with no body before the lists are loaded.
+
+    Returns:
+        Response: A JSON response with "user", "habit_lists", "today" and "deadline", and a 200 status code.
+    """
+    user_id = get_jwt_identity()
+    found = HabitList.get_owner_with_details_version(user_id)
+
+    if not found:
+        abort(404, f"User with ID {user_id} not found")
+
+    user, lists_version = found
+    now = utc_now()
+    today = deadlines.local_day(user.timezone, now)
+
+    def build():
+        body = dumps_bytes({
+            "user": user.to_dict(),
+            "habit_lists": HabitList.get_details_by(HabitList.list_owner_id == user_id),
+            "today": today.isoformat(),
+            "deadline": deadlines.next_deadline(user.timezone, now).isoformat() + "Z",
+        }, sort_keys=True)
+
+        return Response(body, status=200, mimetype="application/json")
+
+    # The day is part of the token, the deadline changes with it
+    etag = make_etag(user.id, user.version, user.updated_at, today, *lists_version)
+    response = conditional(etag, build)
+    # Always revalidated, the token makes that a 304 when nothing changed
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    return response
@@ -0,0 +1,68 @@
+from flask import Response, abort, request, stream_with_context
+from urllib.parse import urlencode
+from src.models.serialization import serializer_for
+
+# Objects per page at most with ?limit=
+PAGE_MAX_LIMIT = 1000
+# Objects per page with ?after= and no ?limit=
+PAGE_DEFAULT_LIMIT = 100
+
+
+def list_response(model):
+    """
+    Respond with the objects of a model, all of them or a page.
+
+    The query parameters pick the response:
+
+    - none: every object, in one JSON array.
+    - `limit` and `after`: a JSON array of at most `limit` objects, in ID
+      order, after the one with the ID `after`. When the page is full,
+      the Link header has the URL of the next page (rel="next").
+    - `stream=ndjson`: every object after `after`, in ID order, one JSON
+      object per line, sent as they are read from the repository, so
+      memory stays flat whatever the number of objects.
+
+    The objects are written to JSON bytes straight from their attributes,
+    by the serializer of the model.
+
+    :param model: The model class to list.
+    :return: The response, or aborts with a 400 status code on invalid parameters.
+    """
+    serializer = serializer_for(model)
+    stream = request.args.get("stream")
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+
+    if stream is not None:
+        if stream != "ndjson":
+            abort(400, "stream must be ndjson")
+        if limit is not None:
+            abort(400, "limit can't be used with stream")
+
+        def lines():
+            for obj in model.iter_all(after):
+                yield serializer.to_json(obj) + b"\n"
+
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+    if limit is None and after is None:
+        return Response(serializer.to_json_list(model.get_all()), mimetype="application/json")
+
+    if limit is None:
+        limit = PAGE_DEFAULT_LIMIT
+    elif not limit.isdigit():
+        abort(400, "limit must be a number")
+
+    limit = int(limit)
+
+    if not 1 <= limit <= PAGE_MAX_LIMIT:
+        abort(400, f"limit must be between 1 and {PAGE_MAX_LIMIT}")
+
+    page = model.get_page(limit, after)
+    response = Response(serializer.to_json_list(page), mimetype="application/json")
+
+    if len(page) == limit:
+        query = urlencode({**request.args, "limit": limit, "after": page[-1].id})
+        response.headers["Link"] = f'<{request.base_url}?{query}>; rel="next"'
+
+    return response
@@ -1,21 +1,32 @@
-from flask import abort, request, jsonify, Blueprint
+from flask import Response, abort, request, jsonify, Blueprint
 from src.models.preset_habit import PresetHabit
+from src.routes.caching import cache_control, conditional
+from src.routes.pagination import list_response
+from src.services.catalog import catalog
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 preset_habit_bp = Blueprint("preset_habits", __name__, url_prefix="/preset_habits")
+# The catalog is the same for everyone. Revalidated on every use, so a
+# change shows at once, the snapshot's ETag makes that a 304 otherwise
+cache_control(preset_habit_bp, "public, no-cache")
 
 @preset_habit_bp.route("/", methods=["GET"])
 def get_preset_habits():
     """
     Get all preset habits.
 
-    This endpoint returns a list of all preset habits.
+    This endpoint returns a list of all preset habits, from the catalog snapshot, with the ETag of
+    the snapshot. It returns a page of them with the `limit` and `after` query parameters, or
+    streams them as NDJSON with `stream=ndjson`, from the repository.
 
-    :return: A list of all preset habits.
+    :return: A list of preset habits.
     """
-    preset_habits: list[PresetHabit] = PresetHabit.get_all()
+    if not request.args:
+        snapshot = catalog.get()
 
-    return [preset_habit.to_dict() for preset_habit in preset_habits]
+        return conditional(snapshot.etag, lambda: Response(snapshot.preset_habits_json, mimetype="application/json"))
+
+    return list_response(PresetHabit)
 
 @preset_habit_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -50,18 +61,19 @@ def get_preset_habits_by_id(preset_habit_id: str):
     """
     Get a preset habit by ID.
 
-    This endpoint returns a preset habit with the given ID. If the preset habit is not found, it aborts with a 404 status code.
+    This endpoint returns a preset habit with the given ID, from the catalog snapshot. If the preset habit is not found, it aborts with a 404 status code.
 
     :param preset_habit_id: The ID of the preset habit to get.
     :return: The preset habit.
     """
 
-    preset_habit: PresetHabit | None = PresetHabit.get(preset_habit_id)
+    snapshot = catalog.get()
+    preset_habit = snapshot.preset_habits.get(preset_habit_id)
 
     if not preset_habit:
         abort(404, f"Habit with ID '{preset_habit_id}' not found")
 
-    return preset_habit.to_dict()
+    return conditional(snapshot.etag, lambda: dict(preset_habit))
 
 @preset_habit_bp.route("/<preset_habit_id>", methods=["PUT"])
 @jwt_required()
@@ -0,0 +1,64 @@
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_socketio import emit, join_room, rooms
+from jwt import PyJWTError
+from src.services.notifications import ADMINS_ROOM, user_room
+from src.services.user_states import user_states
+
+def handle_connect(auth=None):
+    """
+    Authenticate a socket with an access token and join it to its rooms.
+
+    The token is read from the Socket.IO auth payload, {"token": ...}, or from
+    the token query parameter. Sockets without a valid access token are refused.
+
+    Args:
+        auth (dict): The auth payload sent by the client.
+
+    Returns:
+        bool: False to refuse the connection.
+    """
+    token = (auth or {}).get("token") or request.args.get("token")
+
+    if not token:
+        return False
+
+    try:
+        claims = decode_token(token)
+    except (PyJWTError, JWTExtendedException):
+        return False
+
+    if claims.get("type") != "access":
+        return False
+
+    join_room(user_room(claims[current_app.config["JWT_IDENTITY_CLAIM"]]))
+
+    if claims.get("is_admin"):
+        join_room(ADMINS_ROOM)
+
+
+def handle_user_resync(data=None):
+    """
+    Send a full snapshot of a user to the socket that asked for it.
+
+    Clients ask for one when they connect, and when they miss a version of
+    the user's state. Sockets only get their own user, or any user for admins.
+
+    Args:
+        data (dict): {"user_id": ...}, the user to send.
+    """
+    from src.models.user import User
+
+    user_id = (data or {}).get("user_id")
+    joined = rooms()
+
+    if not user_id or (user_room(user_id) not in joined and ADMINS_ROOM not in joined):
+        return
+
+    user = User.get(user_id)
+
+    if not user:
+        return
+
+    emit("user_update", user_states.snapshot(user_id, user.to_dict()))
@@ -1,51 +1,39 @@
 from flask import Blueprint, jsonify
 from flask import abort, request
 from src.models.user import User
+from src.models.xp_bucket import XP_PERIODS, XpBucket
 from sqlalchemy.exc import SQLAlchemyError
-from src import socketio
 from src.persistence import repo
+from src.routes.caching import cache_control, conditional, make_etag
+from src.routes.pagination import list_response
+from src.services.leaderboard import leaderboard as leaderboard_service
+from src.services.notifications import emit_to_user
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-import json
-from datetime import datetime
 
 users_bp = Blueprint("users", __name__, url_prefix="/users")
+# Revalidated on every use, the ETags make that a 304 when nothing changed
+cache_control(users_bp, "private, no-cache")
 
-def default_serializer(obj):
-    """
-    Serialize datetime objects to ISO format.
-
-    This function is used as a default serializer for JSON encoding. It checks if the
-    given object is an instance of `datetime` and converts it to an ISO 8601 formatted
-    string. If the object is not a `datetime` instance, it raises a `TypeError`.
-
-    Args:
-        obj (object): The object to be serialized.
-
-    Returns:
-        str: The ISO 8601 formatted string if the object is a `datetime` instance.
-    """
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
+LEADERBOARD_MAX_PER_PAGE = 100
 
 @users_bp.route("/", methods=["GET"])
 def get_users():
     """
     Get all users.
 
-    This endpoint returns a list of all users. If there's a database error, it aborts with a 500 status code.
+    This endpoint returns a list of all users, a page of them with the `limit` and `after` query
+    parameters, or streams them as NDJSON with `stream=ndjson`. If there's a database error, it
+    aborts with a 500 status code.
 
-    :return: A list of all users.
+    :return: A list of users.
     """
 
     try:
-        users = User.get_all()
+        return list_response(User)
 
     except SQLAlchemyError as e:
         abort(500, f"Database error: {e}")
 
-    return [user.to_dict() for user in users]
-
 @users_bp.route("/", methods=["POST"])
 def create_user():
     """
@@ -86,6 +74,8 @@ def get_user_by_id(user_id: str):
 
     This endpoint returns a user with the given ID. If there's a database error, it aborts with a 500 status code. If the user is not found, it aborts with a 400 status code.
 
+    The ETag comes from the user's version and update time. If the If-None-Match header has it, it returns a 304 with no body.
+
     :param user_id: The ID of the user to get.
     :return: The user and a 200 status code.
     """
@@ -99,15 +89,7 @@ def get_user_by_id(user_id: str):
     if not user:
         abort(400, f"User with ID {user_id} not found")
 
-    user_data = user.to_dict()
-
-    # Convert datetime objects to strings
-    user_data_serialized = json.loads(json.dumps(user_data, default=default_serializer))
-
-    # Emit the user data to WebSocket clients
-    socketio.emit("user_update", {"user_id": user_id, "user_data": user_data_serialized})
-
-    return user_data_serialized, 200
+    return conditional(make_etag(user.id, user.version, user.updated_at), user.to_dict)
 
 @users_bp.route("/<user_id>", methods=["PUT"])
 @jwt_required()
@@ -142,13 +124,10 @@ def update_user(user_id: str):
 
     user_data = user.to_dict()
 
-    # Convert datetime objects to strings
-    user_data_serialized = json.loads(json.dumps(user_data, default=default_serializer))
-
-    # Emit the user data to WebSocket clients
-    socketio.emit("user_update", {"user_id": user_id, "user_data": user_data_serialized})
+    # Queue the user data for the user's and the admins' WebSocket clients
+    emit_to_user("user_update", {"user_id": user_id, "user_data": user_data}, user_id, key=user_id)
 
-    return user_data_serialized, 200
+    return user_data, 200
 
 @users_bp.route("/<user_id>", methods=["DELETE"])
 @jwt_required()
@@ -175,12 +154,72 @@ def leaderboard():
     """
     Retrieve the leaderboard data.
 
-    This endpoint retrieves the top users for the leaderboard based on their level and XP.
-    It calls the `get_leaderboard` method of the `User` model to get the top users and returns
-    the data as a JSON response.
+    This endpoint retrieves a page of the users ranked by their level and XP from the in-memory
+    leaderboard. The page is chosen with the `page` and `per_page` query parameters and defaults
+    to the top 10 users. With the `period` query parameter set to day, week or month, the users
+    are ranked by the XP they gained in the current period instead.
+
+    The ETag is made of the version of the board and the page. The all-time board's version
+    is the same in every worker that has the same board, a period board's is read from its
+    buckets. If the If-None-Match header has it, it returns a 304 before the page is read.
 
     Returns:
         Response: A JSON response containing the leaderboard data with a status code of 200.
     """
-    leaderboard_data = User.get_leaderboard(limit=10)
-    return jsonify(leaderboard_data), 200
+    period = request.args.get("period", "all")
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 10, type=int)
+
+    if period != "all" and period not in XP_PERIODS:
+        abort(400, f"period must be all, {', '.join(XP_PERIODS)}")
+
+    if page < 1 or not 1 <= per_page <= LEADERBOARD_MAX_PER_PAGE:
+        abort(400, f"page must be positive and per_page between 1 and {LEADERBOARD_MAX_PER_PAGE}")
+
+    try:
+        if period == "all":
+            version = (leaderboard_service.version,)
+            build = lambda: jsonify(leaderboard_service.page(page, per_page))
+
+        else:
+            version = XpBucket.get_leaderboard_version(period)
+            build = lambda: jsonify(XpBucket.get_leaderboard(period, page, per_page))
+
+        response = conditional(make_etag(period, *version, page, per_page), build)
+
+    except SQLAlchemyError as e:
+        abort(500, f"Database error: {e}")
+
+    # The same board for everyone
+    response.headers["Cache-Control"] = "public, no-cache"
+
+    return response
+
+@users_bp.route("/leaderboard/me", methods=["GET"])
+@jwt_required()
+def my_leaderboard_rank():
+    """
+    Retrieve the rank of the current user and the users ranked around them.
+
+    The number of users shown above and below is set with the `radius` query parameter.
+    The ETag is made of the version of the board, like the one of the boards.
+
+    Returns:
+        Response: A JSON response with the rank and the surrounding leaderboard entries.
+    """
+    user_id = get_jwt_identity()
+    radius = request.args.get("radius", 5, type=int)
+
+    if not 0 <= radius <= LEADERBOARD_MAX_PER_PAGE:
+        abort(400, f"radius must be between 0 and {LEADERBOARD_MAX_PER_PAGE}")
+
+    # Read first, a change made while the body is built then only gives a newer body
+    version = leaderboard_service.version
+    rank = leaderboard_service.rank(user_id)
+
+    if rank is None:
+        abort(404, f"User with ID {user_id} not found")
+
+    etag = make_etag(user_id, version, radius)
+
+    return conditional(etag, lambda: {"rank": rank, "around": leaderboard_service.around(user_id, radius)})
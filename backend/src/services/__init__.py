@@ -0,0 +1,3 @@
+"""
+Services that coordinate several models in a single operation.
+"""
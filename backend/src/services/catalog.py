@@ -0,0 +1,180 @@
+"""
+This module exports the in-memory catalog of categories and preset habits.
+
+The catalog barely changes, it is loaded by populate_db.py and edited by
+admins, so its endpoints are served from a read-only snapshot instead of
+querying the repository on every request. A snapshot holds the
+categories by name, the preset habits by ID and grouped by category,
+and the JSON bodies of the catalog endpoints, serialized once.
+
+A change through the models builds a new snapshot and swaps it in as a
+whole, so a request sees either the old catalog or the new one. The
+new catalog is published to the other workers as a worker message, and
+each of them swaps in a snapshot built from it right away, without
+querying the repository. Changes made outside the app, like
+populate_db.py, show up once the snapshot is CATALOG_TTL seconds old.
+"""
+
+from dataclasses import dataclass
+from hashlib import sha1
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Mapping
+import uuid
+from src.models.serialization import dumps_bytes
+from src.services.workers import on_worker_message, publish_to_workers
+
+# Seconds a snapshot is served before it is reloaded from the repository
+CATALOG_TTL = 300
+
+# Tells the messages of this process apart from the ones of the other workers
+_origin = uuid.uuid4().hex
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    A version of the catalog, never changed once built.
+
+    The dictionaries are the to_dict of the objects, in repository order.
+    """
+
+    version: int
+    # A digest of the content, the same in every worker that has the same catalog
+    etag: str
+    categories: Mapping[str, Mapping]
+    preset_habits: Mapping[str, Mapping]
+    by_category: Mapping[str, tuple[Mapping, ...]]
+    # JSON arrays of all the categories, all the preset habits and the preset habits of each category
+    categories_json: bytes
+    preset_habits_json: bytes
+    by_category_json: Mapping[str, bytes]
+
+    @staticmethod
+    def build(version: int, categories: list[dict], preset_habits: list[dict]) -> "CatalogSnapshot":
+        """
+        Build a snapshot from the to_dict of every category and preset habit.
+
+        :param version: The version of the snapshot.
+        :param categories: The categories, in the order they are listed.
+        :param preset_habits: The preset habits, in the order they are listed.
+        """
+        grouped: dict[str, list[dict]] = {category["name"]: [] for category in categories}
+
+        for preset_habit in preset_habits:
+            grouped.setdefault(preset_habit["category_name"], []).append(preset_habit)
+
+        categories_json = dumps_bytes(categories)
+        preset_habits_json = dumps_bytes(preset_habits)
+
+        return CatalogSnapshot(
+            version=version,
+            etag=sha1(categories_json + b"\n" + preset_habits_json).hexdigest(),
+            categories=MappingProxyType({category["name"]: MappingProxyType(category) for category in categories}),
+            preset_habits=MappingProxyType({habit["id"]: MappingProxyType(habit) for habit in preset_habits}),
+            by_category=MappingProxyType({
+                name: tuple(MappingProxyType(habit) for habit in habits) for name, habits in grouped.items()
+            }),
+            categories_json=categories_json,
+            preset_habits_json=preset_habits_json,
+            by_category_json=MappingProxyType({name: dumps_bytes(habits) for name, habits in grouped.items()}),
+        )
+
+
+class Catalog:
+    """
+    The current snapshot of the catalog, loaded from the repository on demand.
+
+    :param ttl: Seconds a snapshot is served before it is reloaded.
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL) -> None:
+        self.ttl = ttl
+        self.__snapshot: CatalogSnapshot | None = None
+        self.__loaded_at = 0.0
+        self.__lock = Lock()
+
+    def _fresh(self, snapshot: CatalogSnapshot | None) -> bool:
+        return snapshot is not None and monotonic() - self.__loaded_at < self.ttl
+
+    def get(self) -> CatalogSnapshot:
+        """
+        Get the current snapshot, reloaded first if it is stale.
+
+        Needs an app context when it reloads.
+        """
+        snapshot = self.__snapshot
+
+        if self._fresh(snapshot):
+            return snapshot
+
+        return self.reload(only_if_stale=True)
+
+    def reload(self, only_if_stale: bool = False) -> CatalogSnapshot:
+        """
+        Load a new snapshot from the repository and swap it in.
+
+        :param only_if_stale: Keep the current snapshot if another request reloaded it meanwhile.
+        :return: The current snapshot.
+        """
+        from src.models.category import Category
+        from src.models.preset_habit import PresetHabit
+
+        with self.__lock:
+            if only_if_stale and self._fresh(self.__snapshot):
+                return self.__snapshot
+
+            return self._swap(
+                [category.to_dict() for category in Category.get_all()],
+                [preset_habit.to_dict() for preset_habit in PresetHabit.get_all()],
+            )
+
+    def swap(self, categories: list[dict], preset_habits: list[dict]) -> CatalogSnapshot:
+        """
+        Build a new snapshot from the to_dict of every category and preset habit and swap it in.
+
+        Needs no app context, the data is not read from the repository.
+
+        :param categories: The categories, in the order they are listed.
+        :param preset_habits: The preset habits, in the order they are listed.
+        :return: The new snapshot.
+        """
+        with self.__lock:
+            return self._swap(categories, preset_habits)
+
+    def _swap(self, categories: list[dict], preset_habits: list[dict]) -> CatalogSnapshot:
+        """Helper method to swap in a new snapshot, with the lock held"""
+        version = self.__snapshot.version + 1 if self.__snapshot else 1
+        snapshot = CatalogSnapshot.build(version, categories, preset_habits)
+
+        self.__loaded_at = monotonic()
+        self.__snapshot = snapshot
+
+        return snapshot
+
+
+catalog = Catalog()
+
+
+def refresh_catalog() -> None:
+    """
+    Swap in a new snapshot after a change to the catalog, in every worker.
+
+    This worker reloads it from the repository and publishes it, the
+    others swap in the published one when they get the message. The
+    snapshots have the same ETag everywhere, so the change shows in the
+    next response of every worker.
+    """
+    snapshot = catalog.reload()
+    publish_to_workers("catalog_swap", {
+        "origin": _origin,
+        "categories": [dict(category) for category in snapshot.categories.values()],
+        "preset_habits": [dict(preset_habit) for preset_habit in snapshot.preset_habits.values()],
+    })
+
+
+@on_worker_message("catalog_swap")
+def _handle_swap(data: dict) -> None:
+    if data["origin"] != _origin:
+        catalog.swap(data["categories"], data["preset_habits"])
@@ -0,0 +1,144 @@
+"""
+This module exports the daily deadline engine.
+
+Every user's day ends at midnight in their own timezone. The engine
+computes the UTC instant of a zone's midnight once per zone and day and
+caches it, so checking a deadline on a hot path is a dictionary lookup
+instead of building timezone objects. It also groups zones by the UTC
+instant their day ends at, so batch jobs process exactly the users
+whose day just ended.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from functools import cache
+from threading import Lock
+import pytz
+
+# The timezone of users who have not set one
+DEFAULT_TIMEZONE = "US/Eastern"
+
+
+@cache
+def get_timezone(name: str):
+    """
+    Get a pytz timezone by name, built once per name.
+
+    :raises ValueError: If the name is not a known timezone.
+    """
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown timezone: {name}") from None
+
+
+def is_valid_timezone(name) -> bool:
+    """Check if a name is a known timezone"""
+    return isinstance(name, str) and name in pytz.all_timezones_set
+
+
+def utc_now() -> datetime:
+    """Get the current time as a naive UTC datetime, like the stored timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DeadlineEngine:
+    """
+    Daily deadlines of every timezone, as naive UTC datetimes.
+
+    The midnight that starts a day in a zone is computed once and kept
+    until the cache holds more than max_entries days, then the cache is
+    cleared and filled again on demand.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        # (zone name, local day) -> UTC instant of its midnight
+        self.__day_starts: dict[tuple[str, date], datetime] = {}
+        self.__max_entries = max_entries
+        self.__lock = Lock()
+
+    def day_start(self, zone_name: str, day: date) -> datetime:
+        """
+        Get the UTC instant of the midnight that starts a day in a timezone.
+
+        :raises ValueError: If the zone is not a known timezone.
+        """
+        key = (zone_name, day)
+        day_start = self.__day_starts.get(key)
+
+        if day_start is None:
+            zone = get_timezone(zone_name)
+            day_start = zone.localize(datetime.combine(day, time(0, 0))).astimezone(timezone.utc)
+            day_start = day_start.replace(tzinfo=None)
+
+            with self.__lock:
+                if len(self.__day_starts) >= self.__max_entries:
+                    self.__day_starts.clear()
+                self.__day_starts[key] = day_start
+
+        return day_start
+
+    def local_day(self, zone_name: str, now: datetime | None = None) -> date:
+        """
+        Get the current day in a timezone.
+
+        :param now: A naive UTC datetime, the current time by default.
+        """
+        now = now or utc_now()
+        # The local day is the UTC day or one of its neighbours, its
+        # cached midnight tells which one without converting now
+        day = now.date()
+
+        if now < self.day_start(zone_name, day):
+            return day - timedelta(days=1)
+        if now >= self.day_start(zone_name, day + timedelta(days=1)):
+            return day + timedelta(days=1)
+
+        return day
+
+    def last_deadline(self, zone_name: str, now: datetime | None = None) -> datetime:
+        """
+        Get the last midnight in a timezone, the deadline of the day before.
+
+        :param now: A naive UTC datetime, the current time by default.
+        """
+        return self.day_start(zone_name, self.local_day(zone_name, now))
+
+    def next_deadline(self, zone_name: str, now: datetime | None = None) -> datetime:
+        """
+        Get the next midnight in a timezone, the deadline of the current day.
+
+        :param now: A naive UTC datetime, the current time by default.
+        """
+        return self.day_start(zone_name, self.local_day(zone_name, now) + timedelta(days=1))
+
+    def last_deadlines(self, zone_names, now: datetime | None = None) -> dict[datetime, list[str]]:
+        """
+        Group timezones by the UTC instant of their last midnight.
+
+        :param zone_names: The names of the timezones.
+        :param now: A naive UTC datetime, the current time by default.
+        :return: The zones whose last day ended at each instant, latest instant first.
+        """
+        now = now or utc_now()
+        zones_by_deadline = defaultdict(list)
+
+        for zone_name in sorted(set(zone_names)):
+            zones_by_deadline[self.last_deadline(zone_name, now)].append(zone_name)
+
+        return dict(sorted(zones_by_deadline.items(), reverse=True))
+
+    def seconds_until_next_deadline(self, zone_names, now: datetime | None = None) -> float:
+        """
+        Get the number of seconds until the day ends in any of some timezones.
+
+        :param zone_names: The names of the timezones, the default one if empty.
+        :param now: A naive UTC datetime, the current time by default.
+        """
+        now = now or utc_now()
+        deadline = min(self.next_deadline(zone_name, now) for zone_name in set(zone_names) or {DEFAULT_TIMEZONE})
+
+        return (deadline - now).total_seconds()
+
+
+deadlines = DeadlineEngine()
@@ -0,0 +1,144 @@
+"""
+This module exports the coalescing event dispatcher.
+
+Requests queue their Socket.IO events instead of emitting them, so events
+are serialized and sent by a background task, off the request path. An
+event queued again for the same entity before it is sent replaces the
+queued one, so clients only get the latest state of a user or a habit
+list however many times it changed in a window. The events of a window
+for the same recipient are sent as one "batch" frame.
+
+The queue is bounded: past DISPATCH_MAX_PENDING events, new events are
+dropped and counted, updates of queued entities are still coalesced.
+"""
+
+from itertools import count
+import threading
+from typing import Any, Callable, Hashable
+
+# How long events are queued to be coalesced, in seconds
+DISPATCH_WINDOW = 0.05
+# Events queued at most, new events are dropped past it
+DISPATCH_MAX_PENDING = 10_000
+
+
+class EventDispatcher:
+    """
+    A bounded queue of events, coalesced by the entity they are about.
+
+    :param send: Called with a recipient, an event name and a payload to send a frame.
+    :param max_pending: The number of events queued at most.
+    """
+
+    def __init__(self, send: Callable[[Hashable, str, Any], None], max_pending: int = DISPATCH_MAX_PENDING):
+        self.max_pending = max_pending
+        self.running = False
+        self._send = send
+        self._pending: dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._unique = count()
+        self._counters = dict.fromkeys(
+            ("queued", "coalesced", "dropped", "sent_events", "sent_frames", "failed_frames"), 0
+        )
+
+    def dispatch(self, event: str, data, recipient: Hashable, key: Hashable = None) -> bool:
+        """
+        Queue an event.
+
+        :param event: The name of the event.
+        :param data: The payload, JSON serializable but for datetimes. It must not change once queued.
+        :param recipient: Who the event is sent to, passed to send.
+        :param key: The entity the event is about. A queued event with the same name, recipient
+            and key is replaced. Events without a key are never coalesced.
+        :return: False if the queue was full and the event was dropped.
+        """
+        pending_key = (event, recipient, ("unique", next(self._unique)) if key is None else key)
+
+        with self._lock:
+            if pending_key in self._pending:
+                self._pending[pending_key] = (recipient, event, data)
+                self._counters["coalesced"] += 1
+                return True
+
+            if len(self._pending) >= self.max_pending:
+                self._counters["dropped"] += 1
+                return False
+
+            self._pending[pending_key] = (recipient, event, data)
+            self._counters["queued"] += 1
+
+        return True
+
+    def flush(self) -> int:
+        """
+        Send the queued events, one frame per recipient.
+
+        A recipient with a single event gets it as is, one with more gets a
+        "batch" event of [event, data] pairs, in the order they were first queued.
+
+        :return: The number of frames sent.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        frames: dict[Hashable, list] = {}
+        for recipient, event, data in pending.values():
+            frames.setdefault(recipient, []).append([event, data])
+
+        sent = failed = 0
+        error = None
+        for recipient, events in frames.items():
+            event, data = events[0] if len(events) == 1 else ("batch", events)
+
+            try:
+                self._send(recipient, event, data)
+                sent += 1
+            except Exception as e:
+                failed += 1
+                error = e
+
+        with self._lock:
+            self._counters["sent_events"] += len(pending)
+            self._counters["sent_frames"] += sent
+            self._counters["failed_frames"] += failed
+
+        if error:
+            raise error
+
+        return sent
+
+    def metrics(self) -> dict:
+        """Get the queue depth and the event counters"""
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": len(self._pending),
+                "max_pending": self.max_pending,
+                **self._counters,
+            }
+
+    def run(self, sleep: Callable[[float], None], on_error: Callable[[], None] = None,
+            window: float = DISPATCH_WINDOW) -> None:
+        """
+        Flush the queue every window, forever.
+
+        Events are queued from when it starts, and emitted by dispatch's caller before.
+
+        :param sleep: Sleeps for a number of seconds, without blocking the server.
+        :param on_error: Called in the except block of a failed flush.
+        :param window: The seconds between flushes.
+        """
+        self.running = True
+
+        try:
+            while True:
+                sleep(window)
+
+                try:
+                    self.flush()
+                except Exception:
+                    if on_error:
+                        on_error()
+        finally:
+            self.running = False
+            self.flush()
@@ -0,0 +1,108 @@
+"""
+This module exports the habit completion service.
+
+A completion deletes the habit list item with a DELETE ... RETURNING
+that also reads the list owner's ID and timezone and the habit reward,
+so the item is loaded and claimed by one statement. It then applies the
+reward with an atomic UPDATE of the owner and an upsert of their XP
+buckets in the same transaction, so concurrent completions for the same
+user never lose each other's changes.
+"""
+
+from sqlalchemy import delete, select
+from src.models import db
+from src.models.custom_habit import CustomHabit
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+from src.services.leaderboard import update_leaderboard
+from src.services.reminders import cancel_reminder
+
+# The DELETE ... RETURNING that loads and claims the item, the
+# UPDATE ... RETURNING of the owner and the upsert of their XP buckets
+COMPLETION_STATEMENT_BUDGET = 3
+
+HABIT_TYPES = {
+    "preset": (PresetHabit, HabitListItem.preset_habit_id),
+    "custom": (CustomHabit, HabitListItem.custom_habit_id),
+}
+
+
+def complete_habit(habit_list_id: str, habit_id: str, habit_type: str) -> dict:
+    """
+    Complete a habit of a habit list and reward the list owner.
+
+    :param habit_list_id: The ID of the habit list.
+    :param habit_id: The ID of the preset or custom habit to complete.
+    :param habit_type: Either "preset" or "custom".
+    :raises LookupError: If the habit list or its owner is not found.
+    :raises ValueError: If the habit is not in the list or is already completed.
+    :return: The dictionary representation of the list owner, with the reward applied.
+    """
+    from src.persistence import repo
+
+    habit_cls, habit_column = HABIT_TYPES[habit_type]
+    # SQLite leaves the columns of RETURNING unqualified, so the subqueries
+    # only compare their own table's columns with bound parameters
+    owner_id = select(HabitList.list_owner_id).where(HabitList.id == habit_list_id).scalar_subquery()
+
+    with repo.transaction():
+        # Deleting the item claims it, a concurrent completion of the
+        # same habit finds nothing to delete and gets no reward
+        claimed = db.session.execute(
+            delete(HabitListItem)
+            .where(
+                HabitListItem.habit_list_id == habit_list_id,
+                habit_column == habit_id,
+                HabitListItem.habit_is_completed.isnot(True),
+            )
+            .returning(
+                HabitListItem.id,
+                HabitListItem.created_at,
+                HabitListItem.is_late,
+                owner_id.label("owner_id"),
+                select(User.timezone).where(User.id == owner_id).scalar_subquery().label("timezone"),
+                select(habit_cls.xp_reward).where(habit_cls.id == habit_id).scalar_subquery().label("xp_reward"),
+            ),
+            execution_options={"synchronize_session": False},
+        ).first()
+
+        if claimed is None:
+            _raise_not_claimed(habit_list_id, habit_id, habit_column)
+
+        if claimed.timezone is None:
+            raise LookupError(f"User with ID {claimed.owner_id} not found")
+
+        xp, hp, _ = HabitList.get_completion_reward(claimed, claimed.xp_reward, claimed.timezone)
+        owner = User.apply_stat_changes(claimed.owner_id, xp=xp, hp=hp, habits_completed=1)
+
+        # The owner was deleted since the item was claimed, raising rolls
+        # back the DELETE of the item
+        if owner is None:
+            raise LookupError(f"User with ID {claimed.owner_id} not found")
+
+        # Serialize before the commit expires the owner and forces a reload
+        owner_data = owner.to_dict()
+
+    update_leaderboard(owner_data)
+    cancel_reminder(claimed.id)
+
+    return owner_data
+
+
+def _raise_not_claimed(habit_list_id: str, habit_id: str, habit_column) -> None:
+    """Helper function to report why there was no item to complete, only run when the completion fails"""
+    row = db.session.execute(
+        select(HabitList.id, HabitListItem.habit_is_completed)
+        .outerjoin(HabitListItem, (HabitListItem.habit_list_id == HabitList.id) & (habit_column == habit_id))
+        .where(HabitList.id == habit_list_id)
+        .limit(1)
+    ).first()
+
+    if row is None:
+        raise LookupError(f"Habit list with ID {habit_list_id} not found")
+
+    if row.habit_is_completed:
+        raise ValueError(f"Habit with ID {habit_id} is already completed")
+
+    raise ValueError(f"Habit with ID {habit_id} not found in Habit List")
@@ -0,0 +1,201 @@
+"""
+This module exports the in-memory leaderboard.
+
+Users are kept in an array sorted by rank, so the top of the board, any
+page of it and the rank of a user are found with a binary search instead
+of sorting the users table on every request. The board is rebuilt from
+the repository on startup and kept up to date by the code that changes
+a user's XP, in every worker of the app through worker messages.
+
+The board has a version for the ETags of its responses. It is a
+fingerprint of the entries, kept up to date by every update and removal
+in O(1), so it changes with the board and is the same in every worker
+that has the same board, however it got there.
+"""
+
+from bisect import bisect_left, insort
+from hashlib import blake2b
+import os
+from threading import Lock
+from src.services.workers import on_worker_message, publish_to_workers
+from utils.constants import REPOSITORY_ENV_VAR
+
+# The version is a sum of fingerprints modulo this
+_VERSION_MODULUS = 2 ** 64
+
+
+def _fingerprint(user_id: str, score: int, fields: dict) -> int:
+    """Helper function to get a fingerprint of a board entry, the same in every process"""
+    data = "\x1f".join(map(str, (user_id, score, *sorted(fields.items()))))
+
+    return int.from_bytes(blake2b(data.encode(), digest_size=8).digest(), "big")
+
+
+class Leaderboard:
+    """
+    Users ordered by score, highest first.
+
+    Ties are broken by user ID so every user has a stable rank.
+    """
+
+    def __init__(self) -> None:
+        # (-score, user_id) in ascending order is the board in rank order
+        self.__ranking: list[tuple[int, str]] = []
+        # user_id -> (score, fields shown on the board)
+        self.__users: dict[str, tuple[int, dict]] = {}
+        # The sum of the fingerprints of the entries
+        self.__version = 0
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__ranking)
+
+    @property
+    def version(self) -> int:
+        """A version of the board, equal for equal boards and changed by every update and removal"""
+        return self.__version
+
+    def rebuild(self, entries) -> None:
+        """
+        Replace the whole board.
+
+        :param entries: (user_id, score, fields) tuples, in any order.
+        """
+        users = {user_id: (score, fields) for user_id, score, fields in entries}
+        ranking = sorted((-score, user_id) for user_id, (score, _) in users.items())
+        version = sum(_fingerprint(user_id, *entry) for user_id, entry in users.items()) % _VERSION_MODULUS
+
+        with self.__lock:
+            self.__users, self.__ranking, self.__version = users, ranking, version
+
+    def update(self, user_id: str, score: int, **fields) -> None:
+        """
+        Add a user to the board or move them to their new score.
+
+        :param user_id: The ID of the user.
+        :param score: The score the board is ordered by.
+        :param fields: The fields shown for the user on the board.
+        """
+        with self.__lock:
+            self._discard(user_id)
+            self.__users[user_id] = (score, fields)
+            insort(self.__ranking, (-score, user_id))
+            self.__version = (self.__version + _fingerprint(user_id, score, fields)) % _VERSION_MODULUS
+
+    def remove(self, user_id: str) -> None:
+        """Remove a user from the board"""
+        with self.__lock:
+            self._discard(user_id)
+
+    def _discard(self, user_id: str) -> None:
+        """Helper method to remove a user, the lock must be held"""
+        current = self.__users.pop(user_id, None)
+
+        if current is not None:
+            del self.__ranking[bisect_left(self.__ranking, (-current[0], user_id))]
+            self.__version = (self.__version - _fingerprint(user_id, *current)) % _VERSION_MODULUS
+
+    def _entries(self, start: int, stop: int) -> list[dict]:
+        """Helper method to get the board entries between two positions"""
+        start = max(start, 0)
+
+        with self.__lock:
+            return [
+                {"id": user_id, **self.__users[user_id][1], "rank": rank}
+                for rank, (_, user_id) in enumerate(self.__ranking[start:stop], start + 1)
+            ]
+
+    def top(self, n: int = 10) -> list[dict]:
+        """Get the n highest ranked users"""
+        return self._entries(0, n)
+
+    def page(self, page: int = 1, per_page: int = 10) -> list[dict]:
+        """Get a page of the board, pages start at 1"""
+        return self._entries((page - 1) * per_page, page * per_page)
+
+    def rank(self, user_id: str) -> int | None:
+        """Get the rank of a user, starting at 1, or None if not on the board"""
+        with self.__lock:
+            current = self.__users.get(user_id)
+
+            if current is None:
+                return None
+
+            return bisect_left(self.__ranking, (-current[0], user_id)) + 1
+
+    def around(self, user_id: str, radius: int = 5) -> list[dict]:
+        """Get a user and up to radius users ranked right above and below them"""
+        rank = self.rank(user_id)
+
+        if rank is None:
+            return []
+
+        return self._entries(rank - 1 - radius, rank + radius)
+
+
+leaderboard = Leaderboard()
+
+
+def leaderboard_entry(user: dict) -> tuple[str, int, dict]:
+    """
+    Get the all-time leaderboard entry of a user.
+
+    :param user: The dictionary representation of a User.
+    :return: The user ID, the total XP and the fields shown on the board.
+    """
+    fields = {"username": user["username"], "level": user["level"], "XP": user["current_xp"]}
+
+    return user["id"], user["total_xp"], fields
+
+
+def update_leaderboard(user: dict) -> None:
+    """
+    Move a user to their current total XP on the all-time leaderboard of every worker.
+
+    :param user: The dictionary representation of a User.
+    """
+    user_id, total_xp, fields = leaderboard_entry(user)
+
+    publish_to_workers("leaderboard_update", {"user_id": user_id, "score": total_xp, "fields": fields})
+
+
+def remove_from_leaderboard(user_id: str) -> None:
+    """
+    Remove a deleted user from the all-time leaderboard of every worker.
+    """
+    publish_to_workers("leaderboard_remove", {"user_id": user_id})
+
+
+@on_worker_message("leaderboard_update")
+def _handle_update(data: dict) -> None:
+    leaderboard.update(data["user_id"], data["score"], **data["fields"])
+
+
+@on_worker_message("leaderboard_remove")
+def _handle_remove(data: dict) -> None:
+    leaderboard.remove(data["user_id"])
+
+
+def rebuild_leaderboard() -> None:
+    """
+    Rebuild the all-time leaderboard from every user in the repository.
+    """
+    from src.models.user import User, level_for_xp, xp_for_level
+
+    if os.getenv(REPOSITORY_ENV_VAR) != "db":
+        leaderboard.rebuild(leaderboard_entry(user.to_dict()) for user in User.get_all())
+        return
+
+    from sqlalchemy import select
+    from src.models import db
+
+    def entry(user_id: str, username: str, total_xp: int) -> tuple[str, int, dict]:
+        level = level_for_xp(total_xp)
+        fields = {"username": username, "level": level, "XP": total_xp - xp_for_level(level)}
+
+        return user_id, total_xp, fields
+
+    # Only the ranked columns, loading every User object would take minutes
+    rows = db.session.execute(select(User.id, User.username, User.total_xp))
+
+    leaderboard.rebuild(entry(*row) for row in rows)
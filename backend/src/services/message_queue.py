@@ -0,0 +1,134 @@
+"""
+This module exports the Socket.IO client managers of the app.
+
+With a message queue, SOCKETIO_MESSAGE_QUEUE, every worker publishes its
+emits to the queue and sends the emits of all the workers to its own
+clients, so the app runs in several gunicorn workers. The URL picks the
+backend like Flask-SocketIO does: redis://, kafka://, zmq+tcp:// or a
+Kombu URL like amqp://, plus file:// for FileQueueManager, a queue in a
+local file for development and tests.
+
+The managers also send user_update events as the changes since the last
+one this worker sent, with the versions of user_states, and handle the
+worker messages instead of sending them to clients.
+"""
+
+import fcntl
+import os
+import socketio
+from src.services.user_states import user_states
+from src.services.workers import WORKERS_NAMESPACE, handle_worker_message
+
+# Seconds between two reads of the end of a file queue
+FILE_QUEUE_POLL_INTERVAL = 0.02
+
+
+def encode_event(event: str, data):
+    """
+    Replace the user of a user_update, {"user_id": ..., "user_data": ...}, by its changes.
+
+    Snapshots, which already have a version, and other events are sent as is.
+    """
+    if event == "user_update" and "version" not in data:
+        return user_states.encode(data["user_id"], data["user_data"])
+
+    if event == "batch":
+        return [[name, encode_event(name, item)] for name, item in data]
+
+    return data
+
+
+class AppClientManager(socketio.Manager):
+    """
+    The client manager of a single worker, and the base of the message queue ones.
+
+    It sends the events to the clients connected to this worker.
+    """
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        if namespace == WORKERS_NAMESPACE:
+            handle_worker_message(event, data)
+            return
+
+        room = to or room
+
+        if event in ("user_update", "batch"):
+            if next(self.get_participants(namespace, room), None) is None:
+                # No client of this worker to send to, nor to keep the state of
+                return
+
+            data = encode_event(event, data)
+
+        return super().emit(event, data, namespace, room=room, skip_sid=skip_sid, callback=callback, **kwargs)
+
+
+class FileQueueManager(socketio.PubSubManager):
+    """
+    A message queue in an append-only file, for the workers of one machine.
+
+    Messages are appended as JSON lines under an exclusive lock, and every
+    worker reads the lines appended after it started. The file is never
+    truncated, use a real message queue in production.
+
+    :param url: The file URL of the queue, e.g. file:///tmp/levelup-socketio.queue.
+    """
+
+    name = "file"
+
+    def __init__(self, url: str = "file:///tmp/levelup-socketio.queue", channel: str = "socketio",
+                 write_only: bool = False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = url.removeprefix("file://")
+        # Opened in append mode, so every write goes to the end of the file
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _publish(self, data):
+        message = self.json.dumps(data).encode() + b"\n"
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            os.write(self._fd, message)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _listen(self):
+        with open(self.path, "rb") as queue:
+            queue.seek(0, os.SEEK_END)
+            partial = b""
+
+            while True:
+                chunk = queue.read()
+
+                if not chunk:
+                    self.server.sleep(FILE_QUEUE_POLL_INTERVAL)
+                    continue
+
+                *lines, partial = (partial + chunk).split(b"\n")
+                yield from lines
+
+
+def create_client_manager(url: str | None = None) -> socketio.Manager:
+    """
+    Create the client manager of a message queue URL.
+
+    :param url: The URL of the message queue, None for a single worker.
+    :return: The client manager to pass to socketio.init_app.
+    """
+    if not url:
+        return AppClientManager()
+
+    if url.startswith("file://"):
+        queue_class = FileQueueManager
+    elif url.startswith(("redis://", "rediss://")):
+        queue_class = socketio.RedisManager
+    elif url.startswith("kafka://"):
+        queue_class = socketio.KafkaManager
+    elif url.startswith("zmq"):
+        queue_class = socketio.ZmqManager
+    else:
+        queue_class = socketio.KombuManager
+
+    # The queue class publishes and receives, AppClientManager sends to this worker's clients
+    manager_class = type(f"App{queue_class.__name__}", (queue_class, AppClientManager), {})
+
+    return manager_class(url)
@@ -0,0 +1,63 @@
+"""
+This module exports the helpers that address Socket.IO events.
+
+Every authenticated socket joins the room of its user, and admins also
+join the admins room. Events about a user's data are emitted to those
+rooms only, so a user's private stats never reach other clients and the
+traffic of an event does not grow with the number of connected users.
+
+Once run_dispatcher is started, events go through the coalescing event
+dispatcher instead of being emitted by the request that made them.
+A user_update is sent to clients as the fields that changed since the
+last one, see message_queue.
+"""
+
+from src import socketio
+from src.services.event_dispatcher import EventDispatcher
+
+# Room of the sockets of every admin
+ADMINS_ROOM = "admins"
+
+
+def user_room(user_id: str) -> str:
+    """Get the room of the sockets of a user"""
+    return f"user:{user_id}"
+
+
+def _send(recipient: tuple[str, bool], event: str, data) -> None:
+    """Emit a frame to the room of a user, and to the admins. A socket in both rooms receives it once"""
+    user_id, admins = recipient
+    socketio.emit(event, data, to=[user_room(user_id), ADMINS_ROOM] if admins else user_room(user_id))
+
+
+dispatcher = EventDispatcher(_send)
+
+
+def emit_to_user(event: str, data, user_id: str, admins: bool = True, key=None) -> None:
+    """
+    Emit an event to the sockets of a user, and to the admins.
+
+    While the dispatcher runs, the event is queued and coalesced with the
+    queued events of the same name about the same entity.
+
+    :param event: The name of the event.
+    :param data: The payload, JSON serializable but for datetimes, which Socket.IO sends in ISO format.
+    :param user_id: The ID of the user the event is about.
+    :param admins: Whether the admins receive the event too.
+    :param key: The entity the event is about, e.g. the ID of a habit list. Events without one are never coalesced.
+    """
+    if dispatcher.running:
+        dispatcher.dispatch(event, data, (user_id, admins), key)
+    else:
+        _send((user_id, admins), event, data)
+
+
+def run_dispatcher(app) -> None:
+    """
+    Send the queued events every DISPATCH_WINDOW.
+
+    Runs forever, start it as a background task.
+
+    :param app: The Flask app to log the failed flushes of.
+    """
+    dispatcher.run(socketio.sleep, lambda: app.logger.exception("Sending events failed"))
@@ -0,0 +1,92 @@
+"""
+This module exports password hashing that does not block the worker.
+
+bcrypt is a CPU-bound C call. Run inline under `gunicorn -k eventlet`,
+it stops the event loop, and every other request and websocket of the
+worker, for its whole duration. Here the hashing runs on native threads
+the caller waits on instead: eventlet's thread pool when eventlet has
+monkey patched the process, otherwise a bounded thread pool. bcrypt
+releases the GIL, so the hashes also run in parallel.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from threading import BoundedSemaphore, Lock
+from flask import current_app
+from src import bcrypt
+
+# Passwords hashed at the same time. More would only take CPU time
+# away from the event loop without hashing any faster
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+# Created on first use, so it is a green semaphore once eventlet patched threading
+_eventlet_slots: BoundedSemaphore | None = None
+
+
+def _eventlet_patched() -> bool:
+    """Check if eventlet has monkey patched the threads of this process"""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+
+    return patcher.is_monkey_patched("thread")
+
+
+def _run(fn, *args):
+    """Helper function to run a function on a native thread and wait for it"""
+    global _executor, _eventlet_slots
+
+    if _eventlet_patched():
+        from eventlet import tpool
+
+        if _eventlet_slots is None:
+            _eventlet_slots = BoundedSemaphore(PASSWORD_HASH_WORKERS)
+
+        # Green threads over the limit wait here without blocking the loop
+        with _eventlet_slots:
+            return tpool.execute(fn, *args)
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+    return _executor.submit(fn, *args).result()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured work factor.
+
+    :param password: The plain text password.
+    :return: The bcrypt hash.
+    """
+    return _run(bcrypt.generate_password_hash, password).decode("utf-8")
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    """
+    Check a password against its hash.
+
+    :param password_hash: The bcrypt hash.
+    :param password: The plain text password.
+    :return: True if the password matches the hash.
+    """
+    return _run(bcrypt.check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Check if a hash was made with another work factor than the configured one.
+
+    :param password_hash: The bcrypt hash, like $2b$12$...
+    """
+    try:
+        rounds = int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+
+    return rounds != current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
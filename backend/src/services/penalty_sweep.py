@@ -0,0 +1,242 @@
+"""
+This module exports the nightly incomplete-habit penalty sweep.
+
+Right after midnight in their timezone, every user loses HP for the
+habits they left incomplete, and XP if that leaves them at 0 HP. The
+deadline engine groups the timezones by the UTC instant their day ends
+at, and one sweep per instant walks the users of those timezones in ID
+order, one chunk per transaction. Each chunk takes one SELECT of the
+users, one grouped SELECT of their incomplete habits per habit list and
+one batched UPDATE. Only habits added before the deadline count, so a
+late sweep gives the same result. A checkpoint keyed by the deadline
+moves past every chunk in the same transaction, so a sweep can be
+resumed after a crash and never penalizes a user twice for one day.
+Each penalized user also keeps the local day they were penalized for,
+so moving to a timezone whose day ends later doesn't penalize that day
+again. A user who moves to a timezone whose sweep for the same instant
+already finished is not penalized for that day. The scheduler also
+deletes the expired XP buckets of the period leaderboards.
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from itertools import groupby
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.exc import IntegrityError
+from src import socketio
+from src.models import db
+from src.models.habit_list import HabitList
+from src.models.sweep_checkpoint import SweepCheckpoint
+from src.models.user import User, incomplete_habit_penalties
+from src.models.xp_bucket import XpBucket
+from src.services.deadlines import deadlines
+from src.services.leaderboard import update_leaderboard
+
+# Users penalized per transaction
+PENALTY_SWEEP_CHUNK_SIZE = 500
+
+
+@cache
+def _penalty_statement():
+    """
+    Build the UPDATE that applies one user's penalties, run once per penalized user of a chunk.
+
+    The XP loss is capped at the current level's XP, like User.lose_xp.
+    """
+    users = User.__table__
+    hp_loss, xp_loss = bindparam("hp_loss"), bindparam("xp_loss")
+    xp_lost = case((users.c.current_xp > xp_loss, xp_loss), else_=users.c.current_xp)
+
+    return (
+        update(users)
+        .where(users.c.id == bindparam("penalized_user_id"))
+        .values(
+            hp=case((users.c.hp > hp_loss, users.c.hp - hp_loss), else_=0),
+            current_xp=users.c.current_xp - xp_lost,
+            total_xp=users.c.total_xp - xp_lost,
+            penalized_day=bindparam("penalized_day"),
+            version=users.c.version + 1,
+        )
+    )
+
+
+def _chunk_penalties(users: list, deadline: datetime) -> list[dict]:
+    """
+    Helper function to get the penalties of a chunk of users.
+
+    :param users: (id, hp, timezone, penalized_day) rows.
+    :param deadline: Habits added after it are not penalized.
+    :return: The UPDATE parameters of every user with a penalty.
+    """
+    # The local day that ended at the deadline, in each timezone of the chunk
+    ended_days = {
+        zone_name: deadlines.local_day(zone_name, deadline) - timedelta(days=1)
+        for zone_name in {user.timezone for user in users}
+    }
+    # Users already penalized for that day in another timezone are skipped
+    users = {
+        user.id: user for user in users
+        if user.penalized_day is None or user.penalized_day < ended_days[user.timezone]
+    }
+    rows = HabitList.count_incomplete_habits(list(users), deadline)
+    penalties = []
+
+    for user_id, lists in groupby(rows, key=lambda row: row[0]):
+        user = users[user_id]
+        hp_loss, xp_loss = incomplete_habit_penalties(user.hp, (count for _, count in lists))
+
+        if hp_loss or xp_loss:
+            penalties.append({"penalized_user_id": user_id, "hp_loss": hp_loss, "xp_loss": xp_loss,
+                              "penalized_day": ended_days[user.timezone]})
+
+    return penalties
+
+
+def _get_checkpoint(sweep_key: str) -> SweepCheckpoint:
+    """Helper function to get the checkpoint of a sweep, creating it on the first run"""
+    query = select(SweepCheckpoint).where(SweepCheckpoint.sweep_key == sweep_key)
+    checkpoint = db.session.execute(query).scalar_one_or_none()
+
+    if checkpoint is not None:
+        return checkpoint
+
+    try:
+        checkpoint = SweepCheckpoint(sweep_key)
+        db.session.add(checkpoint)
+        db.session.commit()
+
+    except IntegrityError:
+        # Another run created it first
+        db.session.rollback()
+        checkpoint = db.session.execute(query).scalar_one()
+
+    return checkpoint
+
+
+def run_penalty_sweep(deadline: datetime, zone_names: list[str], chunk_size: int = PENALTY_SWEEP_CHUNK_SIZE) -> int:
+    """
+    Penalize the users of some timezones for the habits left incomplete at a deadline.
+
+    Running it again for the same deadline resumes an interrupted run or
+    does nothing. A run that finds another one ahead of it on a chunk stops.
+
+    :param deadline: The midnight that ended the users' day, a naive UTC datetime.
+    :param zone_names: The timezones whose day ended at the deadline.
+    :param chunk_size: The number of users processed per transaction.
+    :return: The number of users this run penalized.
+    """
+    sweep_key = f"penalty:{deadline.isoformat()}"
+    checkpoint = _get_checkpoint(sweep_key)
+
+    if checkpoint.completed_at is not None:
+        return 0
+
+    after = checkpoint.last_user_id
+    penalized = 0
+
+    while True:
+        query = (
+            select(User.id, User.hp, User.timezone, User.penalized_day)
+            .where(User.timezone.in_(zone_names))
+            .order_by(User.id)
+            .limit(chunk_size)
+        )
+
+        if after is not None:
+            query = query.where(User.id > after)
+
+        users = db.session.execute(query).all()
+
+        if not users:
+            checkpoint.completed_at = datetime.now(timezone.utc)
+            db.session.commit()
+            return penalized
+
+        penalties = _chunk_penalties(users, deadline)
+
+        if penalties:
+            db.session.execute(_penalty_statement(), penalties)
+
+        if not SweepCheckpoint.advance(sweep_key, after, users[-1].id):
+            db.session.rollback()
+            return penalized
+
+        db.session.commit()
+        penalized += len(penalties)
+        after = users[-1].id
+
+        _update_leaderboard([p["penalized_user_id"] for p in penalties if p["xp_loss"]])
+
+
+def run_due_penalty_sweeps(now: datetime | None = None, chunk_size: int = PENALTY_SWEEP_CHUNK_SIZE) -> int:
+    """
+    Run the sweep of the last deadline of every timezone users are in.
+
+    Sweeps that already ran are skipped by their checkpoint, so this can
+    run at any time to catch up.
+
+    :param now: A naive UTC datetime, the current time by default.
+    :param chunk_size: The number of users processed per transaction.
+    :return: The number of users penalized.
+    """
+    penalized = 0
+
+    for deadline, zone_names in deadlines.last_deadlines(_user_timezones(), now).items():
+        penalized += run_penalty_sweep(deadline, zone_names, chunk_size)
+
+    return penalized
+
+
+def prune_xp_buckets(now: datetime | None = None) -> None:
+    """
+    Delete the XP buckets of the periods that ended before the previous ones.
+
+    :param now: A naive UTC datetime, the current time by default.
+    """
+    XpBucket.prune((now or datetime.now(timezone.utc)).date())
+    db.session.commit()
+
+
+def _user_timezones() -> list[str]:
+    """Helper function to get the distinct timezones of all users"""
+    return list(db.session.execute(select(User.timezone).distinct()).scalars())
+
+
+def _update_leaderboard(user_ids: list[str]) -> None:
+    """Helper function to move the users who lost XP down the leaderboard"""
+    if not user_ids:
+        return
+
+    rows = db.session.execute(
+        select(User.id, User.username, User.level, User.current_xp, User.total_xp).where(User.id.in_(user_ids))
+    )
+
+    for row in rows:
+        update_leaderboard(row._asdict())
+
+
+def schedule_penalty_sweeps(app) -> None:
+    """
+    Run the due penalty sweeps now and right after every deadline.
+
+    Runs forever, start it as a background task. The first run catches up
+    on sweeps missed while the app was down. Every run also prunes the
+    expired XP buckets.
+
+    :param app: The Flask app to run the sweeps in.
+    """
+    while True:
+        zone_names = []
+
+        with app.app_context():
+            try:
+                run_due_penalty_sweeps()
+                prune_xp_buckets()
+                zone_names = _user_timezones()
+            except Exception:
+                app.logger.exception("Penalty sweep failed")
+            finally:
+                db.session.remove()
+
+        # A few seconds late, so the new day has started in every clock
+        socketio.sleep(deadlines.seconds_until_next_deadline(zone_names) + 5)
@@ -0,0 +1,269 @@
+"""
+This module exports the habit reminder scheduler.
+
+Every incomplete habit list item has a pending reminder an hour before
+its owner's next deadline, kept in a timing wheel in memory, so no query
+looks for habits near their deadline. Completing or removing a habit
+cancels its reminder in O(1). A background task advances the wheel every
+second, checks the due habits are still incomplete with one query per
+batch, pushes one "habit_reminder" event to each user's room and
+schedules the habits again for the next day.
+
+The wheel lives in the one worker that runs the scheduler. The hooks
+publish the reminders to schedule and cancel as worker messages, so the
+habits added and completed in any worker reach it. They do nothing when
+reminders are disabled, so apps without the background task keep no timers.
+"""
+
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import select
+from src import socketio
+from src.models import db
+from src.services.deadlines import deadlines, utc_now
+from src.services.notifications import emit_to_user
+from src.services.timing_wheel import TimingWheel
+from src.services.workers import on_worker_message, publish_to_workers
+
+# How long before the deadline users are reminded of their incomplete habits
+REMINDER_LEAD = timedelta(hours=1)
+# Habits checked per query when reminders are due
+REMINDER_BATCH_SIZE = 500
+
+_wheel: TimingWheel | None = None
+
+
+def to_tick(moment: datetime) -> int:
+    """Get the wheel tick, a UNIX time in seconds, of a naive UTC datetime"""
+    return int(moment.replace(tzinfo=timezone.utc).timestamp())
+
+
+def from_tick(tick: int) -> datetime:
+    """Get the naive UTC datetime of a wheel tick"""
+    return datetime.fromtimestamp(tick, timezone.utc).replace(tzinfo=None)
+
+
+def reminders_running() -> bool:
+    """Check if the reminder scheduler was started, in this worker or another one"""
+    return _wheel is not None or (has_app_context() and bool(current_app.config.get("REMINDERS_ENABLED")))
+
+
+def next_reminder(zone_name: str, now: datetime) -> tuple[datetime, datetime]:
+    """
+    Get the next reminder of a habit and the deadline it is for.
+
+    A habit added less than REMINDER_LEAD before the deadline is first
+    reminded of before the next one.
+
+    :param zone_name: The timezone of the habit's owner.
+    :param now: A naive UTC datetime.
+    :return: The time to remind at and the deadline, naive UTC datetimes.
+    """
+    day = deadlines.local_day(zone_name, now) + timedelta(days=1)
+    deadline = deadlines.day_start(zone_name, day)
+
+    if deadline - REMINDER_LEAD <= now:
+        deadline = deadlines.day_start(zone_name, day + timedelta(days=1))
+
+    return deadline - REMINDER_LEAD, deadline
+
+
+def schedule_reminders(habit_list_item_ids: list[str], zone_name: str, now: datetime | None = None) -> None:
+    """
+    Schedule the next reminders of habit list items of a user, replacing their pending ones.
+
+    :param habit_list_item_ids: The IDs of the habit list items.
+    :param zone_name: The timezone of the habits' owner.
+    :param now: A naive UTC datetime, the current time by default.
+    """
+    if not reminders_running() or not habit_list_item_ids:
+        return
+
+    remind_at, deadline = next_reminder(zone_name, now or utc_now())
+    publish_to_workers("reminders_schedule", {
+        "habit_list_item_ids": list(habit_list_item_ids),
+        "tick": to_tick(remind_at),
+        "deadline": deadline.isoformat(),
+    })
+
+
+def schedule_reminder(habit_list_item_id: str, zone_name: str, now: datetime | None = None) -> None:
+    """
+    Schedule the next reminder of a habit list item, replacing its pending one.
+
+    :param habit_list_item_id: The ID of the habit list item.
+    :param zone_name: The timezone of the habit's owner.
+    :param now: A naive UTC datetime, the current time by default.
+    """
+    schedule_reminders([habit_list_item_id], zone_name, now)
+
+
+def cancel_reminders(habit_list_item_ids: list[str]) -> None:
+    """
+    Cancel the pending reminders of habit list items.
+
+    :param habit_list_item_ids: The IDs of the habit list items.
+    """
+    if reminders_running() and habit_list_item_ids:
+        publish_to_workers("reminders_cancel", {"habit_list_item_ids": list(habit_list_item_ids)})
+
+
+def cancel_reminder(habit_list_item_id: str) -> None:
+    """
+    Cancel the pending reminder of a habit list item.
+    """
+    cancel_reminders([habit_list_item_id])
+
+
+@on_worker_message("reminders_schedule")
+def _handle_schedule(data: dict) -> None:
+    if _wheel is None:
+        return
+
+    deadline = datetime.fromisoformat(data["deadline"])
+
+    for habit_list_item_id in data["habit_list_item_ids"]:
+        _wheel.schedule(habit_list_item_id, data["tick"], deadline)
+
+
+@on_worker_message("reminders_cancel")
+def _handle_cancel(data: dict) -> None:
+    if _wheel is None:
+        return
+
+    for habit_list_item_id in data["habit_list_item_ids"]:
+        _wheel.cancel(habit_list_item_id)
+
+
+def reschedule_user_reminders(user_id: str, zone_name: str) -> None:
+    """
+    Schedule the reminders of every incomplete habit of a User again, after their timezone changed.
+    """
+    from src.models.habit_list import HabitList, HabitListItem
+
+    if not reminders_running():
+        return
+
+    habit_list_item_ids = db.session.execute(
+        select(HabitListItem.id)
+        .join(HabitList, HabitList.id == HabitListItem.habit_list_id)
+        .where(HabitList.list_owner_id == user_id, HabitListItem.habit_is_completed.isnot(True))
+    ).scalars().all()
+
+    schedule_reminders(habit_list_item_ids, zone_name)
+
+
+def start_reminders(now: int | None = None) -> int:
+    """
+    Start the scheduler with a reminder for every incomplete habit in the database.
+
+    :param now: The current UNIX time in seconds, the current time by default.
+    :return: The number of reminders scheduled.
+    """
+    from src.models.habit_list import HabitList, HabitListItem
+    from src.models.user import User
+
+    global _wheel
+
+    now = int(now or time.time())
+    wheel = TimingWheel(now)
+
+    # Only the columns needed, loading every item object would take minutes
+    rows = db.session.execute(
+        select(HabitListItem.id, User.timezone)
+        .join(HabitList, HabitList.id == HabitListItem.habit_list_id)
+        .join(User, User.id == HabitList.list_owner_id)
+        .where(HabitListItem.habit_is_completed.isnot(True))
+    )
+
+    for habit_list_item_id, zone_name in rows:
+        remind_at, deadline = next_reminder(zone_name, from_tick(now))
+        wheel.schedule(habit_list_item_id, to_tick(remind_at), deadline)
+
+    _wheel = wheel
+
+    return len(wheel)
+
+
+def stop_reminders() -> None:
+    """
+    Stop the scheduler and drop every pending reminder.
+    """
+    global _wheel
+
+    _wheel = None
+
+
+def send_due_reminders(now: int | None = None) -> int:
+    """
+    Push the reminders due by now and schedule the next ones.
+
+    Due habits that were completed or removed without cancelling their
+    reminder, e.g. by another process, are dropped.
+
+    :param now: The current UNIX time in seconds, the current time by default.
+    :return: The number of users reminded.
+    """
+    from src.models.habit_list import HabitList, HabitListItem
+    from src.models.user import User
+
+    if _wheel is None:
+        return 0
+
+    now = int(now or time.time())
+    due = _wheel.advance(now)
+    reminded = 0
+
+    for start in range(0, len(due), REMINDER_BATCH_SIZE):
+        deadline_by_item = dict(due[start:start + REMINDER_BATCH_SIZE])
+
+        rows = db.session.execute(
+            select(HabitListItem.id, HabitList.list_owner_id, User.timezone)
+            .join(HabitList, HabitList.id == HabitListItem.habit_list_id)
+            .join(User, User.id == HabitList.list_owner_id)
+            .where(HabitListItem.id.in_(deadline_by_item), HabitListItem.habit_is_completed.isnot(True))
+            .order_by(HabitList.list_owner_id)
+        ).all()
+
+        for user_id, user_rows in groupby(rows, key=lambda row: row.list_owner_id):
+            user_rows = list(user_rows)
+            emit_to_user("habit_reminder", {
+                "user_id": user_id,
+                "habit_list_item_ids": [row.id for row in user_rows],
+                "deadline": deadline_by_item[user_rows[0].id].isoformat(),
+            }, user_id, admins=False)
+            reminded += 1
+
+            for row in user_rows:
+                remind_at, deadline = next_reminder(row.timezone, from_tick(now))
+                _wheel.schedule(row.id, to_tick(remind_at), deadline)
+
+    return reminded
+
+
+def run_reminders(app) -> None:
+    """
+    Start the scheduler and push the due reminders every second.
+
+    Runs forever, start it as a background task.
+
+    :param app: The Flask app to run the scheduler in.
+    """
+    with app.app_context():
+        try:
+            start_reminders()
+        finally:
+            db.session.remove()
+
+    while True:
+        with app.app_context():
+            try:
+                send_due_reminders()
+            except Exception:
+                app.logger.exception("Sending reminders failed")
+            finally:
+                db.session.remove()
+
+        socketio.sleep(1)
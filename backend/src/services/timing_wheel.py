@@ -0,0 +1,144 @@
+"""
+This module exports a hierarchical timing wheel.
+
+Timers are kept in slots of wheels of increasing range instead of a
+sorted structure, so scheduling and cancelling a timer is O(1) whatever
+the number of pending timers. Every tick expires one slot of the finest
+wheel. When that wheel wraps around, the next slot of the coarser wheel
+is cascaded down, so each timer is moved at most once per level.
+"""
+
+from threading import Lock
+from typing import Any, Hashable
+
+# Slots per wheel, a power of two so slot indexes are bit masks
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SIZE - 1
+
+
+class TimingWheel:
+    """
+    Timers keyed by a unique key, firing on integer ticks.
+
+    With the default 4 levels of 64 slots, a timer can be scheduled up to
+    64**4 ticks ahead, over 194 days with 1 second ticks. Timers further
+    ahead are kept in the coarsest wheel and cascaded again until due.
+    """
+
+    def __init__(self, now: int, levels: int = 4) -> None:
+        """
+        :param now: The current tick.
+        :param levels: The number of wheels.
+        """
+        self.__tick = now
+        # One wheel of WHEEL_SIZE slots per level, each slot maps keys to (tick, payload)
+        self.__wheels: list[list[dict]] = [[{} for _ in range(WHEEL_SIZE)] for _ in range(levels)]
+        # key -> the slot holding it, so a timer is cancelled without a search
+        self.__slots: dict[Hashable, dict] = {}
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__slots
+
+    @property
+    def tick(self) -> int:
+        """The last tick advanced to"""
+        return self.__tick
+
+    def schedule(self, key: Hashable, tick: int, payload: Any = None) -> None:
+        """
+        Schedule a timer, replacing the pending timer with the same key.
+
+        A timer for a tick already passed fires on the next advance.
+
+        :param key: The unique key of the timer.
+        :param tick: The tick to fire at.
+        :param payload: The value returned when the timer fires.
+        """
+        with self.__lock:
+            self._discard(key)
+            self._place(key, tick, payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a pending timer.
+
+        :return: False if no timer was pending with this key.
+        """
+        with self.__lock:
+            return self._discard(key)
+
+    def advance(self, now: int) -> list[tuple[Hashable, Any]]:
+        """
+        Move the wheel up to a tick and expire the timers due by then.
+
+        :param now: The current tick.
+        :return: The (key, payload) of every expired timer, in firing order.
+        """
+        expired = []
+
+        with self.__lock:
+            # Timers placed for the current tick or earlier
+            expired.extend(self._pop_slot(self.__wheels[0][self.__tick & WHEEL_MASK]))
+
+            while self.__tick < now:
+                self.__tick += 1
+                self._cascade()
+                expired.extend(self._pop_slot(self.__wheels[0][self.__tick & WHEEL_MASK]))
+
+        return expired
+
+    def _place(self, key: Hashable, tick: int, payload: Any) -> None:
+        """Helper method to put a timer in the slot of the wheel covering its delay"""
+        if tick < self.__tick:
+            tick = self.__tick
+
+        # Coarser wheels each cover WHEEL_SIZE times the range of the previous one
+        level = min(max((tick - self.__tick).bit_length() - 1, 0) // WHEEL_BITS, len(self.__wheels) - 1)
+        slot = self.__wheels[level][(tick >> (WHEEL_BITS * level)) & WHEEL_MASK]
+        slot[key] = (tick, payload)
+        self.__slots[key] = slot
+
+    def _discard(self, key: Hashable) -> bool:
+        """Helper method to remove a timer"""
+        slot = self.__slots.pop(key, None)
+
+        if slot is None:
+            return False
+
+        del slot[key]
+
+        return True
+
+    def _cascade(self) -> None:
+        """Helper method to move the timers of coarser slots down when the finer wheels wrap around"""
+        for level in range(1, len(self.__wheels)):
+            # The wheels below have wrapped around only if these bits are all 0
+            if self.__tick & ((1 << (WHEEL_BITS * level)) - 1):
+                break
+
+            slot = self.__wheels[level][(self.__tick >> (WHEEL_BITS * level)) & WHEEL_MASK]
+
+            if slot:
+                timers = list(slot.items())
+                slot.clear()
+
+                for key, (tick, payload) in timers:
+                    self._place(key, tick, payload)
+
+    def _pop_slot(self, slot: dict) -> list[tuple[Hashable, Any]]:
+        """Helper method to expire the due timers of a slot of the finest wheel"""
+        if not slot:
+            return []
+
+        due = [(key, payload) for key, (tick, payload) in slot.items() if tick <= self.__tick]
+
+        for key, _ in due:
+            del slot[key]
+            del self.__slots[key]
+
+        return due
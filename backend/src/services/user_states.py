@@ -0,0 +1,75 @@
+"""
+This module exports the versions of the user states sent over Socket.IO.
+
+A user_update carries the fields of the user that changed since the
+previous update, with the version of the state, instead of the whole
+user. Clients apply the changes of version n on top of version n - 1;
+when they miss one, or (re)connect with no state to start from, they
+ask for a full snapshot with the "user_resync" event.
+
+Versions live in the memory of the worker, which encodes the updates it
+sends to its clients, see message_queue. The first update of a user
+after a restart is a full snapshot.
+"""
+
+import threading
+
+# Fields missing from the previous state
+_MISSING = object()
+
+
+class UserStates:
+    """
+    The last state sent to the room of each user, and its version.
+    """
+
+    def __init__(self):
+        self._states: dict[str, tuple[int, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _swap(self, user_id: str, user_data: dict, same_version: bool = False) -> tuple[int, dict | None]:
+        """Store the state of a user and return its version and the previous state"""
+        with self._lock:
+            version, previous = self._states.get(user_id, (0, None))
+
+            if not (same_version and previous == user_data):
+                version += 1
+
+            self._states[user_id] = (version, user_data)
+
+        return version, previous
+
+    def encode(self, user_id: str, user_data: dict) -> dict:
+        """
+        Get the user_update payload of a new state of a user.
+
+        :param user_id: The ID of the user.
+        :param user_data: The user as a dictionary.
+        :return: The changed fields in "changes", or the whole state in "user_data" if none was sent before.
+        """
+        version, previous = self._swap(user_id, user_data)
+
+        if previous is None:
+            return {"user_id": user_id, "version": version, "user_data": user_data}
+
+        changes = {field: value for field, value in user_data.items() if previous.get(field, _MISSING) != value}
+
+        return {"user_id": user_id, "version": version, "changes": changes}
+
+    def snapshot(self, user_id: str, user_data: dict) -> dict:
+        """
+        Get the user_update payload of a full snapshot of a user.
+
+        The snapshot keeps the current version if the state did not change,
+        so the other clients of the user are not made to resync.
+
+        :param user_id: The ID of the user.
+        :param user_data: The user as a dictionary, fresh from the database.
+        :return: The whole state in "user_data".
+        """
+        version, _ = self._swap(user_id, user_data, same_version=True)
+
+        return {"user_id": user_id, "version": version, "user_data": user_data}
+
+
+user_states = UserStates()
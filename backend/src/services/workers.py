@@ -0,0 +1,107 @@
+"""
+This module exports the coordination between the workers of the app.
+
+Under gunicorn, each worker process keeps its own in-memory state, like
+the leaderboard and the reminder timing wheel. A change to that state is
+published as a worker message that every worker handles, the one that
+made the change included. Messages go through the Socket.IO client
+manager, so through the message queue when SOCKETIO_MESSAGE_QUEUE is
+set, on a namespace whose events are never sent to clients.
+
+Background tasks that must run once, like the reminders, run in the one
+worker holding the lock on WORKER_LOCK_FILE. When it exits, the lock is
+released and another worker takes over.
+"""
+
+import fcntl
+from typing import Any, Callable
+from src import socketio
+
+# Namespace of the messages between workers, never sent to clients
+WORKERS_NAMESPACE = "/_workers"
+# Seconds between two attempts to take the worker lock
+WORKER_LOCK_RETRY = 10
+
+_handlers: dict[str, Callable[[Any], None]] = {}
+_lock_file = None
+
+
+def on_worker_message(name: str):
+    """
+    Register the handler of a worker message, run in every worker it is published to.
+
+    :param name: The name of the message.
+    """
+    def register(handler: Callable[[Any], None]) -> Callable[[Any], None]:
+        _handlers[name] = handler
+        return handler
+
+    return register
+
+
+def handle_worker_message(name: str, data) -> None:
+    """Run the handler of a worker message, called by the client manager"""
+    handler = _handlers.get(name)
+
+    if handler:
+        handler(data)
+
+
+def publish_to_workers(name: str, data) -> None:
+    """
+    Publish a message to every worker, this one included.
+
+    Without a Socket.IO server, e.g. outside of an app, the message is only handled here.
+
+    :param name: The name of the message.
+    :param data: The JSON serializable payload.
+    """
+    if socketio.server is None:
+        handle_worker_message(name, data)
+    else:
+        socketio.server.emit(name, data, namespace=WORKERS_NAMESPACE)
+
+
+def acquire_worker_lock(path: str) -> bool:
+    """
+    Try to take the lock of the worker that runs the background tasks.
+
+    The lock is held until the process exits.
+
+    :param path: The path of the lock file, shared by the workers.
+    :return: True if this process holds the lock.
+    """
+    global _lock_file
+
+    if _lock_file is not None:
+        return True
+
+    lock_file = open(path, "a")
+
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    _lock_file = lock_file
+
+    return True
+
+
+def run_in_one_worker(app, tasks: list[Callable]) -> None:
+    """
+    Start background tasks once this worker holds the worker lock.
+
+    Without a WORKER_LOCK_FILE, the tasks start right away.
+
+    :param app: The Flask app the tasks run in.
+    :param tasks: Functions of the app, started as background tasks.
+    """
+    path = app.config.get("WORKER_LOCK_FILE")
+
+    while path and not acquire_worker_lock(path):
+        socketio.sleep(WORKER_LOCK_RETRY)
+
+    for task in tasks:
+        socketio.start_background_task(task, app)
@@ -0,0 +1,20 @@
+import pytest
+from src import create_app
+from src.models import db
+from src.persistence.db import DBRepository
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """
+    Fixture with an app backed by an in-memory database and the DB repository.
+    """
+    app = create_app("src.config.TestingConfig")
+    monkeypatch.setenv("REPOSITORY", "db")
+    monkeypatch.setattr("src.persistence.repo", DBRepository())
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+from src.models import db
+from src.models.category import Category
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+
+
+@pytest.fixture
+def habit_list(app):
+    """
+    Fixture with an empty habit list and 100 preset habits, returning their IDs.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    habits = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(100)]
+    db.session.add_all([user, Category("Fitness"), *habits])
+    db.session.flush()
+    habit_list = HabitList(name="Morning", list_owner_id=user.id)
+    db.session.add(habit_list)
+    db.session.commit()
+
+    return habit_list.id, [habit.id for habit in habits]
+
+
+def item_count(habit_list_id: str) -> int:
+    return db.session.scalar(select(func.count()).where(HabitListItem.habit_list_id == habit_list_id))
+
+
+def test_adding_habits_takes_constant_round_trips(habit_list):
+    """
+    Test that 100 habits are checked and added with one SELECT and one INSERT.
+    """
+    habit_list_id, habit_ids = habit_list
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        added = HabitListItem.add_habits(habit_list_id, "preset", habit_ids)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert statements == ["SELECT", "INSERT"]
+    assert [item["preset_habit_id"] for item in added] == habit_ids
+    assert item_count(habit_list_id) == 100
+
+
+def test_habits_already_in_the_list_are_skipped(habit_list):
+    """
+    Test that adding habits again only adds the new ones, and that the database rejects duplicates.
+    """
+    habit_list_id, habit_ids = habit_list
+    HabitListItem.add_habits(habit_list_id, "preset", habit_ids[:10])
+
+    added = HabitListItem.add_habits(habit_list_id, "preset", habit_ids[5:15] + habit_ids[5:7])
+
+    assert [item["preset_habit_id"] for item in added] == habit_ids[10:15]
+    assert item_count(habit_list_id) == 15
+
+    db.session.add(HabitListItem(habit_list_id, preset_habit_id=habit_ids[0]))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+
+
+def test_unknown_habit_adds_nothing(habit_list):
+    """
+    Test that a request with an unknown habit is rejected without adding the others.
+    """
+    habit_list_id, habit_ids = habit_list
+
+    with pytest.raises(LookupError, match="missing"):
+        HabitListItem.add_habits(habit_list_id, "preset", habit_ids[:3] + ["missing"])
+
+    assert item_count(habit_list_id) == 0
@@ -0,0 +1,150 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src.models import db
+from src.models.category import Category
+from src.models.preset_habit import PresetHabit
+from src.services.catalog import catalog
+from src.services.workers import handle_worker_message
+
+
+@pytest.fixture
+def habits(app):
+    """
+    Fixture with 2 categories of 2 preset habits, returning the preset habits' IDs.
+    """
+    Category.create("Fitness")
+    Category.create("Mind")
+    ids = [PresetHabit.create({"description": f"Habit {i}", "category_name": category}).id
+           for i, category in enumerate(["Fitness", "Fitness", "Mind", "Mind"])]
+
+    return ids
+
+
+@pytest.fixture
+def admin_headers():
+    return {"Authorization": f"Bearer {create_access_token(identity='admin', additional_claims={'is_admin': True})}"}
+
+
+def count_statements(app, headers: dict, *urls) -> tuple[int, list]:
+    """Get the number of SQL statements run by GET requests, and their JSON"""
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    client = app.test_client()
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        responses = [client.get(url, headers=headers) for url in urls]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert all(response.status_code == 200 for response in responses)
+
+    return len(statements), [response.get_json() for response in responses]
+
+
+def test_catalog_endpoints_run_no_query(app, habits, admin_headers):
+    """
+    Test that the catalog endpoints are served from the snapshot, without a query.
+    """
+    count, (categories, preset_habits, fitness, preset_habit, category) = count_statements(
+        app, admin_headers, "/categories/", "/preset_habits/", "/categories/Fitness/preset_habits",
+        f"/preset_habits/{habits[2]}", "/categories/Mind")
+
+    assert count == 0
+    assert categories == [{"name": "Fitness"}, {"name": "Mind"}]
+    assert [habit["id"] for habit in preset_habits] == habits
+    assert [habit["id"] for habit in fitness] == habits[:2]
+    assert preset_habit["description"] == "Habit 2"
+    assert category == {"name": "Mind"}
+
+
+def test_missing_entries_are_404(app, habits, admin_headers):
+    """
+    Test that unknown categories and preset habits are still not found.
+    """
+    client = app.test_client()
+
+    assert client.get("/categories/Unknown").status_code == 404
+    assert client.get("/categories/Unknown/preset_habits").status_code == 404
+    assert client.get("/preset_habits/unknown", headers=admin_headers).status_code == 404
+
+
+def test_admin_changes_swap_the_snapshot(app, habits, admin_headers):
+    """
+    Test that admin changes to the catalog swap in a new version, seen by the next request.
+    """
+    client = app.test_client()
+    before = catalog.get()
+
+    response = client.post("/categories/", json={"name": "Sleep"}, headers=admin_headers)
+    assert response.status_code == 201
+    response = client.put(f"/preset_habits/{habits[0]}", json={"description": "Run"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.delete(f"/preset_habits/{habits[3]}", headers=admin_headers).status_code == 204
+
+    after = catalog.get()
+
+    assert after.version == before.version + 3
+    assert "Sleep" in after.categories and "Sleep" not in before.categories
+    assert before.preset_habits[habits[0]]["description"] == "Habit 0"
+    assert client.get(f"/preset_habits/{habits[0]}", headers=admin_headers).get_json()["description"] == "Run"
+    assert [habit["id"] for habit in client.get("/categories/Mind/preset_habits").get_json()] == [habits[2]]
+    assert client.get("/categories/Sleep/preset_habits").get_json() == []
+
+
+def test_snapshot_is_read_only(app, habits):
+    """
+    Test that a snapshot can't be changed in place.
+    """
+    snapshot = catalog.get()
+
+    with pytest.raises(TypeError):
+        snapshot.categories["Sleep"] = {"name": "Sleep"}
+    with pytest.raises(TypeError):
+        snapshot.preset_habits[habits[0]]["description"] = "Run"
+    with pytest.raises(AttributeError):
+        snapshot.version = 0
+
+
+def test_other_workers_changes_swap_the_snapshot(app, habits, monkeypatch):
+    """
+    Test that a change published by another worker is swapped in without a query, and one made outside the app after the TTL.
+    """
+    published = []
+    monkeypatch.setattr("src.services.catalog.publish_to_workers", lambda name, data: published.append((name, data)))
+    old = catalog.get()
+
+    Category.create("Sleep")
+    name, data = published[-1]
+    new = catalog.get()
+
+    # This worker plays one that still has the old catalog
+    catalog.swap([dict(c) for c in old.categories.values()], [dict(h) for h in old.preset_habits.values()])
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        handle_worker_message(name, {**data, "origin": "another worker"})
+        snapshot = catalog.get()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert statements == []
+    assert "Sleep" in snapshot.categories
+    assert snapshot.etag == new.etag
+
+    # A change made outside the app shows after the TTL
+    db.session.add(Category("Focus"))
+    db.session.commit()
+
+    assert "Focus" not in catalog.get().categories
+
+    monkeypatch.setattr(catalog, "ttl", 0)
+
+    assert "Focus" in catalog.get().categories
@@ -0,0 +1,153 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from src.models import db
+from src.models.category import Category
+from src.models.habit_list import HabitList
+from src.models.user import User
+
+
+@pytest.fixture
+def user(app):
+    """
+    Fixture with a user with a habit list, returning their IDs and an access token.
+    """
+    user = User.create({"email": "test@example.com", "password": "password", "username": "testuser"})
+    habit_list = HabitList(name="Morning", list_owner_id=user.id)
+    db.session.add(habit_list)
+    db.session.commit()
+
+    return {"id": user.id, "habit_list": habit_list.id,
+            "headers": {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}}
+
+
+def revalidate(client, url: str, headers: dict, etag: str):
+    """GET a URL with the ETag of the copy the client has"""
+    return client.get(url, headers={**headers, "If-None-Match": f'"{etag}"'})
+
+
+@pytest.mark.parametrize("url", ["/users/{id}", "/users/leaderboard", "/users/leaderboard/me",
+                                 "/habit_lists/user", "/habit_lists/{habit_list}"])
+def test_unchanged_responses_are_304(app, user, url):
+    """
+    Test that a response the client already has is a 304 with no body.
+    """
+    client = app.test_client()
+    url = url.format(**user)
+
+    response = client.get(url, headers=user["headers"])
+    etag = response.get_etag()[0]
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].endswith("no-cache")
+
+    response = revalidate(client, url, user["headers"], etag)
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.get_etag()[0] == etag
+    assert revalidate(client, url, user["headers"], "other").status_code == 200
+
+
+@pytest.mark.parametrize("url", ["/categories/", "/categories/Fitness", "/categories/Fitness/preset_habits",
+                                 "/preset_habits/"])
+def test_catalog_changes_change_the_etag(app, user, url):
+    """
+    Test that the catalog responses are public, always revalidated and get a new ETag when the catalog changes.
+    """
+    Category.create("Fitness")
+    client = app.test_client()
+
+    response = client.get(url)
+    etag = response.get_etag()[0]
+
+    assert response.headers["Cache-Control"] == "public, no-cache"
+    assert revalidate(client, url, {}, etag).status_code == 304
+
+    Category.create("Mind")
+
+    assert revalidate(client, url, {}, etag).status_code == 200
+
+
+def test_user_changes_change_the_etag(app, user, monkeypatch):
+    """
+    Test that a change to a user gives their profile and the leaderboard a new ETag, and that a 304
+    never serializes the user.
+    """
+    client = app.test_client()
+    url = f"/users/{user['id']}"
+    etag = client.get(url, headers=user["headers"]).get_etag()[0]
+    leaderboard_etag = client.get("/users/leaderboard").get_etag()[0]
+
+    def to_dict(self):
+        raise AssertionError("A 304 must not serialize the user")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(User, "to_dict", to_dict)
+        assert revalidate(client, url, user["headers"], etag).status_code == 304
+
+    client.put(url, json={"username": "renamed"}, headers=user["headers"])
+    response = revalidate(client, url, user["headers"], etag)
+
+    assert response.status_code == 200
+    assert response.get_json()["username"] == "renamed"
+    # The leaderboard shows the username
+    assert revalidate(client, "/users/leaderboard", {}, leaderboard_etag).status_code == 200
+
+
+def test_habit_list_changes_change_the_etag(app, user):
+    """
+    Test that renaming a habit list gives its responses a new ETag.
+    """
+    client = app.test_client()
+    urls = [f"/habit_lists/{user['habit_list']}", "/habit_lists/user"]
+    etags = [client.get(url, headers=user["headers"]).get_etag()[0] for url in urls]
+
+    response = client.put(urls[0], json={"name": "Evening"}, headers=user["headers"])
+    assert response.status_code == 200
+
+    for url, etag in zip(urls, etags):
+        assert revalidate(client, url, user["headers"], etag).status_code == 200
+
+
+@pytest.mark.parametrize("url", ["/users/leaderboard", "/users/leaderboard/me"])
+def test_leaderboard_etag_is_the_same_in_every_worker(app, user, url):
+    """
+    Test that a board rebuilt with the same users, like the one of another worker, keeps its ETag.
+    """
+    from src.services.leaderboard import rebuild_leaderboard
+
+    client = app.test_client()
+    etag = client.get(url, headers=user["headers"]).get_etag()[0]
+
+    rebuild_leaderboard()
+
+    assert revalidate(client, url, user["headers"], etag).status_code == 304
+
+
+@pytest.mark.parametrize("period", ["all", "week"])
+def test_leaderboard_304_never_reads_the_board(app, user, period, monkeypatch):
+    """
+    Test that a leaderboard the client has is answered from its version, and that a gain changes it.
+    """
+    from src.models.xp_bucket import XpBucket
+    from src.services.leaderboard import leaderboard, update_leaderboard
+
+    url = f"/users/leaderboard?period={period}"
+    client = app.test_client()
+    User.apply_stat_changes(user["id"], xp=10)
+    db.session.commit()
+    etag = client.get(url).get_etag()[0]
+
+    def read(*args, **kwargs):
+        raise AssertionError("A 304 must not read the board")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(leaderboard, "page", read)
+        patch.setattr(XpBucket, "get_leaderboard", read)
+        assert revalidate(client, url, {}, etag).status_code == 304
+
+    # Like a completion, which also moves the user on the all-time board
+    update_leaderboard(User.apply_stat_changes(user["id"], xp=10).to_dict())
+    db.session.commit()
+
+    assert revalidate(client, url, {}, etag).status_code == 200
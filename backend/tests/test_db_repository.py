@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from src.models.user import User
+from src.persistence.db import DBRepository
+
+
+@pytest.fixture
+def repo(app):
+    """
+    Fixture with the DB repository of the app of conftest.py.
+    """
+    return DBRepository()
+
+
+def test_failed_write_rolls_back_the_transaction(repo):
+    """
+    Test that a failed write inside a transaction raises and undoes the writes before it.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    never_saved = User(email="other@example.com", password="password", username="other")
+
+    with pytest.raises(SQLAlchemyError):
+        with repo.transaction():
+            repo.save(user)
+            repo.delete(never_saved)
+
+    assert repo.get_all(User) == []
+
+
+def test_failed_write_outside_a_transaction_is_reported(repo):
+    """
+    Test that a failed write outside a transaction still returns False instead of raising.
+    """
+    never_saved = User(email="other@example.com", password="password", username="other")
+
+    assert repo.delete(never_saved) is False
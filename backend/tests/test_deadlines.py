@@ -0,0 +1,54 @@
+from datetime import date, datetime
+import pytest
+from src.models.user import User
+from src.services.deadlines import DeadlineEngine
+
+
+def test_day_start_follows_daylight_saving_time():
+    """
+    Test that midnight is converted to UTC with the offset of that day.
+    """
+    engine = DeadlineEngine()
+
+    assert engine.day_start("US/Eastern", date(2026, 7, 1)) == datetime(2026, 7, 1, 4)
+    assert engine.day_start("US/Eastern", date(2026, 12, 1)) == datetime(2026, 12, 1, 5)
+    assert engine.day_start("Asia/Kolkata", date(2026, 7, 1)) == datetime(2026, 6, 30, 18, 30)
+
+
+def test_local_day_and_deadlines():
+    """
+    Test that the local day can be the day before or after the UTC day.
+    """
+    engine = DeadlineEngine()
+    now = datetime(2026, 7, 1, 12)
+
+    assert engine.local_day("Pacific/Kiritimati", now) == date(2026, 7, 2)
+    assert engine.local_day("Pacific/Pago_Pago", datetime(2026, 7, 1, 5)) == date(2026, 6, 30)
+    assert engine.local_day("UTC", now) == date(2026, 7, 1)
+    assert engine.last_deadline("US/Eastern", now) == datetime(2026, 7, 1, 4)
+    assert engine.next_deadline("US/Eastern", now) == datetime(2026, 7, 2, 4)
+    assert engine.seconds_until_next_deadline(["US/Eastern", "Europe/Paris"], now) == 10 * 3600
+
+
+def test_zones_are_grouped_by_deadline():
+    """
+    Test that timezones whose day ends at the same instant are swept together.
+    """
+    engine = DeadlineEngine()
+    grouped = engine.last_deadlines(["Asia/Seoul", "US/Eastern", "Asia/Tokyo"], datetime(2026, 7, 1, 12))
+
+    assert grouped == {
+        datetime(2026, 7, 1, 4): ["US/Eastern"],
+        datetime(2026, 6, 30, 15): ["Asia/Seoul", "Asia/Tokyo"],
+    }
+
+
+def test_unknown_timezone_is_rejected():
+    """
+    Test that a User cannot be given a timezone that does not exist.
+    """
+    with pytest.raises(ValueError):
+        DeadlineEngine().day_start("Mars/Olympus_Mons", date(2026, 7, 1))
+
+    with pytest.raises(ValueError):
+        User(email="test@example.com", password="password", username="test", timezone="Mars/Olympus_Mons")
@@ -0,0 +1,125 @@
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from src import socketio
+from src.models import db
+from src.models.user import User
+from src.services.event_dispatcher import EventDispatcher
+from src.services.notifications import dispatcher
+
+
+@pytest.fixture
+def sent():
+    """
+    Fixture with the list of the frames a dispatcher sends.
+    """
+    return []
+
+
+@pytest.fixture
+def events(sent):
+    """
+    Fixture with a dispatcher of at most 3 pending events that records the frames it sends.
+    """
+    return EventDispatcher(lambda recipient, event, data: sent.append((recipient, event, data)), max_pending=3)
+
+
+def test_updates_of_an_entity_are_coalesced(events, sent):
+    """
+    Test that only the latest state of an entity is sent, in the order it was first queued.
+    """
+    for xp in range(5):
+        events.dispatch("user_update", {"xp": xp}, "alice", key="alice")
+    events.dispatch("user_update", {"xp": 0}, "bob", key="bob")
+
+    assert events.flush() == 2
+    assert sent == [("alice", "user_update", {"xp": 4}), ("bob", "user_update", {"xp": 0})]
+    assert events.metrics()["coalesced"] == 4
+    assert events.flush() == 0
+
+
+def test_events_of_a_recipient_are_batched(events, sent):
+    """
+    Test that the events of a recipient are sent in one frame, with the payloads as dispatched.
+    """
+    events.dispatch("habit_list_created", {"id": "1"}, "alice")
+    events.dispatch("habit_list_created", {"id": "2"}, "alice")
+    events.dispatch("user_update", {"updated_at": datetime(2026, 10, 18, 12)}, "alice", key="alice")
+
+    assert events.flush() == 1
+    assert sent == [("alice", "batch", [
+        ["habit_list_created", {"id": "1"}],
+        ["habit_list_created", {"id": "2"}],
+        ["user_update", {"updated_at": datetime(2026, 10, 18, 12)}],
+    ])]
+
+
+def test_full_queue_drops_new_events(events, sent):
+    """
+    Test that a full queue drops new events but still coalesces queued ones.
+    """
+    for user in ("a", "b", "c", "d"):
+        events.dispatch("user_update", {"xp": 1}, user, key=user)
+
+    assert not events.dispatch("user_update", {"xp": 1}, "e", key="e")
+    assert events.dispatch("user_update", {"xp": 2}, "a", key="a")
+
+    metrics = events.metrics()
+    assert (metrics["queue_depth"], metrics["queued"], metrics["dropped"], metrics["coalesced"]) == (3, 3, 2, 1)
+
+    events.flush()
+
+    assert [data["xp"] for _, _, data in sent] == [2, 1, 1]
+    assert events.metrics()["queue_depth"] == 0
+    assert events.metrics()["sent_events"] == 3
+
+
+@pytest.fixture
+def app(app):
+    """
+    Fixture with the app of conftest.py, and a user and an admin.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    admin = User(email="admin@example.com", password="password", username="admin", is_admin=True)
+    db.session.add_all([user, admin])
+    db.session.commit()
+    app.user_ids = user.id, admin.id
+
+    return app
+
+
+def test_reading_a_user_emits_nothing(app):
+    """
+    Test that GET /users/<id> no longer emits a user_update, but PUT does.
+    """
+    user_id, _ = app.user_ids
+    token = create_access_token(identity=user_id)
+    client = socketio.test_client(app, auth={"token": token})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert app.test_client().get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert client.get_received() == []
+
+    app.test_client().put(f"/users/{user_id}", headers=headers, json={"username": "renamed"})
+
+    assert [event["name"] for event in client.get_received()] == ["user_update"]
+
+
+def test_admins_get_the_dispatcher_metrics(app):
+    """
+    Test that the dispatcher metrics are reserved to admins.
+    """
+    user_id, admin_id = app.user_ids
+    client = app.test_client()
+
+    response = client.get("/admin/metrics/events", headers={
+        "Authorization": f"Bearer {create_access_token(identity=user_id)}"})
+
+    assert response.status_code == 403
+
+    response = client.get("/admin/metrics/events", headers={
+        "Authorization": f"Bearer {create_access_token(identity=admin_id, additional_claims={'is_admin': True})}"})
+
+    assert response.status_code == 200
+    assert response.get_json() == dispatcher.metrics()
+    assert response.get_json()["running"] is False
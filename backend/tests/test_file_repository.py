@@ -0,0 +1,122 @@
+import json
+import pytest
+from src.models.preset_habit import PresetHabit
+from src.persistence.file import FileRepository
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """
+    Fixture with the snapshot and journal paths inside a temporary directory.
+    """
+    return str(tmp_path / "data.json"), str(tmp_path / "data.json.log")
+
+
+def make_repo(paths, **kw):
+    filename, journal_filename = paths
+    return FileRepository(filename=filename, journal_filename=journal_filename, **kw)
+
+
+def test_writes_append_to_journal(paths):
+    """
+    Test that a write appends one record instead of rewriting the snapshot.
+    """
+    repo = make_repo(paths)
+    with open(paths[0]) as file:
+        snapshot_before = file.read()
+
+    habit = PresetHabit(description="Drink water", category_name="Fitness")
+    repo.save(habit)
+
+    with open(paths[0]) as file:
+        assert file.read() == snapshot_before
+
+    with open(paths[1]) as file:
+        records = [json.loads(line) for line in file]
+
+    assert len(records) == 1
+    assert records[0]["op"] == "save"
+    assert records[0]["id"] == habit.id
+
+
+def test_reload_replays_snapshot_and_journal(paths):
+    """
+    Test that reload rebuilds the state from the snapshot plus the journal.
+    """
+    repo = make_repo(paths)
+    kept = PresetHabit(description="Read a book", category_name="Learning")
+    deleted = PresetHabit(description="Go for a run", category_name="Fitness")
+    repo.save(kept)
+    repo.save(deleted)
+    kept.description = "Read two books"
+    repo.update(kept)
+    repo.delete(deleted)
+
+    reloaded = make_repo(paths)
+    habits = reloaded.get_all("presethabit")
+
+    assert [habit.id for habit in habits] == [kept.id]
+    assert habits[0].description == "Read two books"
+
+
+def test_compaction_folds_journal_into_snapshot(paths):
+    """
+    Test that the journal is folded into the snapshot once it reaches the threshold.
+    """
+    repo = make_repo(paths, compaction_threshold=3)
+    habits = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(3)]
+
+    for habit in habits:
+        repo.save(habit)
+
+    with open(paths[0]) as file:
+        snapshot = json.load(file)
+
+    assert {item["id"] for item in snapshot["presethabit"]} == {habit.id for habit in habits}
+
+    with pytest.raises(FileNotFoundError):
+        open(paths[1])
+
+    assert len(make_repo(paths).get_all("presethabit")) == 3
+
+
+def test_transaction_writes_once_and_rolls_back(paths):
+    """
+    Test that a transaction journals its writes together and discards them on error.
+    """
+    repo = make_repo(paths)
+    habit = PresetHabit(description="Stretch", category_name="Fitness")
+
+    with repo.transaction():
+        repo.save(habit)
+        habit.description = "Stretch twice"
+        repo.update(habit)
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete(habit)
+            raise RuntimeError("boom")
+
+    assert [h.description for h in repo.get_all("presethabit")] == ["Stretch twice"]
+    assert [h.id for h in make_repo(paths).get_all("presethabit")] == [habit.id]
+
+
+def test_transaction_rolls_back_without_journal(paths):
+    """
+    Test that a transaction rewrites the snapshot once and discards its writes on error without a journal.
+    """
+    filename, _ = paths
+    repo = make_repo(paths, journaled=False)
+    habit = PresetHabit(description="Stretch", category_name="Fitness")
+    repo.save(habit)
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.delete(habit)
+            repo.save(PresetHabit(description="Nap", category_name="Rest"))
+            raise RuntimeError("boom")
+
+    with open(filename) as file:
+        assert [h["id"] for h in json.load(file)["presethabit"]] == [habit.id]
+
+    assert [h.id for h in repo.get_all("presethabit")] == [habit.id]
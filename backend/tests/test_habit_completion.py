@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import event
+from src.models import db
+from src.models.category import Category
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+from src.services.habit_completion import COMPLETION_STATEMENT_BUDGET, complete_habit
+
+
+@pytest.fixture
+def habit_list_item(app):
+    """
+    Fixture with a preset habit waiting to be completed in a habit list.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    category = Category("Fitness")
+    habit = PresetHabit(description="Run", category_name="Fitness")
+    db.session.add_all([user, category, habit])
+    db.session.flush()
+    habit_list = HabitList(name="Morning", list_owner_id=user.id)
+    db.session.add(habit_list)
+    db.session.flush()
+    item = HabitListItem(habit_list_id=habit_list.id, preset_habit_id=habit.id)
+    db.session.add(item)
+    db.session.commit()
+
+    ids = {"user": user.id, "habit_list": habit_list.id, "habit": habit.id, "xp_reward": habit.xp_reward}
+    # Start from an empty identity map, like a new request
+    db.session.remove()
+
+    return ids
+
+
+def test_completion_stays_within_statement_budget(habit_list_item):
+    """
+    Test that completing a habit issues no more statements than the budget allows.
+    """
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        user_data = complete_habit(habit_list_item["habit_list"], habit_list_item["habit"], "preset")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) <= COMPLETION_STATEMENT_BUDGET, statements
+    assert user_data["id"] == habit_list_item["user"]
+    assert user_data["current_xp"] == habit_list_item["xp_reward"]
+
+    db.session.remove()
+    user = db.session.get(User, habit_list_item["user"])
+
+    assert user.current_xp == habit_list_item["xp_reward"]
+    assert user.habits_completed == 1
+    assert HabitListItem.query.filter_by(habit_list_id=habit_list_item["habit_list"]).count() == 0
+
+
+def test_completion_rejects_missing_habit(habit_list_item):
+    """
+    Test that missing lists and habits are reported with distinct errors.
+    """
+    with pytest.raises(LookupError):
+        complete_habit("missing", habit_list_item["habit"], "preset")
+
+    with pytest.raises(ValueError):
+        complete_habit(habit_list_item["habit_list"], "missing", "preset")
+
+
+def test_completion_rolls_back_when_owner_is_deleted(habit_list_item):
+    """
+    Test that a completion whose owner is deleted concurrently raises LookupError and keeps the item.
+    """
+    def delete_owner(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE users"):
+            cursor.execute("DELETE FROM users WHERE id = ?", (habit_list_item["user"],))
+
+    event.listen(db.engine, "before_cursor_execute", delete_owner)
+    try:
+        with pytest.raises(LookupError):
+            complete_habit(habit_list_item["habit_list"], habit_list_item["habit"], "preset")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", delete_owner)
+
+    db.session.remove()
+
+    assert HabitListItem.query.filter_by(habit_list_id=habit_list_item["habit_list"]).count() == 1
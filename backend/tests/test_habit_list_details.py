@@ -0,0 +1,95 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src.models import db
+from src.models.category import Category
+from src.models.custom_habit import CustomHabit
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+
+
+@pytest.fixture
+def habit_list(app):
+    """
+    Fixture with a habit list of 40 preset and 10 custom habits, returning its ID and an access token.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    presets = [PresetHabit(description=f"Preset {i}", category_name="Fitness") for i in range(40)]
+    db.session.add_all([user, Category("Fitness"), *presets])
+    db.session.flush()
+    customs = [CustomHabit(description=f"Custom {i}", habit_owner_id=user.id) for i in range(10)]
+    habit_list = HabitList(name="Morning", list_owner_id=user.id)
+    db.session.add_all([habit_list, *customs])
+    db.session.commit()
+
+    ids = habit_list.id, user.id
+    HabitListItem.add_habits(ids[0], "preset", [habit.id for habit in presets])
+    HabitListItem.add_habits(ids[0], "custom", [habit.id for habit in customs])
+    db.session.remove()
+
+    return ids[0], create_access_token(identity=ids[1])
+
+
+def count_statements(fn):
+    """
+    Call a function and return its result with the number of SQL statements it issued.
+    """
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    return result, len(statements)
+
+
+def test_details_are_loaded_in_one_query(habit_list):
+    """
+    Test that a habit list with 50 habits is loaded with a single query.
+    """
+    habit_list_id, _ = habit_list
+
+    details, statements = count_statements(lambda: HabitList.get_details(habit_list_id))
+
+    assert statements == 1
+    assert details["id"] == habit_list_id
+    assert len(details["habits"]) == 50
+    assert details["habits"][0]["description"] == "Preset 0"
+    assert details["habits"][0]["type"] == "preset"
+    assert {habit["type"] for habit in details["habits"][40:]} == {"custom"}
+    assert all(habit["xp_reward"] for habit in details["habits"])
+    assert HabitList.get_details("missing") is None
+
+
+def test_expand_habits(app, habit_list):
+    """
+    Test that GET /habit_lists/<id>?expand=habits includes the habits, and rejects other expansions.
+    """
+    habit_list_id, token = habit_list
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response, statements = count_statements(
+        lambda: client.get(f"/habit_lists/{habit_list_id}?expand=habits", headers=headers)
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["habits"]) == 50
+    assert statements == 1
+
+    assert "habits" not in client.get(f"/habit_lists/{habit_list_id}", headers=headers).get_json()
+    assert client.get(f"/habit_lists/{habit_list_id}?expand=owner", headers=headers).status_code == 400
+    assert client.get("/habit_lists/missing?expand=habits", headers=headers).status_code == 404
+
+    response, statements = count_statements(
+        lambda: client.get(f"/habit_lists/{habit_list_id}/habits", headers=headers)
+    )
+
+    assert len(response.get_json()) == 40
+    assert statements == 2
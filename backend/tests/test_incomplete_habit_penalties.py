@@ -0,0 +1,129 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from src.models import db
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.user import User, xp_for_level
+from src.services.penalty_sweep import _chunk_penalties, _penalty_statement
+
+# Every habit is added before it
+DEADLINE = datetime(2030, 1, 1)
+
+
+def add_user(name: str, hp: int, level: int, current_xp: int, habit_lists: list[list[bool]]) -> User:
+    """
+    Add a User with habit lists of completed and incomplete habits.
+    """
+    user = User(email=f"{name}@example.com", password="password", username=name)
+    user.hp, user.level, user.current_xp = hp, level, current_xp
+    user.total_xp = xp_for_level(level) + current_xp
+    db.session.add(user)
+    db.session.flush()
+
+    created_at = datetime(2026, 1, 1)
+
+    for index, habits in enumerate(habit_lists):
+        habit_list = HabitList(name=f"List {index}", list_owner_id=user.id)
+        habit_list.created_at = created_at + timedelta(minutes=index)
+        db.session.add(habit_list)
+        db.session.flush()
+        db.session.add_all(HabitListItem(habit_list.id, habit_is_completed=done) for done in habits)
+
+    db.session.commit()
+
+    return user
+
+
+def apply_penalties_per_item(user: User) -> None:
+    """
+    Apply the penalties one habit at a time, like HabitList.check_incomplete_habits used to for each list.
+    """
+    for habit_list in sorted(user.habit_lists, key=lambda habit_list: habit_list.created_at):
+        hp_is_zero = False
+
+        for habit_list_item in habit_list.habits:
+            if not habit_list_item.habit_is_completed:
+                user.lose_hp(hp_points=25)
+
+                if user.hp == 0:
+                    hp_is_zero = True
+
+        if hp_is_zero:
+            user.lose_xp(xp_points=50)
+
+
+def chunk_rows(users: list[User]) -> list:
+    """
+    Read Users the way the penalty sweep reads a chunk.
+    """
+    query = select(User.id, User.hp, User.timezone, User.penalized_day).where(User.id.in_([user.id for user in users]))
+
+    return db.session.execute(query.order_by(User.id)).all()
+
+
+def sweep_chunk(rows: list) -> list[dict]:
+    """
+    Penalize Users the way one chunk of the penalty sweep does, and return the penalties.
+    """
+    penalties = _chunk_penalties(rows, DEADLINE)
+
+    if penalties:
+        db.session.execute(_penalty_statement(), penalties)
+
+    db.session.commit()
+
+    return penalties
+
+
+def test_sweep_penalties_match_per_item_loop(app):
+    """
+    Test that the grouped count and batched UPDATE of the sweep leave Users exactly like the per-item loop.
+    """
+    rng = random.Random(12)
+    expected, users = [], []
+
+    for case in range(200):
+        hp = rng.randrange(0, 80)
+        level = rng.randrange(1, 5)
+        current_xp = rng.randrange(0, 150)
+        habit_lists = [[rng.random() < 0.4 for _ in range(rng.randrange(0, 6))] for _ in range(rng.randrange(0, 5))]
+
+        expected.append(add_user(f"loop{case}", hp, level, current_xp, habit_lists))
+        users.append(add_user(f"sum{case}", hp, level, current_xp, habit_lists))
+
+    for user in expected:
+        apply_penalties_per_item(user)
+    db.session.commit()
+
+    sweep_chunk(chunk_rows(users))
+
+    for user, loop_user in zip(users, expected):
+        db.session.refresh(user)
+        db.session.refresh(loop_user)
+
+        assert (user.hp, user.level, user.current_xp, user.total_xp) == (
+            loop_user.hp, loop_user.level, loop_user.current_xp, loop_user.total_xp
+        )
+
+
+def test_chunk_penalties_are_saved_in_one_write(app):
+    """
+    Test that a chunk of Users with many incomplete habits is penalized with one query and one UPDATE.
+    """
+    users = [add_user(f"busy{index}", 50, 2, 40, [[False] * 20 for _ in range(5)]) for index in range(10)]
+    rows = chunk_rows(users)
+    statements = []
+    listener = lambda *args: statements.append(args[2].split()[0])
+    event.listen(db.engine, "before_cursor_execute", listener)
+
+    try:
+        penalties = sweep_chunk(rows)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert statements == ["SELECT", "UPDATE"]
+    assert [(penalty["hp_loss"], penalty["xp_loss"]) for penalty in penalties] == [(50, 250)] * 10
+
+    for user in users:
+        db.session.refresh(user)
+        assert (user.hp, user.current_xp, user.total_xp) == (0, 0, xp_for_level(2))
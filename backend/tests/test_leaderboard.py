@@ -0,0 +1,74 @@
+import pytest
+from src.services.leaderboard import Leaderboard
+
+
+@pytest.fixture
+def board():
+    """
+    Fixture with a leaderboard of 10 users, user-0 with the lowest score.
+    """
+    board = Leaderboard()
+    board.rebuild((f"user-{i}", i * 10, {"username": f"user {i}"}) for i in range(10))
+
+    return board
+
+
+def test_top_page_and_rank(board):
+    """
+    Test that the board is read in rank order, highest score first.
+    """
+    assert [entry["id"] for entry in board.top(3)] == ["user-9", "user-8", "user-7"]
+    assert board.top(1)[0] == {"id": "user-9", "username": "user 9", "rank": 1}
+    assert [entry["rank"] for entry in board.page(2, 4)] == [5, 6, 7, 8]
+    assert board.page(4, 4) == []
+    assert board.rank("user-0") == 10
+    assert board.rank("missing") is None
+
+
+def test_around_is_clipped_at_the_edges(board):
+    """
+    Test that the window around a user stops at the top and bottom of the board.
+    """
+    assert [entry["rank"] for entry in board.around("user-5", radius=2)] == [3, 4, 5, 6, 7]
+    assert [entry["id"] for entry in board.around("user-9", radius=1)] == ["user-9", "user-8"]
+    assert [entry["id"] for entry in board.around("user-0", radius=1)] == ["user-1", "user-0"]
+    assert board.around("missing") == []
+
+
+def test_update_moves_users_and_breaks_ties_by_id(board):
+    """
+    Test that updates move users to their new rank and ties keep a stable order.
+    """
+    board.update("user-0", 1000, username="user 0")
+    board.update("new", 50, username="new")
+    board.remove("user-9")
+
+    assert board.rank("user-0") == 1
+    assert board.rank("user-8") == 2
+    # Same score as user-5, and "new" sorts first
+    assert board.rank("new") < board.rank("user-5")
+    assert board.rank("user-9") is None
+    assert len(board) == 10
+
+
+def test_version_follows_the_entries(board):
+    """
+    Test that every change gives a new version and that equal boards have the same one.
+    """
+    versions = {board.version}
+
+    board.update("user-0", 1000, username="user 0")
+    versions.add(board.version)
+    board.update("user-0", 1000, username="renamed")
+    versions.add(board.version)
+    board.remove("user-9")
+    versions.add(board.version)
+
+    assert len(versions) == 4
+
+    # Another worker that got the same board another way
+    other = Leaderboard()
+    other.rebuild((f"user-{i}", i * 10, {"username": f"user {i}"}) for i in reversed(range(1, 9)))
+    other.update("user-0", 1000, username="renamed")
+
+    assert other.version == board.version
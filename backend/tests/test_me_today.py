@@ -0,0 +1,107 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src.models import db
+from src.models.category import Category
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+from src.services.habit_completion import complete_habit
+
+
+@pytest.fixture
+def user(app):
+    """
+    Fixture with a user with 3 habit lists of 5 preset habits, returning their IDs and an access token.
+    """
+    user = User(email="test@example.com", password="password", username="testuser", timezone="Asia/Tokyo")
+    habits = [PresetHabit(description=f"Habit {i}", category_name="Fitness") for i in range(5)]
+    db.session.add_all([user, Category("Fitness"), *habits])
+    db.session.flush()
+    habit_lists = [HabitList(name=f"List {i}", list_owner_id=user.id) for i in range(3)]
+    db.session.add_all(habit_lists)
+    db.session.commit()
+
+    ids = {"user": user.id, "habit_lists": [habit_list.id for habit_list in habit_lists],
+           "habits": [habit.id for habit in habits]}
+
+    for habit_list_id in ids["habit_lists"]:
+        HabitListItem.add_habits(habit_list_id, "preset", ids["habits"])
+
+    db.session.remove()
+    ids["headers"] = {"Authorization": f"Bearer {create_access_token(identity=ids['user'])}"}
+
+    return ids
+
+
+def test_today_is_built_from_two_queries(app, user):
+    """
+    Test that the whole day of a user is returned from a fixed number of queries.
+    """
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        response = app.test_client().get("/me/today", headers=user["headers"])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert len(statements) == 2
+    assert data["user"]["id"] == user["user"]
+    assert [habit_list["id"] for habit_list in data["habit_lists"]] == user["habit_lists"]
+    assert [len(habit_list["habits"]) for habit_list in data["habit_lists"]] == [5, 5, 5]
+    assert data["habit_lists"][0]["habits"][0]["description"] == "Habit 0"
+    # Midnight in Tokyo is 15:00 UTC
+    assert data["deadline"].endswith("T15:00:00Z")
+
+
+def test_unchanged_day_is_not_modified(app, user):
+    """
+    Test that the version token gives a 304 from the first query until the day changes.
+    """
+    client = app.test_client()
+    etag = client.get("/me/today", headers=user["headers"]).headers["ETag"]
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get("/me/today", headers={**user["headers"], "If-None-Match": etag})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert len(statements) == 1
+
+    complete_habit(user["habit_lists"][0], user["habits"][0], "preset")
+    response = client.get("/me/today", headers={**user["headers"], "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.get_json()["habit_lists"][0]["habits"]) == 4
+
+
+def test_changed_habit_list_is_modified(app, user):
+    """
+    Test that adding a habit to a list changes the version token.
+    """
+    client = app.test_client()
+    etag = client.get("/me/today", headers=user["headers"]).headers["ETag"]
+    habit = PresetHabit(description="Habit 5", category_name="Fitness")
+    db.session.add(habit)
+    db.session.commit()
+    HabitListItem.add_habits(user["habit_lists"][1], "preset", [habit.id])
+
+    response = client.get("/me/today", headers={**user["headers"], "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert [len(habit_list["habits"]) for habit_list in response.get_json()["habit_lists"]] == [5, 6, 5]
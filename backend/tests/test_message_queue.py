@@ -0,0 +1,99 @@
+import subprocess
+import sys
+import time
+import pytest
+import socketio
+from src.services import workers
+from src.services.message_queue import create_client_manager
+from src.services.workers import WORKERS_NAMESPACE, acquire_worker_lock, on_worker_message
+
+
+def wait_for(condition, timeout: float = 5):
+    """
+    Wait until a condition is true, for the listener threads of the managers.
+    """
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+
+    return condition()
+
+
+@pytest.fixture
+def servers(tmp_path):
+    """
+    Fixture with two Socket.IO servers, like two workers, sharing a file queue.
+
+    The packets each server sends to its clients are recorded in server.sent.
+    """
+    url = f"file://{tmp_path / 'socketio.queue'}"
+    servers = []
+
+    for _ in range(2):
+        server = socketio.Server(async_mode="threading", client_manager=create_client_manager(url))
+        server.sent = []
+        server._send_eio_packet = lambda eio_sid, pkt, server=server: server.sent.append((eio_sid, pkt.data))
+        server.manager_initialized = True
+        server.manager.initialize()
+        servers.append(server)
+
+    # Let the listeners reach the end of the queue before anything is published
+    time.sleep(0.1)
+
+    return servers
+
+
+def test_emits_reach_the_clients_of_other_workers(servers):
+    """
+    Test that an emit on a worker is sent to the clients in the room on the other worker, as changes.
+    """
+    first, second = servers
+    sid = second.manager.connect("eio-alice", "/")
+    second.manager.enter_room(sid, "/", "user:alice")
+
+    first.emit("user_update", {"user_id": "alice", "user_data": {"xp": 0, "hp": 100}}, to="user:alice")
+    first.emit("user_update", {"user_id": "alice", "user_data": {"xp": 10, "hp": 100}}, to="user:alice")
+
+    assert wait_for(lambda: len(second.sent) == 2)
+    assert first.sent == []
+    assert second.sent[0][0] == "eio-alice"
+    assert '"user_data":{"xp":0,"hp":100}' in second.sent[0][1].replace(" ", "")
+    assert '"changes":{"xp":10}' in second.sent[1][1].replace(" ", "")
+
+
+def test_worker_messages_are_handled_by_every_worker(servers):
+    """
+    Test that a worker message is handled by the worker that published it and by the others.
+    """
+    received = []
+    on_worker_message("test_message")(received.append)
+
+    servers[0].emit("test_message", {"n": 1}, namespace=WORKERS_NAMESPACE)
+
+    assert wait_for(lambda: len(received) == 2)
+    assert received == [{"n": 1}, {"n": 1}]
+    assert servers[0].sent == servers[1].sent == []
+
+
+def test_one_worker_holds_the_lock(tmp_path, monkeypatch):
+    """
+    Test that the worker lock is held by one process, and taken over once it exits.
+    """
+    monkeypatch.setattr(workers, "_lock_file", None)
+    path = str(tmp_path / "worker.lock")
+    holder = subprocess.Popen(
+        [sys.executable, "-c", "import fcntl, sys, time\n"
+         f"lock = open({path!r}, 'a')\nfcntl.flock(lock, fcntl.LOCK_EX)\nprint('locked', flush=True)\ntime.sleep(60)"],
+        stdout=subprocess.PIPE, text=True,
+    )
+
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        assert not acquire_worker_lock(path)
+    finally:
+        holder.kill()
+        holder.wait()
+
+    assert acquire_worker_lock(path)
+    assert acquire_worker_lock(path)
+    workers._lock_file.close()
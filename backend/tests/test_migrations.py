@@ -0,0 +1,184 @@
+import os
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(__file__), "..", "alembic")
+# The revision the existing databases are stamped with
+BASELINE_REVISION = "9d350b98ef96"
+
+
+def migrate(revision: str = "head") -> None:
+    """Upgrade the database of DATABASE_URL to a revision"""
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    command.upgrade(config, revision)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """
+    Fixture with an SQLite database at the baseline revision, like the existing databases.
+    """
+    url = f"sqlite:///{tmp_path / 'level_up.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    migrate(BASELINE_REVISION)
+    engine = sa.create_engine(url)
+
+    yield engine
+
+    engine.dispose()
+
+
+def schema(engine) -> dict:
+    """Get the columns, index names and unique column sets of every table"""
+    inspector = sa.inspect(engine)
+
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+            {tuple(constraint["column_names"]) for constraint in inspector.get_unique_constraints(table)},
+        )
+        for table in inspector.get_table_names() if table != "alembic_version"
+    }
+
+
+def add_baseline_user(engine, username: str, **values) -> None:
+    """Insert a user row the way the baseline app stored it"""
+    row = {"id": username, "email": f"{username}@example.com", "username": username, "password_hash": "-",
+           "level": 1, "current_xp": 0, "xp_to_next_level": 100, **values}
+
+    with engine.begin() as connection:
+        connection.execute(sa.table("users", *map(sa.column, row)).insert(), row)
+
+
+def test_upgrade_adds_version_to_existing_users(engine):
+    """
+    Test that the existing users get version 1, which the optimistic locking of User needs.
+    """
+    add_baseline_user(engine, "alice")
+
+    migrate()
+
+    with engine.connect() as connection:
+        assert connection.execute(sa.text("SELECT version FROM users")).scalar_one() == 1
+
+
+def test_upgrade_indexes_foreign_keys(engine):
+    """
+    Test that the foreign keys the models look up by are indexed.
+    """
+    migrate()
+
+    inspector = sa.inspect(engine)
+
+    for table, column in (("custom_habits", "habit_owner_id"), ("habit_lists", "list_owner_id"),
+                          ("habit_list_items", "habit_list_id"), ("preset_habits", "category_name")):
+        assert [column] in [index["column_names"] for index in inspector.get_indexes(table)]
+
+
+def test_upgrade_backfills_total_xp(engine):
+    """
+    Test that the existing users keep their level and XP with the total XP the upgrade gives them.
+    """
+    from src.models.user import level_for_xp, xp_for_level
+
+    add_baseline_user(engine, "veteran", level=26, current_xp=291, xp_to_next_level=1350)
+    add_baseline_user(engine, "newcomer")
+    add_baseline_user(engine, "negative", level=8, current_xp=-1045, xp_to_next_level=450)
+
+    migrate()
+
+    with engine.connect() as connection:
+        rows = dict(connection.execute(sa.text("SELECT username, total_xp FROM users")).all())
+        current_xp = connection.execute(sa.text("SELECT current_xp FROM users WHERE id = 'negative'")).scalar_one()
+
+    assert rows == {"veteran": xp_for_level(26) + 291, "newcomer": 0, "negative": xp_for_level(8)}
+    assert [level_for_xp(rows[name]) for name in ("veteran", "newcomer", "negative")] == [26, 1, 8]
+    assert current_xp == 0
+
+
+def test_upgrade_gives_existing_users_the_default_timezone(engine):
+    """
+    Test that the existing users end their day in the default timezone.
+    """
+    from src.services.deadlines import DEFAULT_TIMEZONE
+
+    add_baseline_user(engine, "alice")
+
+    migrate()
+
+    with engine.connect() as connection:
+        assert connection.execute(sa.text("SELECT timezone FROM users")).scalar_one() == DEFAULT_TIMEZONE
+
+
+def test_upgrade_deletes_duplicate_habits(engine):
+    """
+    Test that a habit is left once per habit list, its completed copy if any, before the constraints are added.
+    """
+    items = sa.table("habit_list_items", *map(sa.column, (
+        "id", "habit_list_id", "preset_habit_id", "custom_habit_id", "habit_is_completed", "created_at"
+    )))
+    rows = [
+        ("old", "list-1", "preset-1", None, False, "2026-01-01"),
+        ("completed", "list-1", "preset-1", None, True, "2026-01-02"),
+        ("other-preset", "list-1", "preset-2", None, False, "2026-01-01"),
+        ("other-list", "list-2", "preset-1", None, False, "2026-01-01"),
+        ("custom", "list-1", None, "custom-1", False, "2026-01-01"),
+        ("custom-copy", "list-1", None, "custom-1", False, "2026-01-02"),
+    ]
+
+    with engine.begin() as connection:
+        connection.execute(items.insert(), [dict(zip(items.c.keys(), row)) for row in rows])
+
+    migrate()
+
+    with engine.begin() as connection:
+        assert set(connection.execute(sa.text("SELECT id FROM habit_list_items")).scalars()) == {
+            "completed", "other-preset", "other-list", "custom"
+        }
+
+        with pytest.raises(sa.exc.IntegrityError):
+            connection.execute(items.insert(), {"id": "copy", "habit_list_id": "list-1", "preset_habit_id": "preset-2"})
+
+
+def test_migrated_schema_matches_the_models(engine, tmp_path):
+    """
+    Test that upgrading the baseline gives the tables, columns, indexes and unique constraints of the models.
+    """
+    from src.models import db
+
+    migrate()
+    created = sa.create_engine(f"sqlite:///{tmp_path / 'created.db'}")
+    db.metadata.create_all(created)
+
+    assert schema(engine) == schema(created)
+
+    created.dispose()
+
+
+def test_app_starts_on_migrated_database(engine, monkeypatch):
+    """
+    Test that the app loads the users of a migrated database, at the level they had.
+    """
+    from src import create_app
+    from src.config import TestingConfig
+    from src.persistence.db import DBRepository
+    from src.services.leaderboard import leaderboard
+
+    add_baseline_user(engine, "veteran", level=26, current_xp=291, xp_to_next_level=1350)
+    add_baseline_user(engine, "newcomer")
+    migrate()
+
+    class MigratedConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+
+    monkeypatch.setattr("src.persistence.repo", DBRepository())
+    app = create_app(MigratedConfig)
+
+    with app.app_context():
+        assert [(entry["username"], entry["level"], entry["XP"]) for entry in leaderboard.top()] == [
+            ("veteran", 26, 291), ("newcomer", 1, 0)
+        ]
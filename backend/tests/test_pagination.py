@@ -0,0 +1,149 @@
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src import create_app, persistence
+from src.models import db
+from src.models.category import Category
+from src.models.preset_habit import PresetHabit
+from src.models.user import User
+from src.persistence.db import DBRepository
+from src.persistence.memory import MemoryRepository
+
+
+@pytest.fixture(params=["db", "memory"])
+def app(request, monkeypatch):
+    """
+    Fixture with an app backed by the DB repository or the memory repository.
+    """
+    app = create_app("src.config.TestingConfig")
+
+    with app.app_context():
+        if request.param == "db":
+            monkeypatch.setenv("REPOSITORY", "db")
+            monkeypatch.setattr("src.persistence.repo", DBRepository())
+            db.create_all()
+        else:
+            monkeypatch.setenv("REPOSITORY", "memory")
+            monkeypatch.setattr("src.persistence.repo", MemoryRepository())
+
+        yield app
+
+        if request.param == "db":
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture
+def habit_ids(app):
+    """
+    Fixture with 25 preset habits, returning their IDs in order.
+    """
+    Category.create("Fitness")
+    habits = [PresetHabit.create({"description": f"Habit {i}", "category_name": "Fitness"}) for i in range(25)]
+
+    return sorted(habit.id for habit in habits)
+
+
+def test_pages_chain_with_link_header(app, habit_ids):
+    """
+    Test that following the Link headers returns every object once, in ID order.
+    """
+    client = app.test_client()
+    url = "/preset_habits/?limit=10"
+    seen = []
+
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen += [habit["id"] for habit in response.get_json()]
+        link = response.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+
+    assert seen == habit_ids
+
+
+def test_page_after_id(app, habit_ids):
+    """
+    Test that a page starts after the given ID and has no Link header when it is not full.
+    """
+    response = app.test_client().get(f"/preset_habits/?after={habit_ids[19]}")
+
+    assert [habit["id"] for habit in response.get_json()] == habit_ids[20:]
+    assert "Link" not in response.headers
+
+
+def test_list_without_parameters_is_complete(app, habit_ids):
+    """
+    Test that the list without query parameters still returns every object.
+    """
+    response = app.test_client().get("/preset_habits/")
+
+    assert sorted(habit["id"] for habit in response.get_json()) == habit_ids
+
+
+def test_stream_ndjson(app, habit_ids):
+    """
+    Test that the NDJSON stream has one object per line, in ID order, after the given ID.
+    """
+    response = app.test_client().get(f"/preset_habits/?stream=ndjson&after={habit_ids[4]}")
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in lines] == habit_ids[5:]
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=1001", "limit=ten", "stream=csv", "stream=ndjson&limit=5"])
+def test_invalid_parameters(app, habit_ids, query):
+    """
+    Test that invalid pagination parameters are rejected.
+    """
+    assert app.test_client().get(f"/preset_habits/?{query}").status_code == 400
+
+
+def test_admin_lists_are_paginated(app):
+    """
+    Test that the admin only lists are paginated too, and still require an admin.
+    """
+    admin = User.create({"email": "admin@example.com", "password": "password", "username": "admin"})
+    users = [User.create({"email": f"user{i}@example.com", "password": "password", "username": f"user{i}"})
+             for i in range(4)]
+    client = app.test_client()
+
+    response = client.get("/users/?limit=3", headers={
+        "Authorization": f"Bearer {create_access_token(identity=admin.id, additional_claims={'is_admin': True})}"})
+
+    assert response.status_code == 200
+    assert [user["id"] for user in response.get_json()] == sorted(user.id for user in [admin, *users])[:3]
+    assert 'rel="next"' in response.headers["Link"]
+
+    response = client.get("/habit_lists/?limit=3", headers={
+        "Authorization": f"Bearer {create_access_token(identity=users[0].id)}"})
+
+    assert response.status_code == 403
+
+
+def test_page_seeks_on_the_primary_key(app, habit_ids):
+    """
+    Test that a page is read with one query that seeks past the last ID instead of skipping the previous pages.
+    """
+    if not isinstance(persistence.repo, DBRepository):
+        pytest.skip("Only the DB repository runs SQL")
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        response = app.test_client().get(f"/preset_habits/?limit=5&after={habit_ids[9]}")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    assert [habit["id"] for habit in response.get_json()] == habit_ids[10:15]
+    assert len(statements) == 1
+    statement, parameters = statements[0]
+    assert "WHERE preset_habits.id > ? ORDER BY preset_habits.id" in statement
+    assert habit_ids[9] in parameters
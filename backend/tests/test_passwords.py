@@ -0,0 +1,37 @@
+import flask_bcrypt
+from src.models import db
+from src.models.user import User
+from src.services import passwords
+
+
+def test_hash_and_check_password(app):
+    """
+    Test that hashes use the configured work factor and verify the password.
+    """
+    password_hash = passwords.hash_password("password")
+
+    assert password_hash.startswith("$2b$04$")
+    assert passwords.check_password(password_hash, "password")
+    assert not passwords.check_password(password_hash, "wrong")
+    assert not passwords.needs_rehash(password_hash)
+    assert passwords.needs_rehash(flask_bcrypt.generate_password_hash("password", 5).decode("utf-8"))
+
+
+def test_login_rehashes_password_with_new_work_factor(app):
+    """
+    Test that logging in rehashes a password made with an older work factor.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    user.password_hash = flask_bcrypt.generate_password_hash("password", 5).decode("utf-8")
+    db.session.add(user)
+    db.session.commit()
+
+    response = app.test_client().post("/login", json={"email": "test@example.com", "password": "password"})
+
+    assert response.status_code == 200
+
+    db.session.remove()
+    user = db.session.get(User, user.id)
+
+    assert user.password_hash.startswith("$2b$04$")
+    assert user.check_password("password")
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from src.models import db
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.sweep_checkpoint import SweepCheckpoint
+from src.models.user import User
+from src.services.deadlines import deadlines
+from src.services.penalty_sweep import run_due_penalty_sweeps
+
+DAY = date(2026, 10, 18)
+DEADLINE = deadlines.day_start("US/Eastern", DAY)
+
+
+def add_user(name: str, incomplete_per_list: list[int], hp: int = 50, current_xp: int = 30,
+             added_after_deadline: int = 0, timezone: str = "US/Eastern") -> str:
+    """
+    Add a User with a habit list per count of incomplete habits, and return their ID.
+    """
+    user = User(email=f"{name}@example.com", password="password", username=name, timezone=timezone)
+    user.hp = hp
+    user.current_xp = user.total_xp = current_xp
+    db.session.add(user)
+    db.session.flush()
+
+    for index, incomplete in enumerate(incomplete_per_list):
+        habit_list = HabitList(name=f"List {index}", list_owner_id=user.id)
+        habit_list.created_at = DEADLINE - timedelta(days=2, minutes=-index)
+        db.session.add(habit_list)
+        db.session.flush()
+
+        items = [HabitListItem(habit_list_id=habit_list.id) for _ in range(incomplete + added_after_deadline)]
+        for position, item in enumerate(items):
+            before = position < incomplete
+            item.created_at = DEADLINE + (timedelta(hours=-1) if before else timedelta(hours=1))
+        db.session.add_all(items)
+
+    db.session.commit()
+
+    return user.id
+
+
+def stats(user_id: str) -> tuple[int, int, int]:
+    """
+    Get the HP, current XP and total XP of a User, read from the database.
+    """
+    user = db.session.get(User, user_id, populate_existing=True)
+
+    return user.hp, user.current_xp, user.total_xp
+
+
+def test_sweep_penalizes_each_user_once_per_day(app):
+    """
+    Test that the sweep applies HP and XP penalties and does nothing when run again.
+    """
+    drained = add_user("drained", [1, 2, 1])
+    hurt = add_user("hurt", [1])
+    idle = add_user("idle", [])
+    late = add_user("late", [0], added_after_deadline=2)
+
+    assert run_due_penalty_sweeps(DEADLINE + timedelta(minutes=1), chunk_size=2) == 2
+
+    # 50 HP - 25 leaves 25, then the second and third lists each leave it at 0
+    assert stats(drained) == (0, 0, 0)
+    assert stats(hurt) == (25, 30, 30)
+    assert stats(idle) == (50, 30, 30)
+    # Habits added after the deadline are not penalized
+    assert stats(late) == (50, 30, 30)
+
+    assert run_due_penalty_sweeps(DEADLINE + timedelta(hours=5)) == 0
+    assert stats(hurt) == (25, 30, 30)
+
+    # The next day is a new sweep, which counts the habits added after the last deadline
+    assert run_due_penalty_sweeps(DEADLINE + timedelta(days=1, minutes=1)) == 3
+    assert stats(hurt) == (0, 0, 0)
+    assert stats(late) == (0, 0, 0)
+    assert stats(idle) == (50, 30, 30)
+
+
+def test_sweep_resumes_after_its_checkpoint(app):
+    """
+    Test that an interrupted sweep only processes the users after its checkpoint.
+    """
+    user_ids = sorted(add_user(name, [1]) for name in ("a", "b", "c"))
+
+    checkpoint = SweepCheckpoint(f"penalty:{DEADLINE.isoformat()}")
+    checkpoint.last_user_id = user_ids[0]
+    db.session.add(checkpoint)
+    db.session.commit()
+
+    assert run_due_penalty_sweeps(DEADLINE + timedelta(minutes=1), chunk_size=1) == 2
+    assert [stats(user_id)[0] for user_id in user_ids] == [50, 25, 25]
+    assert SweepCheckpoint.query.one().completed_at is not None
+
+
+def test_sweep_penalizes_users_whose_day_ended(app):
+    """
+    Test that each sweep only penalizes the users of the timezones whose day just ended.
+    """
+    # Added after the last deadline in New York
+    eastern = add_user("eastern", [0], added_after_deadline=1)
+    tokyo = add_user("tokyo", [1], timezone="Asia/Tokyo")
+    seoul = add_user("seoul", [1], timezone="Asia/Seoul")
+
+    # Midnight in Tokyo and Seoul, 11am the day before in New York
+    tokyo_deadline = deadlines.day_start("Asia/Tokyo", DAY + timedelta(days=1))
+
+    assert run_due_penalty_sweeps(tokyo_deadline + timedelta(minutes=1)) == 2
+    assert [stats(user_id)[0] for user_id in (eastern, tokyo, seoul)] == [50, 25, 25]
+
+
+def test_moving_timezone_never_penalizes_a_day_twice(app):
+    """
+    Test that a user penalized for a day, who moves to a timezone where that day ends later, is not penalized again.
+    """
+    traveler = add_user("traveler", [1], timezone="Europe/Berlin")
+    berlin_deadline = deadlines.day_start("Europe/Berlin", DAY + timedelta(days=1))
+
+    assert run_due_penalty_sweeps(berlin_deadline + timedelta(minutes=1)) == 1
+    assert stats(traveler)[0] == 25
+
+    db.session.get(User, traveler).timezone = "US/Eastern"
+    db.session.commit()
+    # The same day ends six hours later in New York
+    eastern_deadline = deadlines.day_start("US/Eastern", DAY + timedelta(days=1))
+
+    assert run_due_penalty_sweeps(eastern_deadline + timedelta(minutes=1)) == 0
+    assert stats(traveler)[0] == 25
+
+    assert run_due_penalty_sweeps(eastern_deadline + timedelta(days=1, minutes=1)) == 1
+    assert stats(traveler)[0] == 0
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from src import socketio
+from src.models import db
+from src.models.habit_list import HabitList, HabitListItem
+from src.models.user import User
+from src.services import reminders
+from src.services.deadlines import deadlines
+
+DEADLINE = deadlines.day_start("US/Eastern", date(2026, 10, 19))
+REMIND_AT = reminders.to_tick(DEADLINE - reminders.REMINDER_LEAD)
+
+
+@pytest.fixture
+def app(app):
+    """
+    Fixture with the app of conftest.py, stopping the reminders it started.
+    """
+    yield app
+    reminders.stop_reminders()
+
+
+def add_habits(name: str, count: int) -> tuple[str, list[str]]:
+    """
+    Add a User with a habit list of incomplete habits, and return their IDs.
+    """
+    user = User(email=f"{name}@example.com", password="password", username=name)
+    db.session.add(user)
+    db.session.flush()
+    habit_list = HabitList(name="List", list_owner_id=user.id)
+    db.session.add(habit_list)
+    db.session.flush()
+    items = [HabitListItem(habit_list.id) for _ in range(count)]
+    db.session.add_all(items)
+    db.session.commit()
+
+    return user.id, [item.id for item in items]
+
+
+def test_reminders_are_pushed_before_the_deadline(app):
+    """
+    Test that incomplete habits are reminded of once per user, and not after being removed.
+    """
+    user_id, item_ids = add_habits("busy", 3)
+    other_id, other_item_ids = add_habits("other", 1)
+    client = socketio.test_client(app, auth={"token": create_access_token(identity=user_id)})
+
+    assert reminders.start_reminders(now=REMIND_AT - 3600) == 4
+
+    # Removed without going through the hooks, the reminder is dropped when due
+    db.session.delete(db.session.get(HabitListItem, item_ids[0]))
+    db.session.commit()
+    reminders.cancel_reminder(other_item_ids[0])
+
+    assert reminders.send_due_reminders(now=REMIND_AT - 1) == 0
+    assert reminders.send_due_reminders(now=REMIND_AT) == 1
+
+    events = [event for event in client.get_received() if event["name"] == "habit_reminder"]
+    assert events == [{
+        "name": "habit_reminder",
+        "args": [{"user_id": user_id, "habit_list_item_ids": sorted(item_ids[1:]),
+                  "deadline": DEADLINE.isoformat()}],
+        "namespace": "/",
+    }]
+
+    # Still incomplete, they are reminded of again the next day
+    next_day = REMIND_AT + int(timedelta(days=1).total_seconds())
+    assert reminders.send_due_reminders(now=next_day - 1) == 0
+    assert reminders.send_due_reminders(now=next_day) == 1
+
+
+def test_completing_a_habit_cancels_its_reminder(app):
+    """
+    Test that a completed habit is not reminded of.
+    """
+    from src.models.preset_habit import PresetHabit
+    from src.services.habit_completion import complete_habit
+
+    user_id, _ = add_habits("done", 0)
+    preset_habit = PresetHabit(description="Run", category_name="Fitness")
+    db.session.add(preset_habit)
+    db.session.commit()
+
+    reminders.start_reminders(now=REMIND_AT - 3600)
+    habit_list = HabitList.get_by_user_id(user_id)[0]
+    item_id = HabitListItem.create({"habit_list_id": habit_list.id, "preset_habit_id": preset_habit.id}).id
+
+    assert item_id in reminders._wheel
+
+    complete_habit(habit_list.id, preset_habit.id, "preset")
+
+    assert item_id not in reminders._wheel
+
+
+def test_deleting_a_habit_list_cancels_its_reminders(app):
+    """
+    Test that the habits of a deleted habit list are not reminded of.
+    """
+    user_id, item_ids = add_habits("quitter", 2)
+    habit_list_id = HabitList.get_by_user_id(user_id)[0].id
+    headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+
+    reminders.start_reminders(now=REMIND_AT - 3600)
+
+    assert all(item_id in reminders._wheel for item_id in item_ids)
+
+    assert app.test_client().delete(f"/habit_lists/{habit_list_id}", headers=headers).status_code == 204
+    assert not any(item_id in reminders._wheel for item_id in item_ids)
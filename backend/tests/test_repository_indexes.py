@@ -0,0 +1,43 @@
+import pytest
+from src.models.custom_habit import CustomHabit
+from src.persistence.memory import MemoryRepository
+
+
+@pytest.fixture
+def repo():
+    """
+    Fixture with an empty in-memory repository.
+    """
+    return MemoryRepository()
+
+
+def test_find_by_uses_declared_index(repo):
+    """
+    Test that find_by returns the objects matching an indexed field.
+    """
+    mine = CustomHabit(description="Meditate", habit_owner_id="user-1")
+    theirs = CustomHabit(description="Journal", habit_owner_id="user-2")
+    repo.save(mine)
+    repo.save(theirs)
+
+    assert repo.find_by(CustomHabit, habit_owner_id="user-1") == [mine]
+    assert repo.find_by("customhabit", habit_owner_id="user-1", description="Journal") == []
+    assert repo.exists_by(CustomHabit, habit_owner_id="user-2")
+
+
+def test_update_and_delete_maintain_index(repo):
+    """
+    Test that updates move an object between index entries and deletes remove it.
+    """
+    habit = CustomHabit(description="Meditate", habit_owner_id="user-1")
+    repo.save(habit)
+
+    habit.habit_owner_id = "user-2"
+    repo.update(habit)
+
+    assert repo.find_by(CustomHabit, habit_owner_id="user-1") == []
+    assert repo.find_by(CustomHabit, habit_owner_id="user-2") == [habit]
+
+    repo.delete(habit)
+
+    assert not repo.exists_by(CustomHabit, habit_owner_id="user-2")
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timezone
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from src import create_app, socketio
+from src.models import serialization
+from src.models.serialization import dumps_bytes, serializer_for
+from src.models.user import User
+from src.services.notifications import emit_to_user
+
+
+@pytest.fixture
+def app():
+    """
+    Fixture with an app, no database needed.
+    """
+    app = create_app("src.config.TestingConfig")
+
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_module(request, monkeypatch):
+    """
+    Fixture that runs a test with orjson, when it is installed, and with the standard json module.
+    """
+    if request.param == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+
+    return request.param
+
+
+@pytest.fixture
+def user():
+    """
+    Fixture with a user that was never saved, with an aware and a naive datetime.
+    """
+    user = User(email="test@example.com", password="password", username="testuser",
+                created_at=datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc))
+    user.last_login = datetime(2026, 10, 17, 8, 0, 0, 123456)
+
+    return user
+
+
+def test_to_dict_is_json_safe(user):
+    """
+    Test that to_dict has the serialized fields, in order, with the datetimes in ISO format.
+    """
+    data = user.to_dict()
+
+    assert tuple(data) == User.SERIALIZED_FIELDS
+    assert data["created_at"] == "2026-10-18T12:30:00+00:00"
+    assert data["last_login"] == "2026-10-17T08:00:00.123456"
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_to_json_matches_to_dict(user, json_module):
+    """
+    Test that the JSON bytes of an instance are the JSON of its to_dict, with or without orjson.
+    """
+    serializer = serializer_for(User)
+
+    assert json.loads(serializer.to_json(user)) == user.to_dict()
+    assert json.loads(serializer.to_json_list([user, user])) == [user.to_dict()] * 2
+
+
+def test_dumps_is_compact_utf8(json_module):
+    """
+    Test that both JSON modules give the same bytes.
+    """
+    data = {"b": "é", "a": [date(2026, 10, 18), None], 1: True}
+
+    assert dumps_bytes(data) == '{"b":"é","a":["2026-10-18",null],"1":true}'.encode()
+    assert dumps_bytes({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+    assert serialization.loads(serialization.dumps(data, separators=(",", ":"))) == {
+        "b": "é", "a": ["2026-10-18", None], "1": True}
+
+    with pytest.raises(TypeError):
+        dumps_bytes({"a": {1, 2}})
+
+
+def test_responses_have_iso_datetimes(app, json_module):
+    """
+    Test that the datetimes of the app's JSON responses are in ISO format.
+    """
+    response = app.json.response({"at": datetime(2026, 10, 18, 12)})
+
+    assert response.get_json() == {"at": "2026-10-18T12:00:00"}
+
+
+def test_socket_events_have_iso_datetimes(app):
+    """
+    Test that Socket.IO sends datetimes in ISO format, so emits need no JSON round trip.
+    """
+    token = create_access_token(identity="alice")
+    client = socketio.test_client(app, auth={"token": token})
+
+    emit_to_user("habit_list_update", {"updated_at": datetime(2026, 10, 18, 12)}, "alice")
+
+    assert client.get_received()[0]["args"][0] == {"updated_at": "2026-10-18T12:00:00"}
@@ -0,0 +1,59 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from src import create_app, socketio
+from src.services.notifications import emit_to_user
+
+
+@pytest.fixture
+def app():
+    """
+    Fixture with an app, no database needed.
+    """
+    app = create_app("src.config.TestingConfig")
+
+    with app.app_context():
+        yield app
+
+
+def connect(app, user_id: str, is_admin: bool = False):
+    """
+    Connect a Socket.IO test client with an access token.
+    """
+    token = create_access_token(identity=user_id, additional_claims={"is_admin": is_admin})
+
+    return socketio.test_client(app, auth={"token": token})
+
+
+def received(client) -> list:
+    return [(event["name"], event["args"][0]) for event in client.get_received()]
+
+
+def test_sockets_need_an_access_token(app):
+    """
+    Test that sockets without a valid access token are refused.
+    """
+    assert not socketio.test_client(app).is_connected()
+    assert not socketio.test_client(app, auth={"token": "not a token"}).is_connected()
+    assert socketio.test_client(app, query_string=f"token={create_access_token(identity='a')}").is_connected()
+
+
+def test_user_events_only_reach_the_user_and_admins(app):
+    """
+    Test that an event about a user reaches their sockets and the admins, once each.
+    """
+    alice, alice_again, bob = connect(app, "alice"), connect(app, "alice"), connect(app, "bob")
+    admin = connect(app, "admin", is_admin=True)
+
+    emit_to_user("habit_list_update", {"user_id": "alice"}, "alice")
+    emit_to_user("habit_reminder", {"user_id": "alice"}, "alice", admins=False)
+
+    expected = [("habit_list_update", {"user_id": "alice"}), ("habit_reminder", {"user_id": "alice"})]
+    assert received(alice) == expected
+    assert received(alice_again) == expected
+    assert received(bob) == []
+    assert received(admin) == [("habit_list_update", {"user_id": "alice"})]
+
+    # An admin's own events reach them once, though they are in both rooms
+    emit_to_user("habit_list_update", {"user_id": "admin"}, "admin")
+
+    assert received(admin) == [("habit_list_update", {"user_id": "admin"})]
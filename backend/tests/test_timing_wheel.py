@@ -0,0 +1,58 @@
+import random
+from src.services.timing_wheel import TimingWheel
+
+
+def test_timers_fire_on_their_tick():
+    """
+    Test that timers at every level fire on their exact tick, in order.
+    """
+    rng = random.Random(3)
+    wheel = TimingWheel(now=1000)
+    ticks = {f"timer{i}": 1000 + rng.randrange(0, 64 ** 3) for i in range(2000)}
+
+    for key, tick in ticks.items():
+        wheel.schedule(key, tick, tick)
+
+    fired = []
+    now = 1000
+
+    while len(wheel):
+        now += rng.randrange(1, 5000)
+        for key, payload in wheel.advance(now):
+            # Advanced past several ticks at once, a timer fires late but never early
+            assert payload <= now
+            fired.append(payload)
+
+    assert fired == sorted(ticks.values())
+
+
+def test_cancel_and_reschedule():
+    """
+    Test that cancelled timers never fire and rescheduling replaces a timer.
+    """
+    wheel = TimingWheel(now=0)
+    wheel.schedule("a", 10, "a")
+    wheel.schedule("b", 5000, "b")
+    wheel.schedule("c", 20, "first")
+    wheel.schedule("c", 300, "second")
+
+    assert wheel.cancel("b")
+    assert not wheel.cancel("b")
+    assert "c" in wheel and len(wheel) == 2
+
+    assert wheel.advance(10) == [("a", "a")]
+    assert wheel.advance(299) == []
+    assert wheel.advance(10 ** 6) == [("c", "second")]
+
+
+def test_timers_beyond_the_wheel_range():
+    """
+    Test that timers past the coarsest wheel and timers already due still fire.
+    """
+    wheel = TimingWheel(now=100, levels=2)
+    wheel.schedule("late", 50)
+    wheel.schedule("far", 100 + 64 * 64 * 3 + 7)
+
+    assert wheel.advance(100) == [("late", None)]
+    assert wheel.advance(100 + 64 * 64 * 3 + 6) == []
+    assert wheel.advance(100 + 64 * 64 * 3 + 7) == [("far", None)]
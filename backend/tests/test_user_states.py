@@ -0,0 +1,86 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from src import socketio
+from src.models import db
+from src.models.user import User
+from src.services.user_states import UserStates
+
+
+def test_updates_carry_the_changed_fields():
+    """
+    Test that the first state of a user is sent whole, and the next ones as their changes.
+    """
+    states = UserStates()
+
+    assert states.encode("alice", {"xp": 0, "hp": 100, "level": 1}) == {
+        "user_id": "alice", "version": 1, "user_data": {"xp": 0, "hp": 100, "level": 1}}
+    assert states.encode("alice", {"xp": 10, "hp": 100, "level": 1}) == {
+        "user_id": "alice", "version": 2, "changes": {"xp": 10}}
+    assert states.encode("alice", {"xp": 10, "hp": 75, "level": 1, "streak": 1}) == {
+        "user_id": "alice", "version": 3, "changes": {"hp": 75, "streak": 1}}
+    assert states.encode("bob", {"xp": 0})["version"] == 1
+
+
+def test_snapshots_keep_the_version_of_an_unchanged_state():
+    """
+    Test that a snapshot only moves to a new version if the state changed.
+    """
+    states = UserStates()
+    states.encode("alice", {"xp": 10})
+
+    assert states.snapshot("alice", {"xp": 10}) == {"user_id": "alice", "version": 1, "user_data": {"xp": 10}}
+    assert states.snapshot("alice", {"xp": 20})["version"] == 2
+    assert states.encode("alice", {"xp": 20}) == {"user_id": "alice", "version": 3, "changes": {}}
+
+
+@pytest.fixture
+def app(app):
+    """
+    Fixture with the app of conftest.py, and two users.
+    """
+    users = [User(email=f"{name}@example.com", password="password", username=name) for name in ("alice", "bob")]
+    db.session.add_all(users)
+    db.session.commit()
+    app.user_ids = [user.id for user in users]
+
+    return app
+
+
+def test_clients_resync_then_get_changes(app):
+    """
+    Test that a client gets a snapshot of its user on resync, then only the changes of an update.
+    """
+    alice_id, bob_id = app.user_ids
+    token = create_access_token(identity=alice_id)
+    client = socketio.test_client(app, auth={"token": token})
+
+    client.emit("user_resync", {"user_id": alice_id})
+    snapshot, = client.get_received()
+
+    assert snapshot["name"] == "user_update"
+    assert snapshot["args"][0]["user_data"]["username"] == "alice"
+    version = snapshot["args"][0]["version"]
+
+    app.test_client().put(f"/users/{alice_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={"username": "alicia"})
+    update, = client.get_received()
+
+    assert update["args"][0]["version"] == version + 1
+    assert update["args"][0]["changes"]["username"] == "alicia"
+    assert "user_data" not in update["args"][0]
+    assert "email" not in update["args"][0]["changes"]
+
+    # Sockets only get the snapshots of their own user
+    client.emit("user_resync", {"user_id": bob_id})
+
+    assert client.get_received() == []
+
+    admin = socketio.test_client(app, auth={"token": create_access_token(
+        identity=bob_id, additional_claims={"is_admin": True})})
+    admin.emit("user_resync", {"user_id": alice_id})
+
+    snapshot = admin.get_received()[0]["args"][0]
+
+    # The state did not change, the other clients of the user keep applying changes to it
+    assert snapshot["version"] == version + 1
+    assert snapshot["user_data"]["username"] == "alicia"
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src import create_app
+from src.config import TestingConfig
+from src.models import db
+from src.models.user import User, level_for_xp, xp_for_level
+from src.persistence.db import DBRepository
+
+THREADS = 8
+COMPLETIONS_PER_THREAD = 25
+XP_PER_COMPLETION = 10
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    Fixture with an app backed by a database file, so every thread gets its own connection.
+    """
+    class FileDatabaseConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'stats.db'}"
+
+    app = create_app(FileDatabaseConfig)
+    monkeypatch.setenv("REPOSITORY", "db")
+    monkeypatch.setattr("src.persistence.repo", DBRepository())
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user_id(app):
+    """
+    Fixture with the ID of a new User.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    db.session.add(user)
+    db.session.commit()
+
+    return user.id
+
+
+def total_xp(user: User) -> int:
+    """
+    Get all the XP a User has gained, including the XP spent on levels.
+    """
+    return sum(100 + (level - 1) * 50 for level in range(1, user.level)) + user.current_xp
+
+
+def test_level_for_xp_matches_level_by_level_curve():
+    """
+    Test that the closed form agrees with leveling up one level at a time.
+    """
+    level, level_start = 1, 0
+
+    for xp in range(50_000):
+        if xp - level_start >= 100 + (level - 1) * 50:
+            level_start += 100 + (level - 1) * 50
+            level += 1
+
+        assert level_for_xp(xp) == level
+        assert xp_for_level(level) == level_start
+
+
+def test_large_xp_grant_levels_up_in_one_step():
+    """
+    Test that an XP grant worth many levels sets the level, XP and stats at once.
+    """
+    user = User(email="test@example.com", password="password", username="testuser")
+    user.total_xp = xp_for_level(1_000) + 42
+    user.check_level_up()
+
+    assert (user.level, user.current_xp, user.xp_to_next_level) == (1_000, 42, 100 + 999 * 50)
+    assert (user.max_hp, user.strenght, user.luck) == (50 + 999 * 10, 5 + 999 * 5, 1 + 999)
+    assert total_xp(user) == user.total_xp
+
+    # Losing XP never drops the level
+    user.lose_xp(100)
+
+    assert (user.level, user.current_xp, user.total_xp) == (1_000, 0, xp_for_level(1_000))
+
+
+def test_stat_changes_apply_level_up(app, user_id):
+    """
+    Test that a single atomic update applies both single and multiple level ups.
+    """
+    user = User.apply_stat_changes(user_id, xp=120, hp=15, habits_completed=1)
+    db.session.commit()
+
+    assert (user.level, user.current_xp, user.xp_to_next_level) == (2, 20, 150)
+    assert (user.max_hp, user.hp, user.strenght) == (60, 60, 10)
+    assert user.habits_completed == 1
+
+    # Worth more than one level, so the rest is applied by the versioned write
+    user = User.apply_stat_changes(user_id, xp=400)
+    db.session.commit()
+
+    assert (user.level, user.current_xp, user.xp_to_next_level) == (4, 70, 250)
+    assert user.max_hp == 80
+    assert total_xp(user) == user.total_xp == 520
+    assert user.version == 4
+
+
+def test_concurrent_stat_changes_lose_no_updates(app, user_id):
+    """
+    Test that stat changes made by many threads at once are all applied.
+    """
+    from src.persistence import repo
+
+    def complete_habits():
+        with app.app_context():
+            for _ in range(COMPLETIONS_PER_THREAD):
+                with repo.transaction():
+                    User.apply_stat_changes(user_id, xp=XP_PER_COMPLETION, hp=15, habits_completed=1)
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        for future in [executor.submit(complete_habits) for _ in range(THREADS)]:
+            future.result()
+
+    db.session.remove()
+    user = db.session.get(User, user_id)
+    completions = THREADS * COMPLETIONS_PER_THREAD
+
+    assert user.habits_completed == completions
+    assert total_xp(user) == user.total_xp == completions * XP_PER_COMPLETION
+    assert user.hp == user.max_hp
+    assert user.version == completions + 1
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+import pytest
+from src.models import db
+from src.models.user import User
+from src.models.xp_bucket import XpBucket, period_starts
+from src.services.penalty_sweep import prune_xp_buckets
+
+
+@pytest.fixture
+def users(app):
+    """
+    Fixture with two Users in an in-memory database.
+    """
+    alice = User(email="alice@example.com", password="password", username="alice")
+    bob = User(email="bob@example.com", password="password", username="bob")
+    db.session.add_all([alice, bob])
+    db.session.commit()
+
+    return alice.id, bob.id
+
+
+def test_period_starts():
+    """
+    Test that weeks start on Monday and months on their first day.
+    """
+    assert period_starts(date(2026, 10, 18)) == {
+        "day": date(2026, 10, 18),
+        "week": date(2026, 10, 12),
+        "month": date(2026, 10, 1),
+    }
+
+
+def test_gains_are_aggregated_per_period(users):
+    """
+    Test that gains add up in the buckets of every period they fall in.
+    """
+    alice, bob = users
+
+    # Sunday, then Monday of the next week, in the same month
+    XpBucket.record_gain(alice, 100, day=date(2026, 10, 18))
+    XpBucket.record_gain(alice, 30, day=date(2026, 10, 19))
+    XpBucket.record_gain(alice, 20, day=date(2026, 10, 19))
+    XpBucket.record_gain(bob, 60, day=date(2026, 10, 19))
+    db.session.commit()
+
+    monday = date(2026, 10, 19)
+
+    assert [(e["username"], e["XP"]) for e in XpBucket.get_leaderboard("day", day=monday)] == [("bob", 60), ("alice", 50)]
+    assert [(e["username"], e["XP"]) for e in XpBucket.get_leaderboard("week", day=monday)] == [("bob", 60), ("alice", 50)]
+    assert [(e["username"], e["XP"]) for e in XpBucket.get_leaderboard("month", day=monday)] == [("alice", 150), ("bob", 60)]
+    assert [e["rank"] for e in XpBucket.get_leaderboard("month", page=2, per_page=1, day=monday)] == [2]
+
+
+def test_expired_buckets_age_out(users):
+    """
+    Test that the sweep's pruning keeps only the current and previous periods.
+    """
+    alice, _ = users
+
+    XpBucket.record_gain(alice, 10, day=date(2026, 8, 31))
+    XpBucket.record_gain(alice, 10, day=date(2026, 10, 17))
+    XpBucket.record_gain(alice, 10, day=date(2026, 10, 18))
+    db.session.commit()
+    prune_xp_buckets(datetime(2026, 10, 18, 12))
+
+    kept = {(bucket.period, bucket.period_start) for bucket in XpBucket.query.all()}
+
+    assert kept == {
+        ("day", date(2026, 10, 17)),
+        ("day", date(2026, 10, 18)),
+        ("week", date(2026, 10, 12)),
+        ("month", date(2026, 10, 1)),
+    }
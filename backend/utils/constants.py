@@ -3,3 +3,13 @@
 REPOSITORY_ENV_VAR = "REPOSITORY"
 
 FILE_STORAGE_FILENAME = "data.json"
+
+# Append-only log of mutations that have not been folded into
+# FILE_STORAGE_FILENAME yet
+FILE_STORAGE_JOURNAL_FILENAME = "data.json.log"
+
+# Minimum number of journal records before a compaction is triggered.
+# Above this, the journal is compacted once it holds as many records as
+# the last snapshot held objects, which keeps the amortized cost of a
+# write O(1)
+FILE_STORAGE_COMPACTION_THRESHOLD = 1000
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import useHttpRequest from "../../hooks/useHttpRequest";
-import { io } from "socket.io-client";
+import { connectSocket } from "../../socket";
 import "./CategoryContainer.css";
 import {
   Accordion,
@@ -95,7 +95,7 @@ const CategoryContainer: React.FC = () => {
 
   // WebSocket connection to listen for habit list creation events
   useEffect(() => {
-    const socket = io("https://level-up-backend-x0lt.onrender.com/");
+    const socket = connectSocket();
 
     socket.on("habit_list_created", (habitList: HabitList) => {
       setHabitLists((prevHabitLists) => [...prevHabitLists, habitList]);
@@ -14,7 +14,7 @@ import {
 } from "@chakra-ui/react";
 import useHttpRequest from "../../hooks/useHttpRequest";
 import { HabitList } from "../types";
-import { io } from "socket.io-client";
+import { connectSocket } from "../../socket";
 
 // Interface for Habit
 interface Habit {
@@ -60,7 +60,7 @@ const UserHabitContainer: React.FC<UserHabitContainerProps> = ({ habits }) => {
 
   // WebSocket connection to listen for habit list creation events
   useEffect(() => {
-    const socket = io("https://level-up-backend-x0lt.onrender.com/");
+    const socket = connectSocket();
 
     socket.on("habit_list_created", (habitList: HabitList) => {
       setHabitLists((prevHabitLists) => [...prevHabitLists, habitList]);
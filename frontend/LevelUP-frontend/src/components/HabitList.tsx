@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import useHttpRequest from "../hooks/useHttpRequest";
 import { useParams } from "react-router-dom";
-import { io } from "socket.io-client";
+import { connectSocket } from "../socket";
 import { Habit, HabitList } from "./types";
 import {
   Box,
@@ -97,7 +97,7 @@ const HabitListComponent: React.FC<HabitListComponentProps> = ({
 
   // WebSocket connection to listen for habit list updates
   useEffect(() => {
-    const socket = io("https://level-up-backend-x0lt.onrender.com/");
+    const socket = connectSocket();
 
     socket.on("connect", () => {
       console.log("Connected to WebSocket server");
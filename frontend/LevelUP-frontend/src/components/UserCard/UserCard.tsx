@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import { useUser } from "../../hooks/useUser";
 import useHttpRequest from "../../hooks/useHttpRequest";
-import { io } from "socket.io-client";
+import { connectSocket } from "../../socket";
 import "./UserCard.css";
 import {
   Alert,
@@ -42,6 +42,14 @@ interface User {
   habits_completed: number;
 }
 
+// A full snapshot of the user, or the fields that changed since the previous version
+interface UserUpdate {
+  user_id: string;
+  version: number;
+  user_data?: User;
+  changes?: Partial<User>;
+}
+
 const UserCard: React.FC = () => {
   const { userId } = useUser();
   const [user, setUser] = useState<User | null>(null);
@@ -78,23 +86,40 @@ const UserCard: React.FC = () => {
 
   // WebSocket connection to listen for user updates
   useEffect(() => {
-    const socket = io("https://level-up-backend-x0lt.onrender.com/");
+    const socket = connectSocket();
+    // Version of the last update applied, changes only apply on top of the one before them
+    let version = 0;
 
     socket.on("connect", () => {
       console.log("Connected to WebSocket server");
+      // Updates missed while disconnected are not replayed, start from a full snapshot
+      socket.emit("user_resync", { user_id: userId });
     });
 
-    socket.on("user_update", (data: { user_id: string; user_data: User }) => {
-      if (data.user_id === userId) {
-        if (data.user_data.level > (user?.level || 0)) {
+    socket.on("user_update", (data: UserUpdate) => {
+      if (data.user_id !== userId) {
+        return;
+      }
+      if (!data.user_data && data.version !== version + 1) {
+        // Changes on top of an update that never arrived, ask for a full snapshot
+        if (data.version > version) {
+          socket.emit("user_resync", { user_id: userId });
+        }
+        return;
+      }
+      version = data.version;
+
+      setUser((user) => {
+        const updated = data.user_data ?? ({ ...user, ...data.changes } as User);
+        if (updated.level > (user?.level || 0)) {
           setLevelUpModalOpen(true);
-        } else if (data.user_data.hp < (user?.hp || 0)) {
+        } else if (updated.hp < (user?.hp || 0)) {
           setHpLossModalOpen(true);
-        } else if (data.user_data.hp > (user?.hp || 0)) {
+        } else if (updated.hp > (user?.hp || 0)) {
           setNotification("HP restored!");
         }
-        setUser(data.user_data);
-      }
+        return updated;
+      });
     });
 
     socket.on("disconnect", () => {
@@ -104,7 +129,7 @@ const UserCard: React.FC = () => {
     return () => {
       socket.disconnect();
     };
-  }, [userId, user]);
+  }, [userId]);
 
   // Clear notification after 7 seconds
   useEffect(() => {
@@ -0,0 +1,21 @@
+import { io, Socket } from "socket.io-client";
+
+const SOCKET_URL = "https://level-up-backend-x0lt.onrender.com/";
+
+// Connects to the WebSocket server as the logged in user, joining their room
+export function connectSocket(): Socket {
+  const socket = io(SOCKET_URL, {
+    auth: { token: localStorage.getItem("token") },
+    // Without long-polling, whose requests could reach another worker than the one holding the session
+    transports: ["websocket"],
+  });
+
+  // Events sent together in a batch are passed to the listeners of each event
+  socket.on("batch", (events: [string, unknown][]) => {
+    events.forEach(([event, data]) => {
+      socket.listeners(event).forEach((listener) => listener(data));
+    });
+  });
+
+  return socket;
+}